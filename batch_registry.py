@@ -0,0 +1,190 @@
+"""
+多批次错峰栽培
+每个批次有自己的起始日期、每日光照时长与开灯时刻，并占用若干 LED 通道。
+所有批次的方案放在同一组 (批次数, 最长天数) 矩阵里，保存为一个 config/batches.npz；
+每个周期只做一次向量化查询即可得到全部通道的开关状态，批次数增加不增加文件读取。
+"""
+import os
+import pathlib
+import threading
+from datetime import date, datetime
+
+import numpy as np
+
+from led_schedule import DEFAULT_START_HOUR, file_revision
+from light_plan import AUTO_CONFIG_DIR
+
+BATCH_FILE = AUTO_CONFIG_DIR / "batches.npz"
+MINUTES_PER_DAY = 24 * 60
+
+
+class BatchRegistry:
+    """批次 -> 方案矩阵、通道 -> 批次下标"""
+
+    def __init__(self):
+        self.names: list[str] = []
+        self.start_ordinal = np.zeros(0, dtype=np.int64)       # (B,) 起始日期 date.toordinal()
+        self.length = np.zeros(0, dtype=np.int64)              # (B,) 周期天数
+        self.hours = np.zeros((0, 0), dtype=np.float32)        # (B, D) 每日光照时长，超出周期为 NaN
+        self.start_minute = np.zeros((0, 0), dtype=np.int16)   # (B, D) 每日开灯时刻（分钟）
+        self.channels: list[str] = []
+        self.channel_batch = np.zeros(0, dtype=np.int64)       # (C,) 通道所属批次下标
+
+    def __len__(self):
+        return len(self.names)
+
+    # ---------- 编辑 ----------
+    def add(self, name: str, start_date: date, hours, channels, start_minutes=None):
+        """新增或替换批次；通道只能属于一个批次，原来的归属会被改到这个批次"""
+        hours = np.asarray(hours, dtype=np.float32).ravel()
+        if start_minutes is None:
+            start_minutes = np.full(len(hours), DEFAULT_START_HOUR * 60)
+        start_minutes = np.broadcast_to(np.asarray(start_minutes, dtype=np.int16), hours.shape)
+        if name in self.names:
+            self.remove(name)
+
+        width = max(self.hours.shape[1], len(hours))
+        self.hours = self._widen(self.hours, width, np.nan)
+        self.start_minute = self._widen(self.start_minute, width, DEFAULT_START_HOUR * 60)
+        row_hours = np.full((1, width), np.nan, dtype=np.float32)
+        row_hours[0, :len(hours)] = hours
+        row_start = np.full((1, width), DEFAULT_START_HOUR * 60, dtype=np.int16)
+        row_start[0, :len(hours)] = start_minutes
+
+        self.names.append(name)
+        self.start_ordinal = np.append(self.start_ordinal, start_date.toordinal())
+        self.length = np.append(self.length, len(hours))
+        self.hours = np.vstack([self.hours, row_hours])
+        self.start_minute = np.vstack([self.start_minute, row_start])
+
+        index = len(self.names) - 1
+        for channel in channels:
+            if channel in self.channels:
+                self.channel_batch[self.channels.index(channel)] = index
+            else:
+                self.channels.append(channel)
+                self.channel_batch = np.append(self.channel_batch, index)
+
+    def remove(self, name: str):
+        """删除批次，其通道随之释放"""
+        index = self.names.index(name)
+        keep = np.arange(len(self.names)) != index
+        self.names.pop(index)
+        self.start_ordinal = self.start_ordinal[keep]
+        self.length = self.length[keep]
+        self.hours = self.hours[keep]
+        self.start_minute = self.start_minute[keep]
+
+        owned = self.channel_batch == index
+        self.channels = [c for c, o in zip(self.channels, owned) if not o]
+        remaining = self.channel_batch[~owned]
+        self.channel_batch = remaining - (remaining > index)
+
+    @staticmethod
+    def _widen(matrix: np.ndarray, width: int, fill) -> np.ndarray:
+        if matrix.shape[1] >= width:
+            return matrix
+        pad = np.full((matrix.shape[0], width - matrix.shape[1]), fill, dtype=matrix.dtype)
+        return np.hstack([matrix, pad])
+
+    # ---------- 查询 ----------
+    def _lit(self, batch: np.ndarray, day: np.ndarray, minute: int) -> np.ndarray:
+        """批次 batch 第 day 天的开灯窗口是否覆盖当天零点起第 minute 分钟"""
+        valid = (day >= 0) & (day < self.length[batch])
+        d = np.clip(day, 0, max(self.hours.shape[1] - 1, 0))
+        duration = np.nan_to_num(self.hours[batch, d]) * 60
+        start = self.start_minute[batch, d]
+        return valid & (minute >= start) & (minute < start + duration)
+
+    def resolve(self, now: datetime) -> dict[str, np.ndarray]:
+        """
+        全部通道在 now 时刻的状态，与 self.channels 对齐：
+        on 是否开灯，day 周期第几天（从 0 起，不在周期内也照算），hours 当天光照时长（周期外为 NaN）
+        前一天跨零点的窗口也计入
+        """
+        batch = self.channel_batch
+        if len(batch) == 0:
+            return {"on": np.zeros(0, dtype=bool), "day": np.zeros(0, dtype=np.int64),
+                    "hours": np.zeros(0, dtype=np.float32)}
+        day = now.toordinal() - self.start_ordinal[batch]
+        minute = now.hour * 60 + now.minute
+        on = self._lit(batch, day, minute) | self._lit(batch, day - 1, minute + MINUTES_PER_DAY)
+        in_cycle = (day >= 0) & (day < self.length[batch])
+        hours = np.where(in_cycle, self.hours[batch, np.clip(day, 0, self.hours.shape[1] - 1)], np.nan)
+        return {"on": on, "day": day, "hours": hours}
+
+    def channel_states(self, now: datetime) -> dict[str, bool]:
+        """{通道: 是否开灯}，只包含已分配给批次的通道"""
+        return dict(zip(self.channels, self.resolve(now)["on"].tolist()))
+
+    # ---------- 存取 ----------
+    def save(self, path: pathlib.Path = BATCH_FILE):
+        """整体写入一个 .npz，先写临时文件再替换，读取端不会看到半个文件"""
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(tmp,
+                 names=np.array(self.names, dtype=str), start_ordinal=self.start_ordinal,
+                 length=self.length, hours=self.hours, start_minute=self.start_minute,
+                 channels=np.array(self.channels, dtype=str), channel_batch=self.channel_batch)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: pathlib.Path = BATCH_FILE) -> "BatchRegistry":
+        registry = cls()
+        with np.load(path, allow_pickle=False) as data:
+            registry.names = data["names"].tolist()
+            registry.start_ordinal = data["start_ordinal"]
+            registry.length = data["length"]
+            registry.hours = data["hours"]
+            registry.start_minute = data["start_minute"]
+            registry.channels = data["channels"].tolist()
+            registry.channel_batch = data["channel_batch"]
+        return registry
+
+
+_loaded = (None, None)          # (修订号, BatchRegistry)
+_loaded_lock = threading.Lock()
+
+
+def load_registry(path: pathlib.Path = BATCH_FILE) -> BatchRegistry | None:
+    """按文件修订号缓存，文件不变时不重复读取；没有批次文件返回 None"""
+    global _loaded
+    revision = file_revision(pathlib.Path(path))
+    if revision is None:
+        return None
+    with _loaded_lock:
+        if _loaded[0] == (str(path), revision):
+            return _loaded[1]
+    registry = BatchRegistry.load(path)
+    with _loaded_lock:
+        _loaded = ((str(path), revision), registry)
+    return registry
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    rng = np.random.default_rng(0)
+    registry = BatchRegistry()
+    today = date.today()
+    n_batches, per_batch = 300, 4
+    for b in range(n_batches):
+        days = int(rng.integers(30, 60))
+        curve = np.linspace(rng.uniform(4, 8), rng.uniform(10, 16), days)
+        registry.add(f"批次{b:03d}", date.fromordinal(today.toordinal() - int(rng.integers(0, 40))),
+                     curve, [f"rack{b:03d}_led{i}" for i in range(per_batch)])
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = pathlib.Path(folder) / "batches.npz"
+        registry.save(path)
+        t0 = time.perf_counter()
+        loaded = load_registry(path)
+        load_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            state = loaded.resolve(datetime.now())
+        tick_us = (time.perf_counter() - t0) * 1000
+        print(f"{n_batches} 个批次 / {len(loaded.channels)} 个通道：加载 {load_ms:.1f} ms，"
+              f"每次查询 {tick_us:.0f} µs，当前开灯 {int(state['on'].sum())} 路")
@@ -0,0 +1,290 @@
+"""
+设备指令调度器（asyncio）
+把 configPLC.json / config485.json 的每次修订转换为总线写指令：
+每条总线只保留最新目标状态，与从站已确认的状态比较后合并成连续地址的批量写
+（PLC 线圈 FC15、485 调光寄存器 FC16），失败按指数退避重试，应答后才记为已确认。
+一次修订在每条总线上只占一帧，通道数增加只增加帧长，不增加帧数。
+"""
+import asyncio
+import json
+import pathlib
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from batch_registry import load_registry
+from ramp import day_table
+from led_schedule import PLC_LED_KEYS, RS485_LED_KEYS, file_revision, load_auto_schedule
+
+CONFIG_PLC_FILE = "configPLC.json"
+CONFIG_485_FILE = "config485.json"
+
+# 地址 = 列表下标
+PLC_COILS = ["uv", "water_pump", "water_spray"] + PLC_LED_KEYS
+RS485_REGISTERS = list(RS485_LED_KEYS)
+
+LED_ON_LEVEL = 100                  # 485 调光器满亮度
+MAX_COILS_PER_FRAME = 1968          # Modbus FC15 单帧上限
+MAX_REGISTERS_PER_FRAME = 123       # Modbus FC16 单帧上限
+
+
+# ---------- 1. 配置 -> 目标状态 ----------
+def _in_window(hour: int, start: int, stop: int) -> bool:
+    if start == stop:
+        return False
+    if start < stop:
+        return start <= hour < stop
+    return hour >= start or hour < stop  # 跨零点，如 20:00 -> 05:00
+
+
+def _cycle_on(conf: dict, now: datetime) -> bool:
+    """间隔运行设备（水泵/洒水）：每 interval 分钟开启 duration 秒"""
+    if not conf.get("enable"):
+        return False
+    period = int(conf.get("interval_minutes", 0)) * 60
+    if period <= 0:
+        return False
+    seconds = now.hour * 3600 + now.minute * 60 + now.second
+    return seconds % period < int(conf.get("duration_seconds", 0))
+
+
+def led_on(key: str, conf: dict, now: datetime, auto_schedule, batch_states=None) -> bool:
+    """
+    与控制页面一致：auto 模式下，通道属于某个栽培批次时按批次方案，
+    否则有当日配置时按 AI 排程；其余按手动设置
+    """
+    led_conf = conf.get(key)
+    if not led_conf:
+        return False
+    if led_conf.get("mode") == "auto" and batch_states and key in batch_states:
+        return batch_states[key]
+    if led_conf.get("mode") == "auto" and key in auto_schedule:
+        start, stop = auto_schedule[key]
+        return _in_window(now.hour, start, stop)
+    return bool(led_conf.get("enable")) and _in_window(
+        now.hour, led_conf.get("start_hour", 20), led_conf.get("stop_hour", 0))
+
+
+def plc_targets(config_plc: dict, now: datetime, auto_schedule, batch_states=None) -> list[int]:
+    uv = config_plc.get("uv", {})
+    values = {
+        "uv": bool(uv.get("enable")) and _in_window(now.hour, uv.get("start_hour", 3), uv.get("stop_hour", 6)),
+        "water_pump": _cycle_on(config_plc.get("water_pump", {}), now),
+        "water_spray": _cycle_on(config_plc.get("water_spray", {}), now),
+    }
+    for key in PLC_LED_KEYS:
+        values[key] = led_on(key, config_plc, now, auto_schedule, batch_states)
+    return [int(values[key]) for key in PLC_COILS]
+
+
+def rs485_targets(config_485: dict, now: datetime, auto_schedule, batch_states=None, levels=None) -> list[int]:
+    """levels：当前时刻的调光表亮度 {通道: 0-100}，只用于 auto 模式且有自动排程的通道"""
+    targets = []
+    for key in RS485_REGISTERS:
+        if levels is not None and key in levels and (config_485.get(key) or {}).get("mode") == "auto":
+            targets.append(levels[key])
+        else:
+            targets.append(LED_ON_LEVEL if led_on(key, config_485, now, auto_schedule, batch_states) else 0)
+    return targets
+
+
+# ---------- 2. 单条总线 ----------
+@dataclass
+class BusStats:
+    commands: int = 0        # 已确认的写帧
+    retries: int = 0
+    failures: int = 0        # 重试耗尽仍未确认
+    coalesced: int = 0       # 被更新的修订覆盖、没有单独下发的目标
+    last_latency: float = 0.0   # 提交到全部确认 (s)
+    max_latency: float = 0.0
+    busy_time: float = 0.0      # 占用总线时间 (s)
+
+
+class BusChannel:
+    """一条总线：只保存最新目标，由单个协程串行下发差量"""
+
+    def __init__(self, name: str, bus, size: int, max_frame: int,
+                 retries: int = 3, timeout: float = 1.0, backoff: float = 0.05):
+        self.name = name
+        self.bus = bus                  # 需提供 async write(address, values) -> bool
+        self.max_frame = max_frame
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.target: list[int] | None = None
+        self.acked: list[int | None] = [None] * size   # None = 从未确认
+        self.stats = BusStats()
+        self._submitted_at = None
+        self._wakeup = asyncio.Event()
+        self._synced = asyncio.Event()
+
+    def submit(self, values) -> bool:
+        """提交新目标；与当前目标相同则忽略。返回是否产生了新目标"""
+        values = list(values)
+        if values == self.target:
+            return False
+        if self._wakeup.is_set():
+            self.stats.coalesced += 1
+        self.target = values
+        if self._submitted_at is None:
+            self._submitted_at = time.perf_counter()
+        self._synced.clear()
+        self._wakeup.set()
+        return True
+
+    def spans(self, target) -> list[tuple[int, list[int]]]:
+        """与已确认状态的差量，合并为一段连续地址（超过单帧上限时再切分）"""
+        changed = [i for i, (t, a) in enumerate(zip(target, self.acked)) if t != a]
+        if not changed:
+            return []
+        lo, hi = changed[0], changed[-1] + 1
+        return [(addr, target[addr:min(addr + self.max_frame, hi)])
+                for addr in range(lo, hi, self.max_frame)]
+
+    async def _write(self, address: int, values: list[int]) -> bool:
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.stats.retries += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            started = time.perf_counter()
+            try:
+                ok = await asyncio.wait_for(self.bus.write(address, values), self.timeout)
+            except (TimeoutError, asyncio.TimeoutError, OSError):
+                ok = False
+            finally:
+                self.stats.busy_time += time.perf_counter() - started
+            if ok:
+                self.stats.commands += 1
+                return True
+        self.stats.failures += 1
+        return False
+
+    async def run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            target, submitted_at = self.target, self._submitted_at
+            all_ok = True
+            for address, values in self.spans(target):
+                if await self._write(address, values):
+                    self.acked[address:address + len(values)] = values
+                else:
+                    all_ok = False
+            if self._wakeup.is_set():
+                continue            # 写的过程中又来了新修订，直接下发新的差量
+            if all_ok:
+                # 未确认时保留提交时刻，延迟统计包含跨周期的重发
+                if submitted_at is not None:
+                    latency = time.perf_counter() - submitted_at
+                    self.stats.last_latency = latency
+                    self.stats.max_latency = max(self.stats.max_latency, latency)
+                self._submitted_at = None
+                self._synced.set()
+
+    async def wait_synced(self):
+        """等待当前目标全部被从站确认"""
+        await self._synced.wait()
+
+    def resend(self):
+        """重新下发未确认的差量（上次重试耗尽时由调度器周期性调用）"""
+        if self.target is not None and not self._synced.is_set() and not self._wakeup.is_set():
+            self._wakeup.set()
+
+
+# ---------- 3. 调度器 ----------
+class DeviceDispatcher:
+    """监视配置文件修订，按秒计算目标状态并交给各总线下发"""
+
+    def __init__(self, plc_bus, rs485_bus,
+                 plc_file=CONFIG_PLC_FILE, rs485_file=CONFIG_485_FILE,
+                 poll_interval: float = 1.0, clock=datetime.now, ramp_options: dict | None = None,
+                 **bus_options):
+        self.plc = BusChannel("plc", plc_bus, len(PLC_COILS), MAX_COILS_PER_FRAME, **bus_options)
+        self.rs485 = BusChannel("rs485", rs485_bus, len(RS485_REGISTERS), MAX_REGISTERS_PER_FRAME, **bus_options)
+        self.plc_file = pathlib.Path(plc_file)
+        self.rs485_file = pathlib.Path(rs485_file)
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.ramp_options = ramp_options     # 不为 None 时 485 调光器按日出/日落调光表输出亮度
+        self._revisions = (None, None)
+        self._config_plc = {}
+        self._config_485 = {}
+        self._started_at = None
+
+    @staticmethod
+    def _load(path: pathlib.Path) -> dict:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def reload_if_changed(self) -> bool:
+        revisions = (file_revision(self.plc_file), file_revision(self.rs485_file))
+        if revisions == self._revisions:
+            return False
+        self._revisions = revisions
+        self._config_plc = self._load(self.plc_file)
+        self._config_485 = self._load(self.rs485_file)
+        return True
+
+    def apply(self, config_plc: dict, config_485: dict, now: datetime | None = None):
+        """按给定配置计算当前目标并提交（相同目标不产生总线流量）"""
+        now = now or self.clock()
+        auto_schedule = load_auto_schedule(now.date())
+        # 全部批次通道一次向量化查询；批次文件不变时不重新读取
+        registry = load_registry()
+        batch_states = registry.channel_states(now) if registry is not None else None
+        self.plc.submit(plc_targets(config_plc, now, auto_schedule, batch_states))
+        levels = None
+        if self.ramp_options is not None:
+            # 调光表每天生成一次，这里只取当前时刻的一列
+            table, known = day_table(now.date(), RS485_REGISTERS, **self.ramp_options)
+            levels = {key: level for key, level, ok in zip(RS485_REGISTERS, table.levels_at(now).tolist(), known) if ok}
+        self.rs485.submit(rs485_targets(config_485, now, auto_schedule, batch_states, levels))
+
+    def tick(self):
+        self.reload_if_changed()
+        self.apply(self._config_plc, self._config_485)
+        self.plc.resend()
+        self.rs485.resend()
+
+    async def run(self):
+        self._started_at = time.perf_counter()
+        workers = [asyncio.create_task(self.plc.run()), asyncio.create_task(self.rs485.run())]
+        try:
+            while True:
+                self.tick()
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def utilization(self) -> dict[str, float]:
+        """各总线占用率 = 总线忙时间 / 运行时间"""
+        if self._started_at is None:
+            return {"plc": 0.0, "rs485": 0.0}
+        elapsed = max(time.perf_counter() - self._started_at, 1e-9)
+        return {ch.name: ch.stats.busy_time / elapsed for ch in (self.plc, self.rs485)}
+
+
+if __name__ == "__main__":
+    from device_sim import SimulatedBus
+
+    async def _demo(seconds: float = 3.0):
+        plc_bus = SimulatedBus("plc", kind="coil", size=len(PLC_COILS), drop_rate=0.2, seed=1)
+        rs485_bus = SimulatedBus("rs485", kind="register", size=len(RS485_REGISTERS), drop_rate=0.2, seed=2)
+        dispatcher = DeviceDispatcher(plc_bus, rs485_bus, poll_interval=0.2)
+        task = asyncio.create_task(dispatcher.run())
+        await asyncio.sleep(seconds)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        for channel, bus in ((dispatcher.plc, plc_bus), (dispatcher.rs485, rs485_bus)):
+            s = channel.stats
+            print(f"[{channel.name}] 状态 {bus.values}")
+            print(f"    帧 {s.commands}  重试 {s.retries}  失败 {s.failures}  合并 {s.coalesced}  "
+                  f"最大延迟 {s.max_latency * 1000:.1f} ms")
+        print("总线占用率", {k: f"{v:.1%}" for k, v in dispatcher.utilization().items()})
+
+    asyncio.run(_demo())
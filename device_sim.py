@@ -0,0 +1,64 @@
+"""
+本地 Modbus / 485 总线模拟器
+无硬件时代替 PLC 线圈与 485 调光寄存器，按波特率估算帧时间，可注入丢帧以测试重试逻辑
+"""
+import asyncio
+import random
+
+
+class SimulatedBus:
+    """模拟一条 Modbus RTU 总线上的单个从站"""
+
+    def __init__(self, name: str, kind: str = "register", size: int = 64,
+                 baudrate: int = 9600, turnaround: float = 0.005,
+                 drop_rate: float = 0.0, seed: int = 0):
+        if kind not in ("coil", "register"):
+            raise ValueError("kind 只能是 coil 或 register")
+        self.name = name
+        self.kind = kind
+        self.values = [0] * size
+        self.baudrate = baudrate
+        self.turnaround = turnaround        # 从站处理 + 收发切换时间 (s)
+        self.drop_rate = drop_rate
+        self.frames = []                    # 收到的写帧 (address, values)
+        self.busy_time = 0.0                # 累计占用总线时间 (s)
+        self._rng = random.Random(seed)
+        self._lock = asyncio.Lock()         # 一条总线同一时刻只能有一帧
+
+    def frame_bytes(self, count: int) -> int:
+        """写多个线圈(FC15)/寄存器(FC16)的请求 + 应答字节数"""
+        payload = (count + 7) // 8 if self.kind == "coil" else 2 * count
+        return (9 + payload) + 8
+
+    def frame_time(self, count: int) -> float:
+        # 每字节 11 位（起始 + 8 数据 + 校验 + 停止）
+        return self.frame_bytes(count) * 11 / self.baudrate + self.turnaround
+
+    async def write(self, address: int, values) -> bool:
+        """写入连续地址；丢帧时抛出 TimeoutError"""
+        values = [int(v) for v in values]
+        if address < 0 or address + len(values) > len(self.values):
+            raise ValueError(f"{self.name}: 地址越界 {address}+{len(values)}")
+        async with self._lock:
+            duration = self.frame_time(len(values))
+            await asyncio.sleep(duration)
+            self.busy_time += duration
+            if self._rng.random() < self.drop_rate:
+                raise TimeoutError(f"{self.name}: 从站无应答")
+            self.values[address:address + len(values)] = values
+            self.frames.append((address, values))
+        return True
+
+
+if __name__ == "__main__":
+    async def _demo():
+        bus = SimulatedBus("rs485", kind="register", size=8, drop_rate=0.3, seed=1)
+        for i in range(5):
+            try:
+                await bus.write(0, [i % 2] * 8)
+                print(f"第{i}帧 OK  {bus.values}")
+            except TimeoutError as e:
+                print(f"第{i}帧 丢失：{e}")
+        print(f"单帧时间 {bus.frame_time(8) * 1000:.1f} ms，累计占用 {bus.busy_time:.3f} s")
+
+    asyncio.run(_demo())
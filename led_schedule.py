@@ -0,0 +1,159 @@
+"""
+LED 每日调度查询
+按日期缓存自动模式的开关灯时间，控制页面与设备驱动共用同一份结果：
+每天每份配置只解析一次，日期变化或配置文件被改写时自动失效
+"""
+import json
+import pathlib
+import threading
+from datetime import date, time, datetime, timedelta
+from types import MappingProxyType
+
+from light_plan import AUTO_CONFIG_DIR, plan_source, read_day
+
+PLC_LED_KEYS = ["top_led", "mid_led", "bot_led"]
+RS485_LED_KEYS = [
+    "top_led2", "top_led3", "bot_led2", "bot_led3",
+    "under_led1", "under_led2", "under_led3", "under_led4"
+]
+LED_KEYS = PLC_LED_KEYS + RS485_LED_KEYS
+
+
+def led_bus(key: str) -> str:
+    return "plc" if key in PLC_LED_KEYS else "485"
+
+
+def led_group(key: str) -> str:
+    """按位置分组：top_led3 -> top，under_led1 -> under"""
+    return key.split("_")[0]
+
+
+# 批量编辑模板：名称 -> 通道列表
+LED_GROUPS = {
+    "全部": LED_KEYS,
+    "全部顶灯": [k for k in LED_KEYS if led_group(k) == "top"],
+    "全部底部补光": [k for k in LED_KEYS if led_group(k) == "under"],
+    "全部485": RS485_LED_KEYS,
+    "全部PLC": PLC_LED_KEYS,
+}
+
+DEFAULT_START_HOUR = 20
+
+
+# ---------- 1. 按日期缓存 ----------
+def file_revision(path: pathlib.Path):
+    """文件修订号 (mtime_ns, size)，文件不存在返回 None"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DailyCache:
+    """以日期为键的解析缓存，源文件修订号变化时重新解析"""
+
+    def __init__(self, loader, source, max_days: int = 4):
+        self._loader = loader          # loader(day) -> value
+        self._source = source          # source(day) -> Path
+        self._max_days = max_days
+        self._entries = {}             # day -> (revision, value)
+        self._lock = threading.Lock()
+
+    def get(self, day: date):
+        revision = file_revision(self._source(day))
+        with self._lock:
+            entry = self._entries.get(day)
+            if entry is not None and entry[0] == revision:
+                return entry[1]
+        value = self._loader(day)
+        with self._lock:
+            self._entries[day] = (revision, value)
+            # 只保留最近几天，日期翻转后旧条目自然淘汰
+            for old in sorted(self._entries)[:-self._max_days]:
+                del self._entries[old]
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# ---------- 2. 自动模式配置 config{date}.json ----------
+def auto_config_file(day: date) -> pathlib.Path:
+    return AUTO_CONFIG_DIR / f"config{day}.json"
+
+
+def _parse_auto_schedule(day: date):
+    auto_file = auto_config_file(day)
+    if not auto_file.exists():
+        return MappingProxyType({})
+
+    data = json.loads(auto_file.read_text(encoding="utf-8"))
+    schedule = {}
+    for key in LED_KEYS:
+        if key not in data:
+            continue
+        try:
+            start = int(data[key]["start"].split(":")[0])
+            stop = int(data[key]["stop"].split(":")[0])
+            schedule[key] = (start, stop)
+        except Exception:
+            continue
+    return MappingProxyType(schedule)
+
+
+_auto_cache = DailyCache(_parse_auto_schedule, auto_config_file)
+
+
+def load_auto_schedule(today: date | None = None):
+    """返回 {led_key: (start_hour, stop_hour)}（只读），同一天只解析一次"""
+    return _auto_cache.get(today or date.today())
+
+
+def write_auto_configs(base_date: date, windows: dict) -> int:
+    """
+    windows: {led_key: (每日开灯分钟, 每日关灯分钟)}，从 base_date 起逐日写出 config{date}.json
+    返回写出的天数
+    """
+    days = min(len(start) for start, _ in windows.values())
+    for i in range(days):
+        day_conf = {
+            key: {"start": f"{int(start[i]) // 60:02d}:{int(start[i]) % 60:02d}",
+                  "stop": f"{int(stop[i]) // 60:02d}:{int(stop[i]) % 60:02d}"}
+            for key, (start, stop) in windows.items()
+        }
+        auto_config_file(base_date + timedelta(days=i)).write_text(
+            json.dumps(day_conf, ensure_ascii=False, indent=2))
+    invalidate_schedule_cache()
+    return days
+
+
+# ---------- 3. 每日光照计划 daily_light.plan ----------
+def _daily_light_file(day: date) -> pathlib.Path:
+    return plan_source(AUTO_CONFIG_DIR)
+
+
+def _parse_today_led_schedule(day: date) -> tuple[int, int]:
+    # 按栽培周期第 N 天（相对计划起始日期）取光照时长，而不是当月第几天
+    light_hours = read_day(day, AUTO_CONFIG_DIR)
+    if light_hours is None:
+        return DEFAULT_START_HOUR, DEFAULT_START_HOUR
+
+    start = DEFAULT_START_HOUR
+    end_dt = datetime.combine(day, time(start)) + timedelta(hours=light_hours)
+    return start, end_dt.hour
+
+
+_daily_light_cache = DailyCache(_parse_today_led_schedule, _daily_light_file)
+
+
+def get_today_led_schedule(today: date | None = None) -> tuple[int, int]:
+    """按每日光照表计算今日 (开灯小时, 关灯小时)"""
+    return _daily_light_cache.get(today or date.today())
+
+
+def invalidate_schedule_cache():
+    """光周期方案重新生成后调用，强制下次查询重新解析"""
+    _auto_cache.invalidate()
+    _daily_light_cache.invalidate()
@@ -2,115 +2,100 @@
 # plant_pp_assistant.py
 """
 植物光周期自动调控助手（sigma 固定 2.0 天）
+数值计算在 photoperiod.py；LLM 客户端与 Agent 在第一次使用时才创建，
+导入本模块不会加载 autogen / OpenAI 客户端，也不会读取 .env。
 """
-from dotenv import load_dotenv
-load_dotenv()
-
 import asyncio
 import os
-import csv
-import math
-from typing import Dict
+import threading
+from datetime import date
 from pathlib import Path
 
-import numpy as np
-from scipy.ndimage import gaussian_filter1d
-
-from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.ui import Console
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_agentchat.messages import TextMessage
+from light_plan import CSV_FILE_NAME, write_plan
+from photoperiod import (  # noqa: F401  保持 light_agent.calc_photoperiod 等旧导入路径可用
+    PHOTOPERIOD_ALGO_VERSION, calc_photoperiod, calc_photoperiod_batch, photoperiod_cache,
+)
 
 BASE_PATH = r"d:/pi_programs/visual" 
 
-# ---------- 1. 核心工具 ----------
-def calc_photoperiod(
-        days: int,
-        h_min: float,
-        h_max: float,
-        h_ave: float
-) -> Dict[str, any]:
-    """三段光周期 + 高斯平滑（σ 固定为 2）"""
-    if h_max > 24:
-        raise ValueError("最大光周期不能超过 24 小时")
-    if not (0 <= h_min <= h_ave <= h_max):
-        raise ValueError("必须满足 0 ≤ h_min ≤ h_ave ≤ h_max")
-    if days <= 0:
-        raise ValueError("栽培天数必须为正整数")
-
-    # 原始三段
-    d1 = int(math.floor(days * (h_max - h_ave) / (h_max - h_min)))
-    d3 = int(math.floor(days * (h_ave - h_min) / (h_max - h_min)))
-    d2 = days - d1 - d3
-    pp1, pp3 = h_min, h_max
-    pp2 = (days * h_ave - d1 * h_min - d3 * h_max) if d2 == 1 else 0.0
-
-    # 展开 -> 平滑（σ=2）-> 压回
-    daily = np.array([pp1] * d1 + [pp2] * d2 + [pp3] * d3, dtype=float)
-    smoothed = gaussian_filter1d(daily, sigma=2.0, mode='nearest')
-
-    s1 = smoothed[:d1].mean() if d1 else 0.0
-    s2 = smoothed[d1:d1 + d2].mean() if d2 else 0.0
-    s3 = smoothed[d1 + d2:].mean() if d3 else 0.0
-
-    total_smooth = d1 * s1 + d2 * s2 + d3 * s3
-
-    return {
-        "stage1_days": d1,
-        "stage1_pp": round(s1, 2),
-        "stage2_days": d2,
-        "stage2_pp": round(s2, 2),
-        "stage3_days": d3,
-        "stage3_pp": round(s3, 2),
-        "total_pp_check": round(total_smooth, 2),
-        "daily_schedule": smoothed.round(2).tolist()
-    }
-
-
-# ---------- 2. LLM 客户端 ----------
-model_client = OpenAIChatCompletionClient(
-    model="deepseek-chat",
-    base_url="https://api.deepseek.com",
-    api_key=os.getenv("DEEPSEEK_API_KEY"),
-    model_info={
-        "name": "deepseek-chat",
-        "family": "gpt-4o",
-        "vision": False,
-        "json_output": True,
-        "structured_output": False,  # <- 新增字段，消除 Warning
-        "function_calling": True,
-        "parameters": {"temperature": 0, "top_p": 0.9, "max_tokens": 2048}
-    }
+# ---------- 1. LLM 客户端 / Agent（延迟创建） ----------
+SYSTEM_MESSAGE = (
+    "你是叶用生菜光周期调控助手。当用户提供栽培参数（总天数、最小光周期、最大光周期、平均光周期）时，"\
+    "请调用calc_photoperiod函数计算光周期方案，然后用**一句话**向种植者说明核心要点及相比恒定光周期的好处。"
 )
 
-# ---------- 3. Agent ----------
-agent = AssistantAgent(
-    name="LightAgent",
-    model_client=model_client,
-    system_message=(
-        "你是叶用生菜光周期调控助手。当用户提供栽培参数（总天数、最小光周期、最大光周期、平均光周期）时，"\
-        "请调用calc_photoperiod函数计算光周期方案，然后用**一句话**向种植者说明核心要点及相比恒定光周期的好处。"
-    ),
-    tools=[calc_photoperiod]
+EXPLAIN_MESSAGE = (
+    "你是叶用生菜光周期调控助手。根据给出的光周期方案，"
+    "用**一句话**向种植者说明核心要点及相比恒定光周期的好处。"
 )
 
-# ---------- 6. 写出每日光照表 ----------
+_model_client = None
+_agent = None
+_lock = threading.RLock()
+
+
+def get_model_client():
+    """第一次调用时读取 .env 并创建 DeepSeek 客户端，之后复用"""
+    global _model_client
+    with _lock:
+        if _model_client is None:
+            from dotenv import load_dotenv
+            from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+            load_dotenv()
+            _model_client = OpenAIChatCompletionClient(
+                model="deepseek-chat",
+                base_url="https://api.deepseek.com",
+                api_key=os.getenv("DEEPSEEK_API_KEY"),
+                model_info={
+                    "name": "deepseek-chat",
+                    "family": "gpt-4o",
+                    "vision": False,
+                    "json_output": True,
+                    "structured_output": False,  # <- 新增字段，消除 Warning
+                    "function_calling": True,
+                    "parameters": {"temperature": 0, "top_p": 0.9, "max_tokens": 2048}
+                }
+            )
+        return _model_client
+
+
+def get_agent():
+    """第一次调用时创建 LightAgent，之后复用"""
+    global _agent
+    with _lock:
+        if _agent is None:
+            from autogen_agentchat.agents import AssistantAgent
+            from autogen_core.tools import FunctionTool
+
+            _agent = AssistantAgent(
+                name="LightAgent",
+                model_client=get_model_client(),
+                system_message=SYSTEM_MESSAGE,
+                # 工具名保持 calc_photoperiod，实际走缓存，与表单/命令行共用同一份结果
+                tools=[FunctionTool(photoperiod_cache.get, description=calc_photoperiod.__doc__, name="calc_photoperiod")]
+            )
+        return _agent
+
+
+def build_explainer(stream: bool = False):
+    """只做解释、不带工具的 Agent；每次新建，避免上一次的对话历史带进来。stream=True 时逐 token 输出"""
+    from autogen_agentchat.agents import AssistantAgent
+
+    return AssistantAgent(name="LightExplainer", model_client=get_model_client(),
+                          system_message=EXPLAIN_MESSAGE, model_client_stream=stream)
+
+
+# ---------- 2. 写出每日光照表 ----------
 def write_daily_csv(daily_schedule: list[float]) -> Path:
-    """把 daily_schedule 写成 csv → BASE_PATH/config/daily_light.csv"""
+    """把 daily_schedule 写成 BASE_PATH/config/daily_light.csv（同时写出定长 daily_light.plan，从今天起算）"""
     root = Path(BASE_PATH).expanduser().resolve()  # 支持 ~ 符号
     folder = root / "config"
-    folder.mkdir(exist_ok=True, parents=True)      # 一次性建好
-
-    csv_path = folder / "daily_light.csv"
-    with csv_path.open("w", newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["day", "light_hours"])
-        for day, hrs in enumerate(daily_schedule, 1):
-            writer.writerow([day, hrs])
-    return csv_path
+    write_plan(date.today(), daily_schedule, folder)
+    return folder / CSV_FILE_NAME
 
 
-# ---------- 4. 交互入口 ----------
+# ---------- 3. 交互入口 ----------
 async def main() -> None:
     print("=== 植物光周期自动调控助手 ===")
     days = int(input("总栽培天数："))
@@ -124,17 +109,18 @@ async def main() -> None:
     )
 
     # 改用 run() 即可 await
-    result = await agent.run(task=task_text)
+    result = await get_agent().run(task=task_text)
     # 把助手返回的内容打印出来
+    from autogen_agentchat.messages import TextMessage
     for msg in result.messages:
         if isinstance(msg, TextMessage):
             print(msg.content)
 
     # ===== 写出每日光照表 =====
-    calc = calc_photoperiod(days, h_min, h_max, h_ave)
+    calc = photoperiod_cache.get(days, h_min, h_max, h_ave)
     csv_file = write_daily_csv(calc["daily_schedule"])
     print(f"每日光照表已生成：{csv_file}")
 
-# ---------- 5. 启动 ----------
+# ---------- 4. 启动 ----------
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,156 @@
+"""
+每日光照计划存取
+daily_light.plan 为定长二进制：16 字节文件头（起始日期 + 天数）+ 每天一个 float32 光照时长，
+按栽培周期第 N 天直接定位读取；整周期以 NumPy 数组给出，便于向量化计算能耗与 DLI。
+daily_light.csv 仍同步写出，供人工查看与旧脚本使用；每行带日期列，只有 csv 时由它确定起始日期。
+"""
+import csv
+import logging
+import os
+import pathlib
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+AUTO_CONFIG_DIR = pathlib.Path(__file__).with_name("config")  # ./config/
+PLAN_FILE_NAME = "daily_light.plan"
+CSV_FILE_NAME = "daily_light.csv"
+
+_MAGIC = b"DLPL"
+_VERSION = 1
+_HEADER = np.dtype([
+    ("magic", "S4"),
+    ("version", "<u2"),
+    ("reserved", "<u2"),
+    ("start", "<i4"),   # 起始日期 date.toordinal()
+    ("days", "<i4"),
+])
+_VALUE = np.dtype("<f4")
+
+
+class LightPlan:
+    """一个栽培周期的每日光照时长，按起始日期定位"""
+
+    def __init__(self, start_date: date, hours):
+        self.start_date = start_date
+        self._hours = np.asarray(hours, dtype=np.float32)
+        self._hours.flags.writeable = False
+
+    def __len__(self):
+        return len(self._hours)
+
+    @property
+    def hours(self) -> np.ndarray:
+        """整周期每日光照时长 (h)，只读 float32 数组"""
+        return self._hours
+
+    @property
+    def dates(self) -> np.ndarray:
+        start = np.datetime64(self.start_date, "D")
+        return start + np.arange(len(self._hours))
+
+    def cycle_day(self, day: date) -> int:
+        """day 对应的周期下标（从 0 开始），不在周期内返回 -1"""
+        idx = (day - self.start_date).days
+        return idx if 0 <= idx < len(self._hours) else -1
+
+    def hours_on(self, day: date) -> float | None:
+        idx = self.cycle_day(day)
+        return float(self._hours[idx]) if idx >= 0 else None
+
+    def dli(self, ppfd: float | np.ndarray) -> np.ndarray:
+        """每日光积分 DLI (mol·m⁻²·d⁻¹)，ppfd 单位 µmol·m⁻²·s⁻¹"""
+        return self._hours * 3600.0 * np.asarray(ppfd, dtype=float) / 1e6
+
+    def energy_kwh(self, power_kw: float | np.ndarray) -> np.ndarray:
+        """每日能耗 (kWh)；power_kw 传数组时按广播得到多组灯的能耗矩阵"""
+        return np.multiply.outer(np.asarray(power_kw, dtype=float), self._hours)
+
+
+# ---------- 写出 ----------
+def write_plan(start_date: date, daily_schedule, folder: pathlib.Path = AUTO_CONFIG_DIR) -> pathlib.Path:
+    """写出 daily_light.plan 与 daily_light.csv，返回 .plan 路径"""
+    folder = pathlib.Path(folder)
+    folder.mkdir(exist_ok=True, parents=True)
+    hours = np.asarray(daily_schedule, dtype=_VALUE)
+
+    header = np.zeros(1, dtype=_HEADER)
+    header[0] = (_MAGIC, _VERSION, 0, start_date.toordinal(), len(hours))
+
+    plan_path = folder / PLAN_FILE_NAME
+    tmp_path = plan_path.with_suffix(".tmp")
+    with tmp_path.open("wb") as f:
+        f.write(header.tobytes())
+        f.write(hours.tobytes())
+    os.replace(tmp_path, plan_path)   # 原子替换，读取方不会看到半截文件
+
+    with (folder / CSV_FILE_NAME).open("w", newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["day", "date", "light_hours"])
+        writer.writerows((day, start_date + timedelta(days=day - 1), h) for day, h in enumerate(daily_schedule, 1))
+    return plan_path
+
+
+# ---------- 读取 ----------
+def _read_header(f) -> tuple[date, int]:
+    raw = f.read(_HEADER.itemsize)
+    if len(raw) != _HEADER.itemsize:
+        raise ValueError("光照计划文件头不完整")
+    header = np.frombuffer(raw, dtype=_HEADER)[0]
+    if header["magic"] != _MAGIC or header["version"] != _VERSION:
+        raise ValueError("不是有效的光照计划文件")
+    return date.fromordinal(int(header["start"])), int(header["days"])
+
+
+def read_day(day: date, folder: pathlib.Path = AUTO_CONFIG_DIR) -> float | None:
+    """只读取 day 当天的光照时长（定位读取 4 字节），无计划或不在周期内返回 None"""
+    plan_path = pathlib.Path(folder) / PLAN_FILE_NAME
+    if not plan_path.exists():
+        plan = _load_csv_plan(folder)
+        return plan.hours_on(day) if plan else None
+
+    with plan_path.open("rb") as f:
+        start_date, days = _read_header(f)
+        idx = (day - start_date).days
+        if not 0 <= idx < days:
+            return None
+        f.seek(_HEADER.itemsize + idx * _VALUE.itemsize)
+        return float(np.frombuffer(f.read(_VALUE.itemsize), dtype=_VALUE)[0])
+
+
+def load_plan(folder: pathlib.Path = AUTO_CONFIG_DIR) -> LightPlan | None:
+    """读取整周期计划；只有 csv 时按其日期列确定起始日期（没有日期列的旧文件退回修改日期）"""
+    plan_path = pathlib.Path(folder) / PLAN_FILE_NAME
+    if not plan_path.exists():
+        return _load_csv_plan(folder)
+
+    with plan_path.open("rb") as f:
+        start_date, days = _read_header(f)
+        hours = np.fromfile(f, dtype=_VALUE, count=days)
+    return LightPlan(start_date, hours)
+
+
+def _load_csv_plan(folder: pathlib.Path) -> LightPlan | None:
+    csv_path = pathlib.Path(folder) / CSV_FILE_NAME
+    if not csv_path.exists():
+        return None
+    with csv_path.open(newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    hours = [float(row["light_hours"]) for row in rows]
+    if rows and rows[0].get("date"):
+        start_date = date.fromisoformat(rows[0]["date"]) - timedelta(days=int(rows[0]["day"]) - 1)
+    else:
+        # 没有日期列的旧文件与 config{date}.json 同时写出，只能假定起始日期即写出当天；
+        # 复制或检出会改变修改时间，计划可能整体错位
+        start_date = datetime.fromtimestamp(csv_path.stat().st_mtime).date()
+        logger.warning("%s 没有日期列，按文件修改日期 %s 作为起始日期；重新生成计划可消除此警告",
+                       csv_path, start_date)
+    return LightPlan(start_date, hours)
+
+
+def plan_source(folder: pathlib.Path = AUTO_CONFIG_DIR) -> pathlib.Path:
+    """当前生效的计划文件路径（用于判断计划是否被改写）"""
+    plan_path = pathlib.Path(folder) / PLAN_FILE_NAME
+    return plan_path if plan_path.exists() else pathlib.Path(folder) / CSV_FILE_NAME
@@ -0,0 +1,106 @@
+"""
+光周期方案计算（仅依赖 NumPy）
+三段光周期 + 平滑，控制页面、LLM 工具与命令行共用；不导入任何 LLM 相关依赖，保证页面冷启动快。
+"""
+from typing import Dict
+
+import numpy as np
+
+from plan_cache import PlanCache
+from smoothing import smooth
+
+
+def calc_photoperiod(
+        days: int,
+        h_min: float,
+        h_max: float,
+        h_ave: float,
+        smoothing: str = "gaussian"
+) -> Dict[str, any]:
+    """
+    三段光周期 + 平滑。smoothing 为 smoothing.KERNELS 之一，默认 "gaussian"
+    （σ=2 的递归 IIR 高斯近似）；平滑后总光照时长不变，任何一天不超过 24 h
+    """
+    if h_max > 24:
+        raise ValueError("最大光周期不能超过 24 小时")
+    if not (0 <= h_min <= h_ave <= h_max):
+        raise ValueError("必须满足 0 ≤ h_min ≤ h_ave ≤ h_max")
+    if days <= 0:
+        raise ValueError("栽培天数必须为正整数")
+
+    # 与批量接口共用同一套计算，单个方案即 P=1
+    batch = calc_photoperiod_batch(days, h_min, h_max, h_ave, smoothing=smoothing)
+    return {
+        "stage1_days": int(batch["stage1_days"][0]),
+        "stage1_pp": float(batch["stage1_pp"][0]),
+        "stage2_days": int(batch["stage2_days"][0]),
+        "stage2_pp": float(batch["stage2_pp"][0]),
+        "stage3_days": int(batch["stage3_days"][0]),
+        "stage3_pp": float(batch["stage3_pp"][0]),
+        "total_pp_check": float(batch["total_pp_check"][0]),
+        "daily_schedule": batch["daily_schedule"][0].tolist()
+    }
+
+
+def calc_photoperiod_batch(days, h_min, h_max, h_ave, smoothing: str = "gaussian",
+                           sigma: float = 2.0, width: int = 5) -> Dict[str, np.ndarray]:
+    """
+    批量计算光周期方案：四个参数按 NumPy 广播规则展开成 P 个方案。
+    返回 daily_schedule 为 (P, max_days) 矩阵（超出各自天数的位置为 NaN），
+    其余统计量为长度 P 的数组，含义与 calc_photoperiod 一致。
+    smoothing 选择平滑核（smoothing.KERNELS：gaussian 为 Young–van Vliet 递归近似，默认；
+    moving_average、cosine 使用窗口宽度 width），sigma 只对 gaussian 有效。
+    平滑后按行缩放，total_pp_check 恒等于原始三段的总光照时长。
+    """
+    days, h_min, h_max, h_ave = (np.ravel(a) for a in np.broadcast_arrays(
+        np.asarray(days), np.asarray(h_min, dtype=float),
+        np.asarray(h_max, dtype=float), np.asarray(h_ave, dtype=float)))
+    if np.any(h_max > 24):
+        raise ValueError("最大光周期不能超过 24 小时")
+    if not np.all((0 <= h_min) & (h_min <= h_ave) & (h_ave <= h_max)):
+        raise ValueError("必须满足 0 ≤ h_min ≤ h_ave ≤ h_max")
+    if np.any(days <= 0) or not np.all(days == np.floor(days)):
+        raise ValueError("栽培天数必须为正整数")
+    if np.any(h_max == h_min):
+        raise ValueError("h_max 与 h_min 不能相等")
+    days = days.astype(np.int64)
+
+    # 原始三段
+    span = h_max - h_min
+    d1 = np.floor(days * (h_max - h_ave) / span).astype(np.int64)
+    d3 = np.floor(days * (h_ave - h_min) / span).astype(np.int64)
+    d2 = days - d1 - d3
+    pp2 = np.where(d2 == 1, days * h_ave - d1 * h_min - d3 * h_max, 0.0)
+
+    # 展开为 (P, max_days) -> 逐行平滑（保持总光照）-> 压回
+    cols = np.arange(days.max())[None, :]
+    b1, b2 = d1[:, None], (d1 + d2)[:, None]
+    raw = np.where(cols < b1, h_min[:, None], np.where(cols < b2, pp2[:, None], h_max[:, None]))
+    smoothed = smooth(raw, smoothing, sigma=sigma, width=width, lengths=days, preserve_total=True)
+    valid = cols < days[:, None]
+
+    def stage_mean(lo, hi, n):
+        total = np.where((cols >= lo) & (cols < hi), smoothed, 0.0).sum(axis=1)
+        return np.divide(total, n, out=np.zeros_like(total), where=n > 0)
+
+    s1 = stage_mean(0, b1, d1)
+    s2 = stage_mean(b1, b2, d2)
+    s3 = stage_mean(b2, days[:, None], d3)
+    total_smooth = d1 * s1 + d2 * s2 + d3 * s3
+
+    return {
+        "days": days,
+        "stage1_days": d1,
+        "stage1_pp": s1.round(2),
+        "stage2_days": d2,
+        "stage2_pp": s2.round(2),
+        "stage3_days": d3,
+        "stage3_pp": s3.round(2),
+        "total_pp_check": total_smooth.round(2),
+        "daily_schedule": np.where(valid, smoothed.round(2), np.nan),
+    }
+
+
+# 修改三段划分或平滑算法时必须更新版本号，旧缓存随之失效
+PHOTOPERIOD_ALGO_VERSION = "three-stage-iir-gauss-sigma2-budget-cap24-v3"
+photoperiod_cache = PlanCache(calc_photoperiod, PHOTOPERIOD_ALGO_VERSION)
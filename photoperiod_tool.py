@@ -0,0 +1,314 @@
+"""
+光周期方案 + 一句话解释
+数值方案立即返回；LLM 解释在后台事件循环里逐 token 输出（stream_explanation），感知延迟只剩首 token 时间。
+页面通过 StreamingExplanation 在后台线程消费这条流，脚本运行不等待模型，只轮询已到达的文字。
+解释按 (参数, 算法版本, 提示词版本) 缓存到 config/explain_cache/，模型不可用时退回本地模板，
+模板结果不落盘，模型恢复后下次会重新请求。
+方案本身以 PhotoperiodPlan（按列存放的数组 + 阶段汇总）返回，页面表格、CSV、Excel 都直接由它生成。
+"""
+import asyncio
+import io
+import queue
+import re
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+from photoperiod import PHOTOPERIOD_ALGO_VERSION, photoperiod_cache
+from plan_cache import CACHE_DIR, PlanCache, normalize_params
+
+# 修改解释提示词时必须更新版本号，旧解释随之失效
+PROMPT_VERSION = "lettuce-one-sentence-v1"
+EXPLAIN_DIR = CACHE_DIR.with_name("explain_cache")
+TOKEN_TIMEOUT = 10.0        # 流式输出时等待下一个 token 的上限（含首 token）(s)
+OFFLINE_NOTE = "（AI 服务暂不可用，以上为本地生成的说明）"
+
+
+# ---------- 1. 结构化方案 ----------
+@dataclass(frozen=True, eq=False)
+class PhotoperiodPlan:
+    """一个栽培周期的光周期方案，每日数据按列存放"""
+    days: int
+    h_min: float
+    h_max: float
+    h_ave: float
+    hours: np.ndarray               # (days,) 每日光照时长 (h)
+    stage_days: np.ndarray          # (3,) 各阶段天数
+    stage_hours: np.ndarray         # (3,) 各阶段平均光照时长 (h)
+    total_hours: float
+    start_date: date | None = None
+
+    @classmethod
+    def from_calc(cls, params: dict, calc: dict, start_date: date | None = None) -> "PhotoperiodPlan":
+        hours = np.array(calc["daily_schedule"], dtype=float)
+        hours.setflags(write=False)
+        return cls(
+            days=params["days"], h_min=params["h_min"], h_max=params["h_max"], h_ave=params["h_ave"],
+            hours=hours,
+            stage_days=np.array([calc[f"stage{i}_days"] for i in (1, 2, 3)], dtype=np.int64),
+            stage_hours=np.array([calc[f"stage{i}_pp"] for i in (1, 2, 3)], dtype=float),
+            total_hours=float(calc["total_pp_check"]),
+            start_date=start_date,
+        )
+
+    @property
+    def day(self) -> np.ndarray:
+        return np.arange(1, self.days + 1)
+
+    @property
+    def stage(self) -> np.ndarray:
+        return np.repeat(np.arange(1, 4), self.stage_days)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        cols = {"天数": self.day, "阶段": self.stage, "光照时长(h)": self.hours}
+        if self.start_date is not None:
+            dates = np.datetime64(self.start_date) + np.arange(self.days)
+            cols = {"日期": dates.astype(str), **cols}
+        return cols
+
+    def summary(self) -> dict:
+        return {
+            "总天数": self.days,
+            "最短光照(h)": self.h_min,
+            "最长光照(h)": self.h_max,
+            "平均光照(h)": self.h_ave,
+            **{f"阶段{i + 1}天数": int(d) for i, d in enumerate(self.stage_days)},
+            **{f"阶段{i + 1}光照(h)": float(h) for i, h in enumerate(self.stage_hours)},
+            "总光照(h)": self.total_hours,
+        }
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.columns())
+
+    def to_csv(self) -> str:
+        cols = self.columns()
+        lines = [",".join(cols)]
+        lines += [",".join(map(str, row)) for row in zip(*(c.tolist() for c in cols.values()))]
+        return "\n".join(lines) + "\n"
+
+    def to_markdown(self) -> str:
+        lines = ["| 天数 | 光照时长(h) |", "|---|---|"]
+        lines += [f"| {day} | {hours:.2f} |" for day, hours in zip(self.day.tolist(), self.hours.tolist())]
+        return "\n".join(lines)
+
+    def to_excel(self, target=None, sheet_name: str = "光周期计划"):
+        return plans_to_excel({sheet_name: self}, target)
+
+
+def build_plan(days, h_min, h_max, h_ave, start_date: date | None = None) -> PhotoperiodPlan:
+    params = normalize_params(days, h_min, h_max, h_ave)
+    return PhotoperiodPlan.from_calc(params, photoperiod_cache.get(**params), start_date)
+
+
+def _sheet_title(name: str, used: set) -> str:
+    """Excel 工作表名最多 31 个字符，且不能含 []:*?/\\"""
+    title = re.sub(r"[\[\]:*?/\\]", "_", str(name))[:31] or "Sheet"
+    base, n = title, 1
+    while title in used:
+        n += 1
+        title = f"{base[:31 - len(str(n)) - 1]}_{n}"
+    used.add(title)
+    return title
+
+
+def plans_to_excel(plans: dict, target=None):
+    """
+    plans: {工作表名: PhotoperiodPlan}，每个方案一张表，另加一张“参数摘要”。
+    openpyxl 只写模式逐行写出，内存占用与方案长度无关。
+    target 为 None 时返回 bytes，否则写入给定路径或文件对象。
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    used = {"参数摘要"}
+    for name, plan in plans.items():
+        ws = wb.create_sheet(_sheet_title(name, used))
+        cols = plan.columns()
+        ws.append(list(cols))
+        for row in zip(*(c.tolist() for c in cols.values())):
+            ws.append(row)
+
+    summary = wb.create_sheet("参数摘要")
+    rows = [plan.summary() for plan in plans.values()]
+    header = list(rows[0]) if rows else []
+    summary.append(["方案"] + header)
+    for name, row in zip(plans, rows):
+        summary.append([str(name)] + [row[k] for k in header])
+
+    if target is None:
+        buf = io.BytesIO()
+        wb.save(buf)
+        return buf.getvalue()
+    wb.save(target)
+    return target
+
+
+# ---------- 2. 提示词与本地模板 ----------
+def explain_task(params: dict, calc: dict) -> str:
+    return (
+        f"叶用生菜光周期方案：总天数={params['days']}天，最小光周期={params['h_min']}h，"
+        f"最大光周期={params['h_max']}h，平均光周期={params['h_ave']}h。"
+        f"第一阶段 {calc['stage1_days']} 天约 {calc['stage1_pp']}h，"
+        f"第二阶段 {calc['stage2_days']} 天约 {calc['stage2_pp']}h，"
+        f"第三阶段 {calc['stage3_days']} 天约 {calc['stage3_pp']}h，"
+        f"总光照 {calc['total_pp_check']}h。请解释这个方案。"
+    )
+
+
+def template_explanation(params: dict, calc: dict) -> str:
+    """离线模板：只依赖方案本身，相同参数得到相同文字"""
+    return (
+        f"前 {calc['stage1_days']} 天以约 {calc['stage1_pp']}h 的短光照促进根系与叶片建成，"
+        f"随后逐步过渡，最后 {calc['stage3_days']} 天延长到约 {calc['stage3_pp']}h 加速干物质积累；"
+        f"总光照 {calc['total_pp_check']}h 与恒定 {params['h_ave']}h 相同，但把光能集中到生长后期，产量和用电效率更高。"
+    )
+
+
+# ---------- 3. 后台调用模型 ----------
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """模型客户端绑定在同一个常驻事件循环上，连接可以复用"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="light-agent-loop", daemon=True).start()
+        return _loop
+
+
+def _streamed_only(**params):
+    raise LookupError("解释只由 stream_explanation 写入缓存")
+
+
+explanation_cache = PlanCache(_streamed_only, f"{PHOTOPERIOD_ALGO_VERSION}/{PROMPT_VERSION}", EXPLAIN_DIR)
+
+
+# ---------- 4. 流式输出 ----------
+async def stream_model(params: dict, calc: dict):
+    """逐 token 产出模型回答（异步生成器）"""
+    from autogen_agentchat.messages import ModelClientStreamingChunkEvent
+    from light_agent import build_explainer
+
+    async for event in build_explainer(stream=True).run_stream(task=explain_task(params, calc)):
+        if isinstance(event, ModelClientStreamingChunkEvent) and event.content:
+            yield event.content
+
+
+_DONE = object()
+_CANCELLED = object()
+
+
+def _pump(token_source, params: dict, calc: dict, out: queue.Queue):
+    """在后台事件循环里消费异步 token 流，逐个放进线程安全队列"""
+    async def consume():
+        try:
+            async for token in token_source(params, calc):
+                out.put(token)
+        except BaseException as exc:       # 取消或连接失败都交给读取端处理
+            out.put(exc)
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+        else:
+            out.put(_DONE)
+
+    return asyncio.run_coroutine_threadsafe(consume(), _background_loop())
+
+
+def stream_explanation(days, h_min, h_max, h_ave, token_source=None, cache=None, tokens=None):
+    """
+    同步生成器，可直接交给 st.write_stream。
+    已有缓存时一次给出全文；否则逐 token 转发模型输出，完整结束后写入缓存。
+    首 token 前失败给出本地模板；输出一半后失败则在已输出内容后附上说明。
+    token_source(params, calc) 为异步生成器，默认 stream_model，测试时可换成本地假模型。
+    tokens 为转发用的队列，可由调用方传入；向其中放入 _CANCELLED 会立即结束等待，不写缓存。
+    """
+    cache = explanation_cache if cache is None else cache
+    params = normalize_params(days, h_min, h_max, h_ave)
+    cached = cache.peek(**params)
+    if cached is not None:
+        yield cached["text"]
+        return
+
+    calc = photoperiod_cache.get(**params)
+    tokens = queue.Queue() if tokens is None else tokens
+    pump = _pump(token_source or stream_model, params, calc, tokens)
+    parts = []
+    try:
+        while True:
+            try:
+                item = tokens.get(timeout=TOKEN_TIMEOUT)
+            except queue.Empty:
+                item = TimeoutError("等待模型输出超时")
+            if item is _DONE:
+                break
+            if item is _CANCELLED:
+                return
+            if isinstance(item, BaseException):
+                if parts:
+                    yield "\n\n（输出中断）"
+                else:
+                    yield template_explanation(params, calc) + "\n\n" + OFFLINE_NOTE
+                return
+            parts.append(item)
+            yield item
+    finally:
+        # 页面重跑会关闭生成器，同时停止后台请求
+        pump.cancel()
+    if parts:
+        cache.put(**params, result={"text": "".join(parts), "source": "llm"})
+    else:
+        yield template_explanation(params, calc) + "\n\n" + OFFLINE_NOTE
+
+
+class StreamingExplanation:
+    """
+    在后台线程消费 stream_explanation，页面每次重跑只读取已到达的文字（text / done），
+    不会在脚本运行中等待模型。cancel() 向转发队列放入取消标记，正在等待 token 的线程立即醒来，
+    关闭生成器并停止后台请求。
+    """
+
+    def __init__(self, days, h_min, h_max, h_ave, **options):
+        self.parts: list[str] = []
+        self.done = False
+        self._tokens: queue.Queue = queue.Queue()
+        self._stream = stream_explanation(days, h_min, h_max, h_ave, tokens=self._tokens, **options)
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._consume, name="light-explain", daemon=True)
+        self._thread.start()
+
+    def _consume(self):
+        try:
+            for chunk in self._stream:
+                if self._cancelled.is_set():
+                    break
+                self.parts.append(chunk)
+        finally:
+            self._stream.close()
+            self.done = True
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def cancel(self):
+        self._cancelled.set()
+        self._tokens.put(_CANCELLED)
+
+    def wait(self, timeout: float | None = None) -> str:
+        self._thread.join(timeout)
+        return self.text
+
+
+if __name__ == "__main__":
+    import time
+
+    t0 = time.perf_counter()
+    explanation = StreamingExplanation(50, 4, 9, 8)
+    print(f"提交耗时 {(time.perf_counter() - t0) * 1000:.1f} ms")
+    print(f"{explanation.wait()}  （{time.perf_counter() - t0:.1f} s）")
@@ -0,0 +1,125 @@
+"""
+光周期方案缓存（内容寻址）
+键 = 规范化参数 + 算法版本的 SHA-256；内存 LRU 命中优先，其次读磁盘 config/plan_cache/<key>.json，
+都未命中才计算并落盘。表单、LLM 工具调用与命令行入口共用同一份计算结果和文件。
+"""
+import copy
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = pathlib.Path(__file__).with_name("config") / "plan_cache"
+
+
+def normalize_params(days, h_min, h_max, h_ave) -> dict:
+    """4 与 4.0、numpy 标量与 Python 数值得到同一组参数"""
+    if int(days) != days:
+        raise ValueError("栽培天数必须为正整数")
+    return {
+        "days": int(days),
+        "h_min": round(float(h_min), 6),
+        "h_max": round(float(h_max), 6),
+        "h_ave": round(float(h_ave), 6),
+    }
+
+
+def plan_key(params: dict, algo_version: str) -> str:
+    payload = json.dumps({"algo": algo_version, **params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+class PlanCache:
+    """calc_photoperiod 结果的两级缓存"""
+
+    def __init__(self, compute, algo_version: str,
+                 directory: pathlib.Path = CACHE_DIR, maxsize: int = 256):
+        self.compute = compute
+        self.algo_version = algo_version
+        self.directory = pathlib.Path(directory)
+        self.maxsize = maxsize
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def path_for(self, key: str) -> pathlib.Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, days: int, h_min: float, h_max: float, h_ave: float) -> dict:
+        """
+        按规范化参数 + 算法版本的内容寻址键查找：先查内存 LRU，再读磁盘 <key>.json，
+        都未命中时调用 compute 并落盘；相同参数只计算一次，返回副本
+        """
+        params = normalize_params(days, h_min, h_max, h_ave)
+        key = plan_key(params, self.algo_version)
+
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._memory[key])
+
+        result = self._read(key, params)
+        if result is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            result = self.compute(**params)
+            self._write(key, params, result)
+
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+        return copy.deepcopy(result)
+
+    def put(self, days: int, h_min: float, h_max: float, h_ave: float, result: dict):
+        """写入在缓存之外得到的结果（如流式输出结束后拼好的全文）"""
+        params = normalize_params(days, h_min, h_max, h_ave)
+        key = plan_key(params, self.algo_version)
+        self._write(key, params, result)
+        with self._lock:
+            self._memory[key] = copy.deepcopy(result)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def peek(self, days: int, h_min: float, h_max: float, h_ave: float):
+        """只查缓存（内存、磁盘），不计算；未命中返回 None"""
+        params = normalize_params(days, h_min, h_max, h_ave)
+        key = plan_key(params, self.algo_version)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._memory[key])
+        result = self._read(key, params)
+        if result is not None:
+            self.disk_hits += 1
+        return copy.deepcopy(result)
+
+    def _read(self, key: str, params: dict):
+        try:
+            record = json.loads(self.path_for(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if record.get("algo") != self.algo_version or record.get("params") != params:
+            return None
+        return record["result"]
+
+    def _write(self, key: str, params: dict, result: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        record = {"algo": self.algo_version, "params": params, "result": result}
+        tmp.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
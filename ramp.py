@@ -0,0 +1,172 @@
+"""
+日出 / 日落调光
+把每天的开灯窗口换算成逐分钟（或逐秒）的调光表，每个通道一行 uint8 亮度（0-100），每天只算一次；
+调度器每个周期只按当前时刻取一列，不做任何计算。
+窗口来源与调度器一致：属于栽培批次的通道按批次方案，其余按 config{date}.json 的自动排程。
+"""
+import threading
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from batch_registry import BATCH_FILE, load_registry
+from led_schedule import auto_config_file, file_revision, load_auto_schedule
+
+MINUTES_PER_DAY = 24 * 60
+SHAPES = ("cosine", "linear")
+
+
+# ---------- 1. 调光曲线 ----------
+def _paint(row: np.ndarray, start: float, end: float, ramp: float, per_min: float,
+           shape: str, max_level: int):
+    """在 row 上叠加一个窗口 [start, end)（分钟）；平台段直接整段赋值，只有渐变段逐点计算"""
+    i0 = max(int(np.ceil(start * per_min)), 0)
+    i1 = min(int(np.ceil(end * per_min)), len(row))
+    if i0 >= i1:
+        return
+    if ramp > 0:
+        a = min(max(int(np.ceil((start + ramp) * per_min)), i0), i1)
+        b = min(max(int(np.ceil((end - ramp) * per_min)), a), i1)
+    else:
+        a, b = i0, i1
+    np.maximum(row[a:b], max_level, out=row[a:b])
+    for lo, hi in ((i0, a), (b, i1)):
+        if lo >= hi:
+            continue
+        t = np.arange(lo, hi) / per_min
+        f = np.clip(np.minimum(t - start, end - t) / ramp, 0.0, 1.0)
+        if shape == "cosine":
+            f = 0.5 - 0.5 * np.cos(np.pi * f)
+        level = np.rint(f * max_level).astype(np.uint8)
+        np.maximum(row[lo:hi], level, out=row[lo:hi])
+
+
+def ramp_levels(start_minute, duration_minute, prev_start_minute=None, prev_duration_minute=None, *,
+                ramp_minutes: float = 30, resolution_s: int = 60, max_level: int = 100,
+                shape: str = "cosine", preserve_integral: bool = False) -> np.ndarray:
+    """
+    一天的调光表 (通道数, 86400 / resolution_s)，uint8。
+    prev_*：前一天的窗口，跨零点的部分计入当天凌晨。
+    渐变段不超过窗口的一半；preserve_integral=True 时渐变以窗口边界为中心，亮度积分与同时长的开关灯相同。
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"未知渐变形状 {shape!r}，可选：{', '.join(SHAPES)}")
+    if 86400 % resolution_s:
+        raise ValueError("resolution_s 必须能整除 86400")
+    per_min = 60.0 / resolution_s
+    start = np.atleast_1d(np.asarray(start_minute, dtype=float))
+    duration = np.atleast_1d(np.asarray(duration_minute, dtype=float))
+    windows = [(start, duration, 0.0)]
+    if prev_start_minute is not None:
+        windows.append((np.atleast_1d(np.asarray(prev_start_minute, dtype=float)),
+                        np.atleast_1d(np.asarray(prev_duration_minute, dtype=float)), -MINUTES_PER_DAY))
+
+    levels = np.zeros((len(start), 86400 // resolution_s), dtype=np.uint8)
+    for starts, durations, offset in windows:
+        for row, s0, dur in zip(levels, starts + offset, durations):
+            if dur <= 0:
+                continue
+            ramp = min(ramp_minutes, dur / 2.0)
+            s1, e1 = (s0 - ramp / 2, s0 + dur + ramp / 2) if preserve_integral else (s0, s0 + dur)
+            _paint(row, s1, e1, ramp, per_min, shape, max_level)
+    return levels
+
+
+# ---------- 2. 每日调光表 ----------
+class DimmingTable:
+    """某一天全部通道的调光表"""
+
+    def __init__(self, day: date, channels: list[str], levels: np.ndarray, resolution_s: int):
+        self.day = day
+        self.channels = list(channels)
+        self.levels = levels                 # (C, T) uint8
+        self.levels.flags.writeable = False
+        self.resolution_s = resolution_s
+
+    def column(self, now: datetime) -> int:
+        seconds = now.hour * 3600 + now.minute * 60 + now.second
+        return seconds // self.resolution_s
+
+    def levels_at(self, now: datetime) -> np.ndarray:
+        """当前时刻各通道亮度 (C,)，只做一次下标取值"""
+        return self.levels[:, self.column(now)]
+
+    def channel_levels(self, now: datetime) -> dict[str, int]:
+        return dict(zip(self.channels, self.levels_at(now).tolist()))
+
+
+def windows_for_day(day: date, channels: list[str]):
+    """
+    各通道当天的开灯窗口：(开灯分钟, 时长分钟, 是否有自动来源)
+    批次通道按批次方案（分钟精度），其余按 config{date}.json（小时精度）
+    """
+    n = len(channels)
+    start = np.zeros(n)
+    duration = np.zeros(n)
+    known = np.zeros(n, dtype=bool)
+
+    auto = load_auto_schedule(day)
+    for i, key in enumerate(channels):
+        if key in auto:
+            on, off = auto[key]
+            start[i], duration[i], known[i] = on * 60, ((off - on) % 24) * 60, True
+
+    registry = load_registry()
+    if registry is not None and registry.channels:
+        index = {c: i for i, c in enumerate(registry.channels)}
+        rows = np.array([i for i, c in enumerate(channels) if c in index], dtype=np.int64)
+        if len(rows):
+            batch = registry.channel_batch[[index[channels[i]] for i in rows]]
+            d = day.toordinal() - registry.start_ordinal[batch]
+            valid = (d >= 0) & (d < registry.length[batch])
+            col = np.clip(d, 0, registry.hours.shape[1] - 1)
+            start[rows] = registry.start_minute[batch, col]
+            duration[rows] = np.where(valid, np.nan_to_num(registry.hours[batch, col]) * 60, 0.0)
+            known[rows] = True
+    return start, duration, known
+
+
+def build_day_table(day: date, channels: list[str], **ramp_options) -> tuple[DimmingTable, np.ndarray]:
+    """返回 (调光表, 是否有自动来源)；没有自动来源的通道整天为 0，由调度器按手动设置处理"""
+    start, duration, known = windows_for_day(day, channels)
+    prev_start, prev_duration, _ = windows_for_day(day - timedelta(days=1), channels)
+    resolution_s = ramp_options.get("resolution_s", 60)
+    levels = ramp_levels(start, duration, prev_start, prev_duration, **ramp_options)
+    return DimmingTable(day, channels, levels, resolution_s), known
+
+
+_tables = {}            # (day, channels, options) -> (修订号, 表, known)
+_tables_lock = threading.Lock()
+
+
+def day_table(day: date, channels: list[str], **ramp_options) -> tuple[DimmingTable, np.ndarray]:
+    """按天缓存的调光表；当天/前一天的自动配置或批次文件改写后重新生成"""
+    revision = (file_revision(auto_config_file(day)), file_revision(auto_config_file(day - timedelta(days=1))),
+                file_revision(BATCH_FILE))
+    key = (day, tuple(channels), tuple(sorted(ramp_options.items())))
+    with _tables_lock:
+        entry = _tables.get(key)
+        if entry is not None and entry[0] == revision:
+            return entry[1], entry[2]
+    table, known = build_day_table(day, channels, **ramp_options)
+    with _tables_lock:
+        _tables[key] = (revision, table, known)
+        for old in [k for k in _tables if k[0] < day - timedelta(days=1)]:
+            del _tables[old]
+    return table, known
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 1000
+    t0 = time.perf_counter()
+    levels = ramp_levels(rng.integers(0, 1440, n), rng.uniform(240, 960, n), ramp_minutes=45,
+                         resolution_s=1, preserve_integral=True)
+    print(f"{n} 个通道逐秒调光表：{(time.perf_counter() - t0) * 1000:.0f} ms，"
+          f"{levels.nbytes / 1e6:.1f} MB")
+    # 窗口跨零点：前一天 20:00 开始的部分落在当天凌晨，两段合起来才是完整的 8 小时
+    demo = ramp_levels([20 * 60], [8 * 60], [20 * 60], [8 * 60], ramp_minutes=30, preserve_integral=True)[0]
+    print("每天 20:00 开灯 8 小时，当天积分 =", demo.sum() / 100 / 60, "h；19:45-20:20 亮度",
+          demo[19 * 60 + 45:20 * 60 + 20:5].tolist())
@@ -0,0 +1,145 @@
+"""
+光周期日程平滑（仅依赖 NumPy）
+沿最后一维平滑，二维输入时逐行独立处理；边界按 nearest 延拓。
+所有核的计算量都是 O(n)，与 sigma / 窗口宽度无关：
+  gaussian        Young–van Vliet 三阶递归（IIR）高斯近似
+  moving_average  前缀和滑动平均
+  cosine          相邻阶段之间的余弦过渡（半正弦核，复数前缀和实现）
+preserve_total=True 时按行等比例缩放，使平滑后总光照时长与原始日程完全一致；
+缩放后超过 max_hours（一天 24 h）的天截到上限，差额按比例分给其余天，总量不变。
+"""
+import numpy as np
+
+KERNELS = ("gaussian", "moving_average", "cosine")
+
+
+def smooth(x, kernel: str = "gaussian", *, sigma: float = 2.0, width: int = 5,
+           lengths=None, preserve_total: bool = False, max_hours: float = 24.0) -> np.ndarray:
+    """
+    x:       一维日程，或 (方案数, 天数) 矩阵
+    lengths: 二维输入时每行的有效天数，超出部分的返回值无意义
+    """
+    x = np.asarray(x, dtype=float)
+    squeeze = x.ndim == 1
+    rows = x[None, :] if squeeze else x
+    if rows.ndim != 2:
+        raise ValueError("只支持一维或二维输入")
+    n = rows.shape[1]
+    lengths = np.full(len(rows), n) if lengths is None else np.asarray(lengths, dtype=np.int64)
+    if np.any(lengths < 1) or np.any(lengths > n):
+        raise ValueError("lengths 超出范围")
+
+    # 有效长度之后用该行最后一个值填充，相当于逐行 nearest 延拓
+    cols = np.arange(n)
+    last = rows[np.arange(len(rows)), lengths - 1]
+    rows = np.where(cols < lengths[:, None], rows, last[:, None])
+
+    if kernel == "gaussian":
+        out = _gaussian_iir(rows, lengths, sigma)
+    elif kernel == "moving_average":
+        out = _moving_average(rows, _check_width(width))
+    elif kernel == "cosine":
+        out = _cosine_ramp(rows, _check_width(width))
+    else:
+        raise ValueError(f"未知平滑核 {kernel!r}，可选：{', '.join(KERNELS)}")
+
+    if preserve_total:
+        valid = cols < lengths[:, None]
+        raw_total = np.where(valid, rows, 0.0).sum(axis=1)
+        new_total = np.where(valid, out, 0.0).sum(axis=1)
+        scale = np.divide(raw_total, new_total, out=np.ones_like(raw_total), where=new_total != 0)
+        out = _cap_preserving_total(out * scale[:, None], valid, max_hours)
+    else:
+        out = np.minimum(out, max_hours)
+
+    return out[0] if squeeze else out
+
+
+def _cap_preserving_total(out: np.ndarray, valid: np.ndarray, cap: float) -> np.ndarray:
+    """超过 cap 的天截到 cap，截掉的量按比例加到未达上限的天；每轮至少多一天到达上限"""
+    for _ in range(out.shape[1]):
+        over = valid & (out > cap)
+        if not over.any():
+            break
+        excess = np.where(over, out - cap, 0.0).sum(axis=1)
+        out = np.where(over, cap, out)
+        weight = np.where(valid & (out < cap), out, 0.0)
+        room = weight.sum(axis=1)
+        out = out + np.divide(excess, room, out=np.zeros_like(room), where=room > 0)[:, None] * weight
+    return out
+
+
+def _check_width(width: int) -> int:
+    width = int(width)
+    if width < 1:
+        raise ValueError("窗口宽度必须为正整数")
+    return width
+
+
+def _pad_nearest(rows: np.ndarray, width: int) -> np.ndarray:
+    left = (width - 1) // 2
+    right = width - 1 - left
+    return np.concatenate([np.repeat(rows[:, :1], left, axis=1), rows,
+                           np.repeat(rows[:, -1:], right, axis=1)], axis=1)
+
+
+def _moving_average(rows: np.ndarray, width: int) -> np.ndarray:
+    padded = _pad_nearest(rows, width)
+    csum = np.concatenate([np.zeros((len(rows), 1)), np.cumsum(padded, axis=1)], axis=1)
+    return (csum[:, width:] - csum[:, :-width]) / width
+
+
+def _cosine_ramp(rows: np.ndarray, width: int) -> np.ndarray:
+    """
+    阶跃与归一化半正弦核卷积，结果正好是 0.5 - 0.5·cos 形状的过渡。
+    sin(θ(j+0.5)) = Im(e^{iθ(j+0.5)})，窗口求和化为复数前缀和之差，O(n)。
+    """
+    n = rows.shape[1]
+    theta = np.pi / width
+    norm = np.sin(theta * (np.arange(width) + 0.5)).sum()
+    padded = _pad_nearest(rows, width)
+    k = np.arange(padded.shape[1])
+    csum = np.concatenate([np.zeros((len(rows), 1), dtype=complex),
+                           np.cumsum(padded * np.exp(1j * theta * k), axis=1)], axis=1)
+    window = csum[:, width:width + n] - csum[:, :n]
+    phase = np.exp(1j * theta * (0.5 - np.arange(n)))
+    return (phase * window).imag / norm
+
+
+def _yvv_coefficients(sigma: float):
+    """Young & van Vliet (1995) 递归高斯系数"""
+    if sigma < 0.5:
+        raise ValueError("sigma 不能小于 0.5")
+    if sigma >= 2.5:
+        q = 0.98711 * sigma - 0.96330
+    else:
+        q = 3.97156 - 4.14554 * np.sqrt(1.0 - 0.26891 * sigma)
+    b0 = 1.57825 + 2.44413 * q + 1.4281 * q ** 2 + 0.422205 * q ** 3
+    b1 = (2.44413 * q + 2.85619 * q ** 2 + 1.26661 * q ** 3) / b0
+    b2 = -(1.4281 * q ** 2 + 1.26661 * q ** 3) / b0
+    b3 = 0.422205 * q ** 3 / b0
+    return 1.0 - (b1 + b2 + b3), b1, b2, b3
+
+
+def _gaussian_iir(rows: np.ndarray, lengths: np.ndarray, sigma: float) -> np.ndarray:
+    """正向 + 反向三阶递归，循环沿天数展开、各行同时计算；初始状态取边界值的稳态"""
+    gain, b1, b2, b3 = _yvv_coefficients(sigma)
+    n = rows.shape[1]
+
+    fwd = np.empty_like(rows)
+    w1 = w2 = w3 = rows[:, 0]
+    for t in range(n):
+        cur = gain * rows[:, t] + b1 * w1 + b2 * w2 + b3 * w3
+        fwd[:, t] = cur
+        w1, w2, w3 = cur, w1, w2
+
+    out = np.empty_like(rows)
+    last = fwd[np.arange(len(rows)), lengths - 1]
+    y1 = y2 = y3 = last
+    for t in range(n - 1, -1, -1):
+        cur = gain * fwd[:, t] + b1 * y1 + b2 * y2 + b3 * y3
+        # 每行从自己的最后一个有效值开始反向递归
+        cur = np.where(t >= lengths, last, cur)
+        out[:, t] = cur
+        y1, y2, y3 = cur, y1, y2
+    return out
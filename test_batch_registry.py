@@ -0,0 +1,86 @@
+"""
+批次登记测试：新增 / 替换 / 删除批次后经 .npz 往返，resolve 结果不变且与逐通道计算一致
+运行：python -m pytest -q test_batch_registry.py
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from batch_registry import BatchRegistry, load_registry
+
+START = date(2025, 3, 1)
+
+
+def _expected_on(hours, start_minutes, start_date: date, now: datetime) -> bool:
+    """逐个窗口判断：当天窗口或前一天跨零点的窗口覆盖 now"""
+    for offset in (0, 1):
+        d = (now.date() - start_date).days - offset
+        if 0 <= d < len(hours):
+            on = datetime.combine(start_date + timedelta(days=d), datetime.min.time()) \
+                 + timedelta(minutes=int(start_minutes[d]))
+            if on <= now < on + timedelta(hours=float(hours[d])):
+                return True
+    return False
+
+
+def _sample_registry():
+    registry = BatchRegistry()
+    a_hours = np.linspace(6, 12, 20)
+    registry.add("A", START, a_hours, ["a1", "a2"])                              # 20:00 开灯，跨零点
+    registry.add("B", START + timedelta(days=5), np.full(30, 10.0), ["b1"], start_minutes=6 * 60)
+    registry.add("C", START - timedelta(days=3), np.full(8, 14.0), ["c1", "a2"])  # a2 改归 C
+    return registry
+
+
+def _assert_same(a: BatchRegistry, b: BatchRegistry, times):
+    assert a.names == b.names and a.channels == b.channels
+    for now in times:
+        ra, rb = a.resolve(now), b.resolve(now)
+        for key in ("on", "day", "hours"):
+            np.testing.assert_array_equal(ra[key], rb[key])
+
+
+def test_round_trip_and_resolve(tmp_path):
+    registry = _sample_registry()
+    assert registry.channels == ["a1", "a2", "b1", "c1"]
+    assert [registry.names[i] for i in registry.channel_batch] == ["A", "C", "B", "C"]
+
+    path = tmp_path / "batches.npz"
+    registry.save(path)
+    loaded = load_registry(path)
+    times = [datetime.combine(START, datetime.min.time()) + timedelta(minutes=m) for m in range(0, 40 * 1440, 97)]
+    _assert_same(registry, loaded, times)
+
+    plans = {name: (registry.hours[i, :registry.length[i]], registry.start_minute[i],
+                    date.fromordinal(int(registry.start_ordinal[i]))) for i, name in enumerate(registry.names)}
+    for now in times:
+        states = loaded.channel_states(now)
+        for channel, batch in zip(loaded.channels, loaded.channel_batch):
+            assert states[channel] == _expected_on(*plans[loaded.names[batch]], now), (channel, now)
+
+
+def test_remove_and_replace_round_trip(tmp_path):
+    registry = _sample_registry()
+    registry.remove("A")
+    assert registry.names == ["B", "C"] and registry.channels == ["a2", "b1", "c1"]
+    assert [registry.names[i] for i in registry.channel_batch] == ["C", "B", "C"]
+
+    registry.add("B", START, np.full(10, 8.0), ["b1", "b2"])                   # 同名替换
+    assert registry.names == ["C", "B"] and registry.channels == ["a2", "c1", "b1", "b2"]
+
+    path = tmp_path / "batches.npz"
+    registry.save(path)
+    loaded = load_registry(path)
+    times = [datetime(2025, 3, 1, 21, 30) + timedelta(hours=h) for h in range(0, 24 * 15, 5)]
+    _assert_same(registry, loaded, times)
+    # 文件不变时直接复用缓存对象；改写后重新读取
+    assert load_registry(path) is loaded
+    registry.remove("C")
+    registry.save(path)
+    reloaded = load_registry(path)
+    assert reloaded is not loaded and reloaded.names == ["B"] and reloaded.channels == ["b1", "b2"]
+
+
+def test_missing_file(tmp_path):
+    assert load_registry(tmp_path / "none.npz") is None
+    assert BatchRegistry().channel_states(datetime(2025, 3, 1)) == {}
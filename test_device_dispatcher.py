@@ -0,0 +1,107 @@
+"""
+设备调度器测试：用 SimulatedBus 代替 PLC / 485 从站，不需要硬件
+运行：python -m pytest -q test_device_dispatcher.py
+"""
+import asyncio
+import time
+from datetime import datetime
+
+from device_dispatcher import PLC_COILS, BusChannel, led_on, plc_targets
+from device_sim import SimulatedBus
+
+FAST = {"baudrate": 1_000_000, "turnaround": 0.0}
+
+
+async def _sync(channel: BusChannel, values, timeout: float = 5.0):
+    channel.submit(values)
+    await asyncio.wait_for(channel.wait_synced(), timeout)
+
+
+def _run(coro_fn, channel: BusChannel):
+    """启动总线协程，执行测试步骤后取消"""
+    async def main():
+        worker = asyncio.create_task(channel.run())
+        try:
+            return await coro_fn()
+        finally:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+    return asyncio.run(main())
+
+
+def test_registers_fc16_coalesced_into_one_span():
+    bus = SimulatedBus("rs485", kind="register", size=8, **FAST)
+    channel = BusChannel("rs485", bus, 8, max_frame=123)
+
+    async def steps():
+        await _sync(channel, [0] * 8)
+        bus.frames.clear()
+        target = [0, 0, 50, 0, 0, 100, 0, 0]
+        await _sync(channel, target)
+        return target
+
+    target = _run(steps, channel)
+    # 只改了 2、5 两个地址：一帧写 2..5 的连续段
+    assert bus.frames == [(2, [50, 0, 0, 100])]
+    assert bus.values == target and channel.acked == target
+
+
+def test_coils_fc15_span_split_at_frame_limit():
+    bus = SimulatedBus("plc", kind="coil", size=len(PLC_COILS), **FAST)
+    channel = BusChannel("plc", bus, len(PLC_COILS), max_frame=4)
+    target = [1, 0, 1, 1, 0, 1]
+
+    async def steps():
+        await _sync(channel, target)
+
+    _run(steps, channel)
+    assert [address for address, _ in bus.frames] == [0, 4]
+    assert all(len(values) <= 4 for _, values in bus.frames)
+    assert bus.values == target
+
+
+def test_retry_with_backoff_under_drop_rate():
+    # seed=7 时前两帧丢失、第三帧成功
+    bus = SimulatedBus("rs485", kind="register", size=4, drop_rate=0.5, seed=7, **FAST)
+    channel = BusChannel("rs485", bus, 4, max_frame=123, retries=3, backoff=0.02)
+    started = time.perf_counter()
+
+    async def steps():
+        await _sync(channel, [1, 2, 3, 4])
+
+    _run(steps, channel)
+    assert channel.stats.retries == 2 and channel.stats.failures == 0
+    assert time.perf_counter() - started >= 0.02 + 0.04      # 退避 0.02、0.04 s
+    assert bus.values == [1, 2, 3, 4]
+
+
+def test_resend_after_failed_write():
+    bus = SimulatedBus("plc", kind="coil", size=4, drop_rate=1.0, **FAST)
+    channel = BusChannel("plc", bus, 4, max_frame=1968, retries=1, backoff=0.001)
+
+    async def steps():
+        channel.submit([1, 1, 0, 1])
+        while channel.stats.failures == 0:
+            await asyncio.sleep(0.005)
+        assert channel.acked == [None] * 4 and bus.values == [0] * 4
+        bus.drop_rate = 0.0                  # 从站恢复
+        channel.resend()
+        await asyncio.wait_for(channel.wait_synced(), 5.0)
+
+    _run(steps, channel)
+    assert bus.values == [1, 1, 0, 1] and channel.acked == [1, 1, 0, 1]
+    assert channel.stats.failures == 1
+
+
+def test_led_on_window_across_midnight():
+    conf = {"top_led": {"mode": "manual", "enable": True, "start_hour": 20, "stop_hour": 5}}
+    on = [h for h in range(24) if led_on("top_led", conf, datetime(2025, 3, 1, h), {})]
+    assert on == [0, 1, 2, 3, 4, 20, 21, 22, 23]
+
+    # auto 模式按当日排程，同样可以跨零点
+    auto = {"top_led": {"mode": "auto"}}
+    on = [h for h in range(24) if led_on("top_led", auto, datetime(2025, 3, 1, h), {"top_led": (22, 2)})]
+    assert on == [0, 1, 22, 23]
+
+    coils = plc_targets(conf, datetime(2025, 3, 1, 23), {})
+    assert coils[PLC_COILS.index("top_led")] == 1 and len(coils) == len(PLC_COILS)
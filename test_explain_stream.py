@@ -0,0 +1,103 @@
+"""
+流式解释测试：用本地假模型代替 DeepSeek，不需要网络
+运行：python -m pytest -q test_explain_stream.py
+"""
+import asyncio
+import threading
+import time
+
+from plan_cache import PlanCache
+from photoperiod_tool import OFFLINE_NOTE, StreamingExplanation, stream_explanation
+
+PARAMS = (30, 4, 9, 8)
+TOKENS = ["前期短光照", "，", "后期延长光照", "，", "总光照不变。"]
+
+
+def _fake_model(delay: float = 0.05, fail_after: int | None = None):
+    async def source(params, calc):
+        for i, token in enumerate(TOKENS):
+            if fail_after is not None and i == fail_after:
+                raise ConnectionError("模型不可用")
+            await asyncio.sleep(delay)
+            yield token
+    return source
+
+
+def _cache(tmp_path):
+    return PlanCache(lambda **params: None, "test", tmp_path)
+
+
+def test_tokens_arrive_incrementally_and_are_cached(tmp_path):
+    cache = _cache(tmp_path)
+    started = time.perf_counter()
+    stream = stream_explanation(*PARAMS, token_source=_fake_model(), cache=cache)
+    first = next(stream)
+    first_latency = time.perf_counter() - started
+    rest = list(stream)
+    total = time.perf_counter() - started
+
+    assert [first] + rest == TOKENS
+    # 首 token 只等一个 token 的时间，而不是整段回答
+    assert first_latency < total / 2
+    assert cache.peek(*PARAMS) == {"text": "".join(TOKENS), "source": "llm"}
+
+    # 第二次直接命中缓存，一次给出全文，不再调用模型
+    assert list(stream_explanation(*PARAMS, token_source=_fake_model(fail_after=0), cache=cache)) == ["".join(TOKENS)]
+
+
+def test_failure_before_first_token_uses_template(tmp_path):
+    cache = _cache(tmp_path)
+    chunks = list(stream_explanation(*PARAMS, token_source=_fake_model(fail_after=0), cache=cache))
+    assert len(chunks) == 1 and chunks[0].endswith(OFFLINE_NOTE)
+    assert cache.peek(*PARAMS) is None      # 模板不落盘，模型恢复后重新请求
+
+
+def test_failure_mid_stream_keeps_partial_output(tmp_path):
+    cache = _cache(tmp_path)
+    chunks = list(stream_explanation(*PARAMS, token_source=_fake_model(fail_after=2), cache=cache))
+    assert chunks[:2] == TOKENS[:2] and "中断" in chunks[-1]
+    assert cache.peek(*PARAMS) is None
+
+
+def test_background_consumer_does_not_block(tmp_path):
+    cache = _cache(tmp_path)
+    started = time.perf_counter()
+    explanation = StreamingExplanation(*PARAMS, token_source=_fake_model(delay=0.05), cache=cache)
+    # 构造立即返回，页面只读取已到达的部分
+    assert time.perf_counter() - started < 0.05 and not explanation.done
+    assert explanation.wait(5.0) == "".join(TOKENS) and explanation.done
+    assert cache.peek(*PARAMS) == {"text": "".join(TOKENS), "source": "llm"}
+
+
+def test_background_consumer_cancel(tmp_path):
+    cache = _cache(tmp_path)
+    explanation = StreamingExplanation(*PARAMS, token_source=_fake_model(delay=0.05), cache=cache)
+    explanation.cancel()
+    explanation.wait(5.0)
+    assert explanation.done and len(explanation.parts) < len(TOKENS)
+    assert cache.peek(*PARAMS) is None
+
+
+def test_cancel_during_slow_token_returns_promptly(tmp_path):
+    cache = _cache(tmp_path)
+    closed = threading.Event()
+
+    async def slow_model(params, calc):
+        try:
+            yield TOKENS[0]
+            await asyncio.sleep(5.0)
+            yield TOKENS[1]
+        finally:
+            closed.set()
+
+    explanation = StreamingExplanation(*PARAMS, token_source=slow_model, cache=cache)
+    deadline = time.perf_counter() + 2.0
+    while not explanation.parts and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    started = time.perf_counter()
+    explanation.cancel()
+    # 不等下一个 token：读取线程立即结束，模型端的异步生成器也被关闭
+    assert explanation.wait(1.0) == TOKENS[0] and explanation.done
+    assert time.perf_counter() - started < 0.5
+    assert closed.wait(1.0)
+    assert cache.peek(*PARAMS) is None
@@ -0,0 +1,51 @@
+"""
+冷启动预算测试：控制页面依赖的计算模块只能导入 NumPy，LLM 相关依赖必须延迟到第一次使用
+运行：python -m pytest -q test_import_time.py  或  python test_import_time.py
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# 单独导入的耗时上限（秒），边缘设备上留足余量
+IMPORT_BUDGET = 1.0
+FORBIDDEN = ("autogen_agentchat", "autogen_ext", "autogen_core", "openai", "dotenv", "scipy", "streamlit")
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _probe(module: str) -> dict:
+    """在全新解释器里导入模块，返回耗时和已加载的模块列表"""
+    out = subprocess.run([sys.executable, "-c", _PROBE.format(module=module)],
+                         cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _loaded(modules, names):
+    return [m for m in modules if m.split(".")[0] in names]
+
+
+def test_photoperiod_imports_numpy_only():
+    result = _probe("photoperiod")
+    assert not _loaded(result["modules"], FORBIDDEN), _loaded(result["modules"], FORBIDDEN)
+    assert result["elapsed"] < IMPORT_BUDGET, f"photoperiod 导入耗时 {result['elapsed']:.3f}s"
+
+
+def test_light_agent_is_lazy():
+    result = _probe("light_agent")
+    assert not _loaded(result["modules"], FORBIDDEN), _loaded(result["modules"], FORBIDDEN)
+    assert result["elapsed"] < IMPORT_BUDGET, f"light_agent 导入耗时 {result['elapsed']:.3f}s"
+
+
+if __name__ == "__main__":
+    for name in ("photoperiod", "light_agent"):
+        r = _probe(name)
+        print(f"{name}: {r['elapsed'] * 1000:.0f} ms，禁止依赖 {_loaded(r['modules'], FORBIDDEN) or '无'}")
@@ -0,0 +1,45 @@
+"""
+每日光照计划测试：.plan 定位读取；只有 csv 时起始日期取自日期列，与文件修改时间无关
+运行：python -m pytest -q test_light_plan.py
+"""
+import logging
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from light_plan import CSV_FILE_NAME, PLAN_FILE_NAME, load_plan, read_day, write_plan
+
+START = date(2025, 3, 1)
+HOURS = [4.0, 5.5, 7.25, 9.0]
+
+
+def test_binary_plan(tmp_path):
+    write_plan(START, HOURS, tmp_path)
+    plan = load_plan(tmp_path)
+    assert plan.start_date == START
+    np.testing.assert_array_equal(plan.hours, np.float32(HOURS))
+    assert read_day(START + timedelta(days=2), tmp_path) == 7.25
+    assert read_day(START - timedelta(days=1), tmp_path) is None
+
+
+def test_csv_start_date_survives_copy(tmp_path, caplog):
+    write_plan(START, HOURS, tmp_path)
+    (tmp_path / PLAN_FILE_NAME).unlink()
+    # 模拟检出 / 复制：修改时间变成别的日子
+    stamp = datetime(2025, 6, 30, 12).timestamp()
+    os.utime(tmp_path / CSV_FILE_NAME, (stamp, stamp))
+    with caplog.at_level(logging.WARNING, logger="light_plan"):
+        plan = load_plan(tmp_path)
+    assert plan.start_date == START and not caplog.records
+    assert read_day(START + timedelta(days=3), tmp_path) == 9.0
+
+
+def test_legacy_csv_falls_back_to_mtime_with_warning(tmp_path, caplog):
+    (tmp_path / CSV_FILE_NAME).write_text("day,light_hours\n1,4.0\n2,6.0\n", encoding="utf-8")
+    stamp = datetime(2025, 6, 30, 12).timestamp()
+    os.utime(tmp_path / CSV_FILE_NAME, (stamp, stamp))
+    with caplog.at_level(logging.WARNING, logger="light_plan"):
+        plan = load_plan(tmp_path)
+    assert plan.start_date == date(2025, 6, 30) and plan.hours.tolist() == [4.0, 6.0]
+    assert any("没有日期列" in r.getMessage() for r in caplog.records)
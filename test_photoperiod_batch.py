@@ -0,0 +1,38 @@
+"""
+批量光周期测试：批量结果逐行等于单个方案（不同天数的方案在同一矩阵里互不影响）
+运行：python -m pytest -q test_photoperiod_batch.py
+"""
+import numpy as np
+import pytest
+
+from photoperiod import calc_photoperiod, calc_photoperiod_batch
+
+PARAMS = [(30, 4, 9, 8), (50, 4, 9, 8), (21, 6, 16, 10), (45, 8, 18, 12.5), (7, 0, 24, 12)]
+SCALARS = ("stage1_days", "stage1_pp", "stage2_days", "stage2_pp", "stage3_days", "stage3_pp", "total_pp_check")
+
+
+@pytest.mark.parametrize("smoothing", ["gaussian", "moving_average", "cosine"])
+def test_batch_rows_equal_scalar(smoothing):
+    days, h_min, h_max, h_ave = map(np.array, zip(*PARAMS))
+    batch = calc_photoperiod_batch(days, h_min, h_max, h_ave, smoothing=smoothing)
+    assert batch["daily_schedule"].shape == (len(PARAMS), days.max())
+    for i, params in enumerate(PARAMS):
+        single = calc_photoperiod(*params, smoothing=smoothing)
+        for name in SCALARS:
+            assert batch[name][i] == single[name], (params, name)
+        row = batch["daily_schedule"][i]
+        assert row[:params[0]].tolist() == single["daily_schedule"]
+        assert np.isnan(row[params[0]:]).all()
+
+
+def test_broadcast_sweep():
+    # 一个参数取数组、其余取标量，按广播规则展开
+    batch = calc_photoperiod_batch(40, 4, 9, np.array([5.0, 6.0, 7.0, 8.0]))
+    assert batch["daily_schedule"].shape == (4, 40)
+    for i, h_ave in enumerate([5.0, 6.0, 7.0, 8.0]):
+        assert batch["total_pp_check"][i] == calc_photoperiod(40, 4, 9, h_ave)["total_pp_check"]
+
+
+def test_invalid_rows_rejected():
+    with pytest.raises(ValueError):
+        calc_photoperiod_batch([30, 30], [4, 10], [9, 9], [8, 8])
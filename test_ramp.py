@@ -0,0 +1,33 @@
+"""
+调光表测试：preserve_integral 下亮度积分等于窗口时长（含跨零点窗口）
+运行：python -m pytest -q test_ramp.py
+"""
+import numpy as np
+import pytest
+
+from ramp import ramp_levels
+
+
+def _hours(levels: np.ndarray, resolution_s: int = 60) -> float:
+    """一行调光表的亮度积分，折算为满亮度小时数"""
+    return levels.sum() / 100 * resolution_s / 3600
+
+
+@pytest.mark.parametrize("shape", ["cosine", "linear"])
+def test_integral_across_midnight_with_previous_window(shape):
+    # 每天 20:00 开 9 小时：当天 20:00-24:00 与前一天延续到 05:00 的部分合计 9 小时
+    levels = ramp_levels([20 * 60], [9 * 60], [20 * 60], [9 * 60], ramp_minutes=30,
+                         shape=shape, preserve_integral=True)[0]
+    assert _hours(levels) == 9.0
+
+
+def test_integral_within_one_day():
+    levels = ramp_levels([6 * 60], [9 * 60], ramp_minutes=45, preserve_integral=True)[0]
+    assert _hours(levels) == 9.0
+    assert levels[6 * 60 - 23] == 0 and levels[12 * 60] == 100
+
+
+def test_integral_per_second_resolution():
+    levels = ramp_levels([20 * 60], [9 * 60], [20 * 60], [9 * 60], ramp_minutes=30, resolution_s=1,
+                         shape="linear", preserve_integral=True)[0]
+    assert _hours(levels, 1) == pytest.approx(9.0, abs=1e-4)
@@ -0,0 +1,66 @@
+"""
+平滑核测试：preserve_total 保持每行总光照且任何一天不超过 24 h；O(n) 核与直接卷积一致
+运行：python -m pytest -q test_smoothing.py
+"""
+import numpy as np
+import pytest
+
+from photoperiod import calc_photoperiod_batch
+from smoothing import KERNELS, smooth
+
+
+def _steps(rng, rows: int, n: int) -> np.ndarray:
+    """随机三段阶跃日程，取值 0-24 h"""
+    x = np.empty((rows, n))
+    for row in x:
+        a, b = np.sort(rng.integers(0, n, 2))
+        lo, mid, hi = np.sort(rng.uniform(0, 24, 3))
+        row[:a], row[a:b], row[b:] = lo, mid, hi
+    return x
+
+
+@pytest.mark.parametrize("kernel", KERNELS)
+def test_preserve_total_keeps_budget_and_cap(kernel):
+    rng = np.random.default_rng(0)
+    x = _steps(rng, 200, 60)
+    x[::7, 30:] = 24.0                      # 贴着上限的日程最容易在平滑后越界
+    lengths = rng.integers(5, 61, len(x))
+    out = smooth(x, kernel, lengths=lengths, preserve_total=True)
+    valid = np.arange(x.shape[1]) < lengths[:, None]
+    np.testing.assert_allclose(np.where(valid, out, 0).sum(axis=1), np.where(valid, x, 0).sum(axis=1),
+                               rtol=1e-12)
+    assert out[valid].max() <= 24.0
+    assert out[valid].min() >= 0.0
+
+
+@pytest.mark.parametrize("kernel", KERNELS)
+def test_photoperiod_plans_never_exceed_24h(kernel):
+    batch = calc_photoperiod_batch([7, 30, 50, 50], [0, 4, 12, 20], [24, 24, 24, 24], [12, 20, 23, 23.5],
+                                   smoothing=kernel)
+    assert np.nanmax(batch["daily_schedule"]) <= 24.0
+
+
+def test_moving_average_matches_convolution():
+    x = _steps(np.random.default_rng(1), 1, 40)[0]
+    width = 5
+    padded = np.pad(x, (width // 2, width // 2), mode="edge")
+    expected = np.convolve(padded, np.ones(width) / width, mode="valid")
+    np.testing.assert_allclose(smooth(x, "moving_average", width=width), expected, rtol=1e-12)
+
+
+def test_gaussian_iir_close_to_exact_gaussian():
+    x = _steps(np.random.default_rng(2), 1, 80)[0]
+    sigma = 2.0
+    k = np.arange(-8, 9)
+    kernel = np.exp(-0.5 * (k / sigma) ** 2)
+    expected = np.convolve(np.pad(x, 8, mode="edge"), kernel / kernel.sum(), mode="valid")
+    # 递归近似误差在阶跃高度的几个百分点以内
+    assert np.abs(smooth(x, "gaussian", sigma=sigma) - expected).max() < 0.05 * np.ptp(x) + 1e-9
+
+
+def test_rows_are_independent():
+    x = _steps(np.random.default_rng(3), 5, 50)
+    lengths = np.array([50, 20, 35, 10, 50])
+    together = smooth(x, "gaussian", lengths=lengths, preserve_total=True)
+    for row, n, expected in zip(x, lengths, together):
+        np.testing.assert_allclose(smooth(row[:n], "gaussian", preserve_total=True), expected[:n], rtol=1e-12)
@@ -0,0 +1,125 @@
+"""
+峰谷电价开灯规划测试：相邻两天窗口不重叠且留足暗期；电费不高于固定开灯；小规模时与穷举最优一致；
+写成逐日配置后按调度器规则实际亮灯的时段与方案一致
+运行：python -m pytest -q test_tou_planner.py
+"""
+import itertools
+import json
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+
+from tou_planner import DEFAULT_TOU, MINUTES_PER_DAY, load_tou, minute_prices, plan_on_windows
+
+
+def _assert_feasible(plan, min_dark_hours):
+    """当日窗口：不跨零点且相邻两天留足暗期；固定起点：每天同一时刻"""
+    start, duration, fixed = plan["start_minute"], plan["duration_minute"], plan["fixed_start"]
+    dark = np.minimum(int(min_dark_hours * 60), MINUTES_PER_DAY - duration)
+    within = ~fixed
+    assert (start[within] + duration[within] <= MINUTES_PER_DAY).all()
+    gaps_ok = (start[:, :-1] + duration[:, :-1] + dark[:, :-1]) <= MINUTES_PER_DAY + start[:, 1:]
+    assert gaps_ok[within].all()
+    assert (start[fixed] == start[fixed][:, :1]).all()
+    np.testing.assert_array_equal(plan["stop_minute"], (start + duration) % MINUTES_PER_DAY)
+
+
+@pytest.mark.parametrize("slot_minutes", [15, 60])
+def test_windows_feasible_and_not_dearer_than_baseline(slot_minutes):
+    rng = np.random.default_rng(0)
+    hours = np.clip(rng.normal(14, 4, size=(6, 60)), 0, 24)
+    plan = plan_on_windows(hours, power_kw=rng.uniform(0.2, 1.0, 6), slot_minutes=slot_minutes)
+    _assert_feasible(plan, 4.0)
+    assert (plan["cost"].sum(axis=1) <= plan["baseline_cost"].sum(axis=1) + 1e-9).all()
+    assert plan["total_cost"] <= plan["baseline_total_cost"] + 1e-9
+
+
+def test_matches_brute_force_optimum():
+    hours = np.array([[10.0, 16.0, 6.0, 12.0]])
+    slot = 180
+    plan = plan_on_windows(hours, slot_minutes=slot, min_dark_hours=6.0)
+    _assert_feasible(plan, 6.0)
+
+    prices = np.tile(minute_prices(DEFAULT_TOU), 2) / 60.0
+    durations = plan["duration_minute"][0]
+    dark = np.minimum(360, MINUTES_PER_DAY - durations)
+    slots = range(0, MINUTES_PER_DAY, slot)
+    best = min(sum(prices[s:s + n].sum() for n in durations) for s in slots)      # 固定起点
+    for starts in itertools.product(slots, repeat=hours.shape[1]):                # 当日窗口
+        if any(s + n > MINUTES_PER_DAY for s, n in zip(starts, durations)):
+            continue
+        if any(starts[d] + durations[d] + dark[d] > MINUTES_PER_DAY + starts[d + 1] for d in range(len(starts) - 1)):
+            continue
+        best = min(best, sum(prices[s:s + n].sum() for s, n in zip(starts, durations)))
+    assert plan["total_cost"] == pytest.approx(best)
+
+
+def _realized_hours(monkeypatch, tmp_path, plan, keys, base):
+    """写出逐日配置，再按调度器的规则逐小时判断开关，返回 {通道: (天数 × 24) 布尔数组}"""
+    import led_schedule
+    from device_dispatcher import led_on
+
+    monkeypatch.setattr(led_schedule, "AUTO_CONFIG_DIR", tmp_path)
+    led_schedule.write_auto_configs(base, {k: (plan["start_minute"][i], plan["stop_minute"][i])
+                                           for i, k in enumerate(keys)})
+    days = plan["start_minute"].shape[1]
+    conf = {k: {"mode": "auto"} for k in keys}
+    lit = {k: np.zeros((days, 24), dtype=bool) for k in keys}
+    for d in range(days):
+        day = base + timedelta(days=d)
+        schedule = led_schedule.load_auto_schedule(day)
+        for h in range(24):
+            now = datetime.combine(day, datetime.min.time()) + timedelta(hours=h)
+            for k in keys:
+                lit[k][d, h] = led_on(k, conf, now, schedule)
+    led_schedule.invalidate_schedule_cache()
+    return lit
+
+
+MIDDAY_TOU = [(0, 7, 1.2), (7, 19, 0.4), (19, 24, 1.2)]
+
+
+@pytest.mark.parametrize("tou, fixed", [(DEFAULT_TOU, True), (MIDDAY_TOU, False)])
+def test_written_configs_reproduce_plan(monkeypatch, tmp_path, tou, fixed):
+    # 谷电跨零点时固定起点更省，谷电在白天时逐日窗口更省
+    rng = np.random.default_rng(4)
+    keys = ["top_led", "under_led1", "bot_led"]
+    hours = np.vstack([rng.integers(4, 9, 14), rng.integers(9, 17, 14), rng.integers(4, 17, 14)]).astype(float)
+    plan = plan_on_windows(hours, tou=tou, min_dark_hours=4.0)
+    assert (plan["fixed_start"] == fixed).all()
+    lit = _realized_hours(monkeypatch, tmp_path, plan, keys, date(2025, 3, 1))
+
+    hourly_price = minute_prices(tou)[::60]
+    total = 0.0
+    for i, key in enumerate(keys):
+        # 每个自然日的亮灯时长与方案一致
+        np.testing.assert_array_equal(lit[key].sum(axis=1), hours[i])
+        if not plan["fixed_start"][i]:
+            for d in range(hours.shape[1]):
+                on = np.zeros(24, dtype=bool)
+                on[plan["start_minute"][i, d] // 60:(plan["start_minute"][i, d] + plan["duration_minute"][i, d]) // 60] = True
+                np.testing.assert_array_equal(lit[key][d], on)
+        # 连续两段亮灯之间的暗期不短于 4 h
+        timeline = lit[key].ravel()
+        edges = np.flatnonzero(np.diff(timeline.astype(int)))
+        offs = [b - a for a, b in zip(edges[::2] + 1, edges[1::2] + 1)] if timeline[0] else \
+               [b - a for a, b in zip(edges[1::2] + 1, edges[2::2] + 1)]
+        assert min(offs) >= 4, (key, offs)
+        total += (lit[key] * hourly_price).sum()
+    # 实际亮灯的电费就是方案电费
+    assert total == pytest.approx(plan["total_cost"])
+
+
+def test_flat_price_keeps_preferred_start():
+    plan = plan_on_windows(np.full(10, 12.0), tou=[(0, 24, 1.0)], preferred_start_hour=20)
+    assert (plan["start_minute"] == 20 * 60).all()
+    assert plan["total_cost"] == pytest.approx(plan["baseline_total_cost"])
+
+
+def test_malformed_tou(tmp_path):
+    path = tmp_path / "tou.json"
+    path.write_text(json.dumps([[0, 8, 0.4], [8, 20, 1.2]]), encoding="utf-8")
+    with pytest.raises(ValueError):
+        plan_on_windows(np.full(3, 10.0), tou=load_tou(path))
+    assert load_tou(tmp_path / "missing.json") == DEFAULT_TOU
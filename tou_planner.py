@@ -0,0 +1,120 @@
+"""
+峰谷电价下的开灯时段规划
+每天的开灯时长由光周期方案给定（不改变时长），这里只选择每天的开灯起点，使电费最低。
+结果要能原样写进逐日 config{date}.json（每天一个按零点回绕的窗口），因此只在两类方案中选择：
+- 当日窗口：每天的窗口落在当天 0-24 点内，起点逐日优化；相邻两天留足最短暗期。
+  按天做动态规划，每一步对 (灯组 × 前一天起点 × 当天起点) 整体向量化计算。
+- 固定起点：每天同一时刻开灯，可以跨零点；逐日配置回绕后每天亮灯时长不变，暗期为 24 h 减当天时长。
+每个灯组取两者中电费较低的一个；固定在 preferred_start_hour 开灯的对照方案属于第二类，所以结果不会更贵。
+"""
+import json
+import pathlib
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+
+# (开始小时, 结束小时, 电价 元/kWh)，与 HVAC 模拟器的峰谷电价一致
+DEFAULT_TOU = [(0, 8, 0.4), (8, 22, 1.2), (22, 24, 0.4)]
+TOU_FILE = pathlib.Path(__file__).with_name("config") / "tou.json"
+
+
+def load_tou(path: pathlib.Path = TOU_FILE) -> list[tuple[float, float, float]]:
+    """读取 config/tou.json（[[start_hour, end_hour, price], ...]），不存在时用默认峰谷表"""
+    try:
+        table = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return list(DEFAULT_TOU)
+    return [tuple(map(float, row)) for row in table]
+
+
+def minute_prices(tou) -> np.ndarray:
+    """展开为一天 1440 分钟的电价，要求时段覆盖全天"""
+    prices = np.full(MINUTES_PER_DAY, np.nan)
+    for start_h, end_h, price in tou:
+        prices[int(round(start_h * 60)):int(round(end_h * 60))] = price
+    if np.isnan(prices).any():
+        raise ValueError("分时电价表必须覆盖 0-24 点")
+    return prices
+
+
+def plan_on_windows(hours, power_kw=1.0, tou=DEFAULT_TOU, slot_minutes: int = 60,
+                    min_dark_hours: float = 4.0, preferred_start_hour: float = 20.0) -> dict:
+    """
+    hours:    每日开灯时长 (h)，形状 (天数,) 或 (灯组, 天数)
+    power_kw: 各灯组功率，标量或 (灯组,)
+    返回各灯组每天的开灯起止分钟、电费、是否采用固定起点（fixed_start），
+    以及固定在 preferred_start_hour 开灯的对照电费。电费相同的起点中选离 preferred_start_hour 最近的一个。
+    """
+    hours = np.atleast_2d(np.asarray(hours, dtype=float))
+    if np.any(hours < 0) or np.any(hours > 24):
+        raise ValueError("每日光照时长必须在 0-24 小时之间")
+    groups, days = hours.shape
+    power = np.broadcast_to(np.asarray(power_kw, dtype=float), (groups,))
+    durations = np.rint(hours * 60).astype(np.int64)                  # (G, D)
+    starts = np.arange(0, MINUTES_PER_DAY, slot_minutes)              # (S,)
+
+    # 两天的累计电费（1 kW），跨零点的窗口直接用第二天的部分
+    prices = np.tile(minute_prices(tou), 2) / 60.0
+    cum = np.concatenate([[0.0], np.cumsum(prices)])
+    ends = starts[None, None, :] + durations[:, :, None]              # (G, D, S)
+    cost = power[:, None, None] * (cum[ends] - cum[starts][None, None, :])
+
+    # 电费相同时偏向习惯的开灯时间（权重远小于最小电费差）
+    preferred = preferred_start_hour * 60
+    gap = np.abs(starts - preferred)
+    gap = np.minimum(gap, MINUTES_PER_DAY - gap)
+    score = cost + 1e-9 * gap[None, None, :]
+
+    # 固定起点：每个起点的整周期电费，逐组取最低
+    fixed_score = score.sum(axis=1)                                    # (G, S)
+    fixed_best = fixed_score.argmin(axis=1)                            # (G,)
+
+    # 当日窗口：结束不晚于 24 点；前一天起点 p -> 当天起点 s 可行：p + 时长 + 暗期 <= 1440 + s
+    # 起点 0 点的方案总是可行（时长 + 暗期 <= 24 h），所以动态规划一定有解
+    within = np.where(ends <= MINUTES_PER_DAY, score, np.inf)
+    dark = np.minimum(int(round(min_dark_hours * 60)), MINUTES_PER_DAY - durations)   # (G, D)
+    value = within[:, 0, :]                                            # (G, S)
+    back = np.zeros((groups, days, len(starts)), dtype=np.int64)
+    for d in range(1, days):
+        prev_end = starts[None, :] + durations[:, d - 1, None] + dark[:, d - 1, None]   # (G, P)
+        feasible = prev_end[:, :, None] <= MINUTES_PER_DAY + starts[None, None, :]      # (G, P, S)
+        candidates = np.where(feasible, value[:, :, None], np.inf)
+        back[:, d, :] = candidates.argmin(axis=1)
+        value = within[:, d, :] + candidates.min(axis=1)
+
+    best = np.empty((groups, days), dtype=np.int64)
+    best[:, -1] = value.argmin(axis=1)
+    rows = np.arange(groups)
+    for d in range(days - 1, 0, -1):
+        best[:, d - 1] = back[rows, d, best[:, d]]
+
+    use_fixed = fixed_score[rows, fixed_best] < value.min(axis=1)
+    best[use_fixed] = fixed_best[use_fixed, None]
+
+    start_min = starts[best]
+    chosen_cost = np.take_along_axis(cost, best[:, :, None], axis=2)[:, :, 0]
+    base_start = int(preferred) % MINUTES_PER_DAY
+    baseline = power[:, None] * (cum[base_start + durations] - cum[base_start])
+    return {
+        "start_minute": start_min,
+        "stop_minute": (start_min + durations) % MINUTES_PER_DAY,
+        "duration_minute": durations,
+        "cost": chosen_cost,
+        "fixed_start": use_fixed,
+        "baseline_cost": baseline,
+        "total_cost": float(chosen_cost.sum()),
+        "baseline_total_cost": float(baseline.sum()),
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    demo_hours = np.clip(rng.normal(14, 3, size=(40, 365)), 4, 20)
+    t0 = time.perf_counter()
+    result = plan_on_windows(demo_hours, power_kw=rng.uniform(0.2, 1.0, 40), slot_minutes=15)
+    elapsed = time.perf_counter() - t0
+    print(f"40 组灯 × 365 天，15 分钟粒度：{elapsed:.2f} s")
+    print(f"电费 {result['total_cost']:.1f} 元，固定 20:00 开灯 {result['baseline_total_cost']:.1f} 元")
@@ -9,9 +9,8 @@ import json
 from datetime import date, time, datetime, timedelta
 from streamlit_autorefresh import st_autorefresh
 import numpy as np
-from photoperiod_tool import run_light_cycle
+from photoperiod_tool import StreamingExplanation, build_plan
 import pandas as pd
-import io
 from dotenv import load_dotenv, find_dotenv
 
 from pathlib import Path
@@ -25,6 +24,7 @@ CONFIG_PLC_FILE = "configPLC.json"
 CONFIG_485_FILE = "config485.json"
 LOG_DIR = Path("./Log")
 IMAGE_DIR = "./Image"
+EXPLAIN_REFRESH = 0.5        # AI 说明生成期间的轮询间隔 (s)
 
 def load_config(file_path):
     if os.path.exists(file_path):
@@ -368,6 +368,13 @@ def calculate_population_difference(input_df, input_year):
   selected_year_data['population_difference'] = selected_year_data.population.sub(previous_year_data.population, fill_value=0)
   return pd.concat([selected_year_data.states, selected_year_data.id, selected_year_data.population, selected_year_data.population_difference], axis=1).sort_values(by="population_difference", ascending=False)
 
+# AI 说明：后台线程生成，片段轮询已到达的文字
+def explanation_view(explanation: StreamingExplanation, polling: bool):
+    with st.container(border=True):
+        st.markdown(explanation.text or "AI 说明生成中…")
+    if polling and explanation.done:
+        st.rerun()          # 输出完成后整页重跑一次，片段不再轮询
+
 
 #######################
 # Dashboard Main Panel
@@ -452,58 +459,43 @@ with col[1]:
         if not (0 <= h_min <= h_ave <= h_max <= 24):
             st.error("❌ 参数错误：必须满足 0 ≤ 最短光照 ≤ 平均光照 ≤ 最长光照 ≤ 24")
         else:
-            with st.spinner("🤖 AI正在为您生成最优光周期策略..."):
-                answer_md = run_light_cycle(days, h_min, h_max, h_ave)
-            
-            st.markdown("#### 📋 AI生成的光周期策略")
-            st.markdown(answer_md)
-            
-            # Excel 下载功能
-            lines = answer_md.splitlines()
-            table_start = None
-            for i, line in enumerate(lines):
-                if "| 天数" in line or "| Day" in line:
-                    table_start = i
-                    break
-            
-            if table_start:
-                try:
-                    # 解析Markdown表格
-                    table_lines = lines[table_start:]
-                    clean_lines = []
-                    for line in table_lines:
-                        if line.strip() and '|---' not in line:
-                            clean_lines.append(line)
-                    
-                    if clean_lines:
-                        df = pd.read_csv(io.StringIO("\n".join(clean_lines)), sep="|", skipinitialspace=True)
-                        df = df.dropna(axis=1, how="all").iloc[1:].reset_index(drop=True)
-                        
-                        # 清理列名
-                        df.columns = [col.strip() for col in df.columns]
-                        
-                        excel = io.BytesIO()
-                        with pd.ExcelWriter(excel, engine="openpyxl") as writer:
-                            df.to_excel(writer, index=False, sheet_name="光周期计划")
-                            
-                            # 添加摘要工作表
-                            summary_data = {
-                                '参数': ['总天数', '最短光照', '最长光照', '平均光照', '植物类型', '光照强度'],
-                                '数值': [days, f'{h_min}h', f'{h_max}h', f'{h_ave}h', plant_type, light_intensity]
-                            }
-                            pd.DataFrame(summary_data).to_excel(writer, index=False, sheet_name="参数摘要")
-                        
-                        excel.seek(0)
-                        
-                        st.download_button(
-                            label="📥 下载Excel详细计划表",
-                            data=excel,
-                            file_name=f"光周期计划_{pd.Timestamp.now().strftime('%Y%m%d_%H%M')}.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            use_container_width=True
-                        )
-                except Exception as e:
-                    st.warning(f"⚠️ 表格解析遇到问题，但策略已生成完成。错误详情: {str(e)}")
+            # 先生成方案和下载文件，再在后台线程启动 AI 说明；页面重跑时从 session_state 取回
+            plan = build_plan(days, h_min, h_max, h_ave, start_date=date.today())
+            st.session_state.light_plan = {
+                "plan": plan,
+                "stamp": pd.Timestamp.now().strftime('%Y%m%d_%H%M'),
+                "excel": plan.to_excel(),
+                "csv": plan.to_csv().encode("utf-8-sig"),
+            }
+            previous = st.session_state.get("light_explain")
+            if previous is not None:
+                previous.cancel()
+            st.session_state.light_explain = StreamingExplanation(days, h_min, h_max, h_ave)
+
+    light_plan = st.session_state.get("light_plan")
+    if light_plan is not None:
+        # 方案立即显示，AI 说明按 EXPLAIN_REFRESH 轮询刷新，页面不等待模型
+        st.markdown("#### 📋 AI生成的光周期策略")
+        explanation = st.session_state.get("light_explain")
+        if explanation is not None:
+            polling = not explanation.done
+            st.fragment(run_every=EXPLAIN_REFRESH if polling else None)(explanation_view)(explanation, polling)
+        st.dataframe(light_plan["plan"].to_frame(), hide_index=True, use_container_width=True)
+
+        st.download_button(
+            label="📥 下载Excel详细计划表",
+            data=light_plan["excel"],
+            file_name=f"光周期计划_{light_plan['stamp']}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            use_container_width=True
+        )
+        st.download_button(
+            label="📄 下载CSV",
+            data=light_plan["csv"],
+            file_name=f"光周期计划_{light_plan['stamp']}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
 
     
 
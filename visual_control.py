@@ -1,12 +1,12 @@
 ###全版本 现运行
 # ------------------- Python 标准库 -------------------
 import os
+import copy
 import glob
 import json
-import csv
 import pathlib
 # import time
-from datetime import date, time, datetime, timedelta
+from datetime import date, datetime, timedelta
 from time import sleep
 
 # ------------------- 第三方库 -------------------
@@ -17,12 +17,18 @@ from PIL import Image
 import plotly.express as px
 import matplotlib.pyplot as plt
 from matplotlib import dates as mdates
-from streamlit_autorefresh import st_autorefresh
 
 
 from pathlib import Path
 
-from light_agent import calc_photoperiod
+from photoperiod_tool import StreamingExplanation, build_plan
+from light_plan import write_plan
+from led_schedule import (
+    AUTO_CONFIG_DIR, DEFAULT_START_HOUR, LED_GROUPS, LED_KEYS, led_bus, led_group,
+    load_auto_schedule, write_auto_configs,
+)
+from batch_registry import load_registry
+from tou_planner import load_tou, plan_on_windows
 
 # ------------------- 文件路径 -------------------
 CONFIG_PLC_FILE = "configPLC.json"
@@ -46,16 +52,17 @@ body { font-size: 22px !important; }
 """, unsafe_allow_html=True)
 
 
-AUTO_CONFIG_DIR = pathlib.Path(__file__).with_name("config")  # ./config/
-LED_KEYS = [
-    "top_led", "mid_led", "bot_led",
-    "top_led2", "top_led3", "bot_led2", "bot_led3",
-    "under_led1", "under_led2", "under_led3", "under_led4"
-]
+# ------------------- 刷新间隔（秒） -------------------
+# 只有下面几个片段按各自间隔局部重跑，控制页与智能体页不随定时刷新重新执行
+SENSOR_REFRESH = 30
+CAMERA_REFRESH = 60
+DATE_CHECK_REFRESH = 60
+EXPLAIN_REFRESH = 0.5        # AI 说明生成期间的轮询间隔 (s)
 
 # ------------------- 数据可视化 -------------------
 
 
+@st.cache_data(ttl=SENSOR_REFRESH)
 def load_recent_data(days=3):
     all_data = []
     today = date.today()
@@ -96,11 +103,33 @@ def load_recent_data(days=3):
 
 
 
-# 前面的 load_recent_data() 保持不变
-def data_visualization_tab():
-    st.title("传感器数据可视化")
+SENSOR_COLUMNS = [("Temperature", "温度", "°C"), ("Humidity", "湿度", "%"),
+                  ("CO2", "CO₂", "ppm"), ("pH", "pH", ""), ("EC", "EC", "")]
+
+CAMERA_IDS = [0, 2, 4]
+IMAGE_BASE_DIR = "./Image"
+VALID_EXTS = ("*.jpg", "*.jpeg", "*.png")
+
+
+@st.fragment(run_every=SENSOR_REFRESH)
+def latest_readings():
+    df = load_recent_data(1)
+    if df.empty:
+        st.warning("未找到对应数据")
+        return
+    latest = df.iloc[-1]
+    st.caption(f"最新读数 {df.index[-1]:%Y-%m-%d %H:%M:%S}")
+    cols = st.columns(len(SENSOR_COLUMNS))
+    for col, (name, label, unit) in zip(cols, SENSOR_COLUMNS):
+        value = latest.get(name, np.nan)
+        col.metric(label, "--" if pd.isna(value) else f"{value:.1f}{unit}")
+
+
+@st.fragment(run_every=SENSOR_REFRESH)
+def trend_chart():
+    # 时间范围放在片段内，切换时只重跑本片段
     days_option = st.radio("选择时间范围", [1, 3, 7], horizontal=True,
-                          format_func=lambda x: f"最近{x}天")
+                          format_func=lambda x: f"最近{x}天", key="trend_days")
     df = load_recent_data(days_option)
     if df.empty:
         st.warning("未找到对应数据")
@@ -148,38 +177,36 @@ def data_visualization_tab():
     plt.tight_layout()
     st.pyplot(fig)
     plt.close(fig)
-    st.markdown("---")
-    st.header("📷 相机拍摄画面")
 
-    CAMERA_IDS = [0, 2, 4]
-    IMAGE_BASE_DIR = "./Image"
-    VALID_EXTS = ("*.jpg", "*.jpeg", "*.png")
 
-    def get_latest_image(camera_id: int):
-        folder_path = os.path.join(IMAGE_BASE_DIR, str(camera_id))
-        if not os.path.isdir(folder_path):
-            return None
+def get_latest_image(camera_id: int):
+    folder_path = os.path.join(IMAGE_BASE_DIR, str(camera_id))
+    if not os.path.isdir(folder_path):
+        return None
 
-        files = []
-        for ext in VALID_EXTS:
-            files.extend(glob.glob(os.path.join(folder_path, f"img_dst_{camera_id}_*{ext}")))
+    files = []
+    for ext in VALID_EXTS:
+        files.extend(glob.glob(os.path.join(folder_path, f"img_dst_{camera_id}_*{ext}")))
 
-        if not files:
-            return None
+    if not files:
+        return None
 
-        def extract_time_from_name(path):
-            name = os.path.basename(path)
-            try:
-                base = os.path.splitext(name)[0]
-                parts = base.split("_")
-                time_part = parts[-2] + "_" + parts[-1] if len(parts) >= 2 else parts[-1]
-                return datetime.strptime(time_part, "%Y-%m-%d_%H-%M-%S")
-            except Exception:
-                return datetime.min
+    def extract_time_from_name(path):
+        name = os.path.basename(path)
+        try:
+            base = os.path.splitext(name)[0]
+            parts = base.split("_")
+            time_part = parts[-2] + "_" + parts[-1] if len(parts) >= 2 else parts[-1]
+            return datetime.strptime(time_part, "%Y-%m-%d_%H-%M-%S")
+        except Exception:
+            return datetime.min
+
+    files.sort(key=extract_time_from_name, reverse=True)
+    return files[0]
 
-        files.sort(key=extract_time_from_name, reverse=True)
-        return files[0]
 
+@st.fragment(run_every=CAMERA_REFRESH)
+def camera_previews():
     cols = st.columns(len(CAMERA_IDS))
     for idx, cam_id in enumerate(CAMERA_IDS):
         with cols[idx]:
@@ -194,6 +221,15 @@ def data_visualization_tab():
             else:
                 st.info("暂无图片")
 
+
+def data_visualization_tab():
+    st.title("传感器数据可视化")
+    latest_readings()
+    trend_chart()
+    st.markdown("---")
+    st.header("📷 相机拍摄画面")
+    camera_previews()
+
 # ------------------- 配置文件读写 -------------------
 def load_config(file_path):
     if os.path.exists(file_path):
@@ -226,72 +262,84 @@ if "rs485_mtime" not in st.session_state:
 
 
 
-# ------------------- LED 统一渲染函数 -------------------
-def load_auto_schedule(today: date | None = None):
-    today = today or date.today()
-    auto_file = AUTO_CONFIG_DIR / f"config{today}.json"
+# ------------------- LED 批量编辑 -------------------
+LED_DEFAULT = {"mode": "manual", "enable": False, "start_hour": 20, "stop_hour": 0}
+LED_COLUMNS = {"mode": "模式", "enable": "开关", "start_hour": "开启(时)", "stop_hour": "关闭(时)"}
 
-    if not auto_file.exists():
-        return {}
 
-    data = json.loads(auto_file.read_text(encoding="utf-8"))
-    schedule = {}
+def led_table(config_plc: dict, config_485: dict) -> pd.DataFrame:
+    """全部 LED 通道合成一张表，每行一个通道"""
+    auto_schedule = load_auto_schedule()
+    rows = []
     for key in LED_KEYS:
-        if key not in data:
-            continue
-        try:
-            start = int(data[key]["start"].split(":")[0])
-            stop = int(data[key]["stop"].split(":")[0])
-            schedule[key] = (start, stop)
-        except Exception:
-            continue
-    return schedule
-def led_control_block(led_key: str, conf: dict, prefix: str):
-    st.subheader(f"{led_key.upper()} 控制")
-    led_conf = conf.get(led_key, {"mode":"manual","enable":False,"start_hour":20,"stop_hour":0})
-
-    # 单选框选择模式
-    mode = st.radio("模式", ["auto", "manual"], index=0 if led_conf.get("mode")=="auto" else 1,
-                    key=f"{prefix}_{led_key}_mode")
-    
-    if mode == "auto":
-        auto_schedule = load_auto_schedule()
-        if led_key in auto_schedule:
-            start, stop = auto_schedule[led_key]
-            stop_display = 24 if stop == 0 else stop
-            st.info(f"AI 自动模式 —— 今日开启：{start}:00，关闭：{stop_display}:00")
+        conf = {**LED_DEFAULT, **(config_plc if led_bus(key) == "plc" else config_485).get(key, {})}
+        if key in auto_schedule:
+            start, stop = auto_schedule[key]
+            today = f"{start}:00-{24 if stop == 0 else stop}:00"
         else:
-            st.warning("自动配置未找到，切换到手动模式")
+            today = "未配置（按手动）"
+        rows.append({"通道": key, "总线": led_bus(key), "分组": led_group(key),
+                     **{label: conf[field] for field, label in LED_COLUMNS.items()},
+                     "今日自动": today})
+    return pd.DataFrame(rows)
+
+
+def led_bulk_editor(config_plc: dict, config_485: dict) -> bool:
+    """表单内编辑不触发重跑，点击保存时一次性写回两份配置；返回是否提交"""
+    st.header("LED 控制")
+    with st.form("led_bulk_form"):
+        st.caption("批量模板（可选）：保存时覆盖所选分组的全部通道")
+        c1, c2, c3, c4, c5 = st.columns(5)
+        group = c1.selectbox("分组", ["不使用"] + list(LED_GROUPS))
+        t_mode = c2.selectbox("模式", ["auto", "manual"])
+        t_enable = c3.checkbox("开关", value=True)
+        t_start = c4.number_input("开启时间(小时)", 0, 23, value=20)
+        t_stop = c5.number_input("关闭时间(小时)", 0, 23, value=0)
+
+        edited = st.data_editor(
+            led_table(config_plc, config_485),
+            key="led_editor",
+            hide_index=True,
+            use_container_width=True,
+            disabled=["通道", "总线", "分组", "今日自动"],
+            column_config={
+                "模式": st.column_config.SelectboxColumn(options=["auto", "manual"], required=True),
+                "开关": st.column_config.CheckboxColumn(),
+                "开启(时)": st.column_config.NumberColumn(min_value=0, max_value=23, step=1, required=True),
+                "关闭(时)": st.column_config.NumberColumn(min_value=0, max_value=23, step=1, required=True),
+            },
+        )
+        submitted = st.form_submit_button("保存 LED 配置")
+
+    if not submitted:
+        return False
+
+    if group != "不使用":
+        mask = edited["通道"].isin(LED_GROUPS[group])
+        edited.loc[mask, list(LED_COLUMNS.values())] = [t_mode, t_enable, t_start, t_stop]
+
+    # auto 模式需要当日 AI 排程或栽培批次；都没有时退回手动，auto 通道默认开启
+    registry = load_registry()
+    scheduled = set(load_auto_schedule()) | set(registry.channels if registry is not None else ())
+    fallback = []
+    for row in edited.to_dict("records"):
+        conf = config_plc if row["总线"] == "plc" else config_485
+        mode, enable = row["模式"], bool(row["开关"])
+        if mode == "auto" and row["通道"] not in scheduled:
             mode = "manual"
+            fallback.append(row["通道"])
+        elif mode == "auto":
+            enable = True
+        conf[row["通道"]] = {
+            "mode": mode,
+            "enable": enable,
+            "start_hour": int(row["开启(时)"]),
+            "stop_hour": int(row["关闭(时)"]),
+        }
+    if fallback:
+        st.warning(f"自动配置未找到，已切换到手动模式：{'、'.join(fallback)}")
+    return True
 
-    if mode == "manual":
-        enable = st.checkbox("开关", value=led_conf.get("enable", False), key=f"{prefix}_{led_key}_enable")
-        start = st.number_input("开启时间(小时)", 0, 23, value=led_conf.get("start_hour", 20), key=f"{prefix}_{led_key}_start")
-        stop = st.number_input("关闭时间(小时)", 0, 23, value=led_conf.get("stop_hour", 8), key=f"{prefix}_{led_key}_stop")
-    else:
-        enable = True  # auto 默认开启
-
-    # 保存配置
-    conf[led_key] = {"mode": mode, "enable": enable, "start_hour": start, "stop_hour": stop}
-
-
-# ------------------- 读取csv，计算光照时间 -------------------
-def get_today_led_schedule() -> tuple[int,int]:
-    csv_path = AUTO_CONFIG_DIR / "daily_light.csv"
-    if not csv_path.exists():
-        return 20,20
-
-    today = date.today().day
-    with csv_path.open(newline='',encoding='utf-8') as f:
-        rows = list(csv.DictReader(f))
-        if today > len(rows):
-            return 20,20
-        light_hours = float(rows[today-1]["light_hours"])
-
-    start = 20
-    end_dt = datetime.combine(date.today(), time(start)) + timedelta(hours=light_hours)
-    stop = end_dt.hour
-    return start,stop
 
 # ------------------- 控制页面 -------------------
 def relays_tab():
@@ -300,6 +348,7 @@ def relays_tab():
 
     config_plc = load_config(CONFIG_PLC_FILE)
     config_485 = load_config(CONFIG_485_FILE)
+    loaded_plc = copy.deepcopy(config_plc)
 
     st.header("PLC设备控制")
     uv_enable = st.checkbox(
@@ -361,15 +410,14 @@ def relays_tab():
         "duration_seconds": spray_duration
     }
 
-    for led in ["top_led", "mid_led", "bot_led"]:
-        led_control_block(led, config_plc, "plc")
-    save_config(config_plc, CONFIG_PLC_FILE)
+    # LED 通道统一在一张表中编辑，提交后两份配置各写一次
+    if led_bulk_editor(config_plc, config_485):
+        save_config(config_485, CONFIG_485_FILE)
+        st.success("LED 配置已保存")
 
-    st.header("485设备控制")
-    for led in ["top_led2","top_led3","bot_led2","bot_led3","under_led1",
-                "under_led2","under_led3","under_led4"]:
-        led_control_block(led, config_485, "rs485")
-    save_config(config_485, CONFIG_485_FILE)
+    # 内容未变化时不重写文件，避免每次重跑都产生新的配置修订
+    if config_plc != loaded_plc:
+        save_config(config_plc, CONFIG_PLC_FILE)
 
 
 # -------------------- AI光周期配置模块 --------------------
@@ -380,43 +428,88 @@ def ai_photoperiod_tab():
         h_min = st.number_input("最小光周期(h)", min_value=0, max_value=24, value=4, step=1)
         h_max = st.number_input("最大光周期(h)", min_value=0, max_value=24, value=9, step=1)
         h_ave = st.number_input("平均光周期(h)", min_value=0, max_value=24, value=8, step=1)
+        optimize = st.checkbox("按峰谷电价优化开灯时段", value=False,
+                               help="只调整每天的开灯时刻，每天的亮灯时长仍按光周期方案；"
+                                    "窗口要么落在当天内，要么每天同一时刻开灯（可跨零点）")
         submitted = st.form_submit_button("确认")
 
     if submitted:
-        calc = calc_photoperiod(days,h_min,h_max,h_ave)
-        csv_path = AUTO_CONFIG_DIR / "daily_light.csv"
-        csv_path.parent.mkdir(exist_ok=True,parents=True)
-        with csv_path.open("w", newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(["day","light_hours"])
-            writer.writerows(enumerate(calc["daily_schedule"],1))
-
         base_date = date.today()
-        start_min = 20*60
-        for day_i, hrs in enumerate(calc["daily_schedule"],1):
-            duration_min = int(hrs*60)
-            stop_min = (start_min+duration_min)%(24*60)
-            stop_hour, stop_min = divmod(stop_min,60)
-            day_conf = {k:{"start":"20:00","stop":f"{stop_hour:02d}:{stop_min:02d}"} for k in LED_KEYS}
-            (AUTO_CONFIG_DIR/f"config{base_date+timedelta(days=day_i-1)}.json").write_text(json.dumps(day_conf,ensure_ascii=False,indent=2))
-        st.success(f"已自动配置光周期！")
+        photo_plan = build_plan(days, h_min, h_max, h_ave, start_date=base_date)
+        write_plan(base_date, photo_plan.hours, AUTO_CONFIG_DIR)
+
+        # 默认固定 20:00 开灯，时长按分钟截断；勾选优化时各灯组每组一行一起求解
+        groups = sorted({led_group(k) for k in LED_KEYS})
+        hours = np.tile(photo_plan.hours, (len(groups), 1))
+        start = np.full(hours.shape, DEFAULT_START_HOUR * 60)
+        stop = (start + (hours * 60).astype(np.int64)) % (24 * 60)
+        cost = saving = None
+        if optimize:
+            try:
+                plan = plan_on_windows(hours, tou=load_tou(), preferred_start_hour=DEFAULT_START_HOUR)
+            except (TypeError, ValueError) as e:
+                st.warning(f"分时电价表 config/tou.json 无效（{e}），已按固定 {DEFAULT_START_HOUR}:00 开灯配置")
+            else:
+                start, stop = plan["start_minute"], plan["stop_minute"]
+                cost = plan["total_cost"] / len(groups)
+                saving = (plan["baseline_total_cost"] - plan["total_cost"]) / len(groups)
+        row = {g: i for i, g in enumerate(groups)}
+        write_auto_configs(base_date, {k: (start[row[led_group(k)]], stop[row[led_group(k)]]) for k in LED_KEYS})
+        st.session_state.ai_plan = {
+            "params": (days, h_min, h_max, h_ave),
+            "plan": photo_plan,
+            "cost": cost,
+            "saving": saving,
+        }
+        previous = st.session_state.get("ai_explain")
+        if previous is not None:
+            previous.cancel()
+        st.session_state.ai_explain = StreamingExplanation(days, h_min, h_max, h_ave)
+
+    ai_plan = st.session_state.get("ai_plan")
+    if ai_plan is None:
+        return
+    # 方案先显示；AI 说明在后台线程生成，片段按 EXPLAIN_REFRESH 轮询已到达的文字，页面不等待模型
+    st.success(f"已自动配置光周期！")
+    if ai_plan["cost"] is not None:
+        st.metric("整个周期电费（每 kW 灯功率）", f"{ai_plan['cost']:.1f} 元",
+                  delta=f"-{ai_plan['saving']:.1f} 元" if ai_plan["saving"] > 0 else None, delta_color="inverse")
+    photo_plan = ai_plan["plan"]
+    st.line_chart(photo_plan.to_frame().set_index("天数")["光照时长(h)"])
+    col_xlsx, col_csv = st.columns(2)
+    col_xlsx.download_button("下载 Excel", photo_plan.to_excel(), file_name=f"光周期计划_{photo_plan.start_date}.xlsx",
+                             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    col_csv.download_button("下载 CSV", photo_plan.to_csv().encode("utf-8-sig"),
+                            file_name=f"光周期计划_{photo_plan.start_date}.csv", mime="text/csv")
+
+    explanation = st.session_state.get("ai_explain")
+    if explanation is not None:
+        polling = not explanation.done
+        st.fragment(run_every=EXPLAIN_REFRESH if polling else None)(explanation_view)(explanation, polling)
+
+
+def explanation_view(explanation: StreamingExplanation, polling: bool):
+    with st.container(border=True):
+        st.markdown(explanation.text or "AI 说明生成中…")
+    if polling and explanation.done:
+        st.rerun()          # 输出完成后整页重跑一次，片段不再轮询
 
 # ------------------- 主函数 -------------------
+@st.fragment(run_every=DATE_CHECK_REFRESH)
+def date_watch():
+    today = date.today()
+    if today != st.session_state.current_date:
+        st.session_state.current_date = today
+        st.rerun()
+
+
 def main():
     st.title("室墨司源控制面板")
 
-    refresh_interval = 30
-    st_autorefresh(interval=refresh_interval * 1000)  # 注意转换成毫秒
-
-    # —— 日期刷新逻辑 —— #
+    # —— 日期刷新逻辑：跨天时整页重跑一次，让控制页读取新一天的自动排程 —— #
     if 'current_date' not in st.session_state:
         st.session_state.current_date = date.today()
-
-    today = date.today()
-    if today != st.session_state.current_date:
-        st.session_state.current_date = today
-        st.experimental_rerun()
-    # —— 逻辑结束 —— #
+    date_watch()
 
     tab1, tab2, tab3 = st.tabs(["数据","控制","智能体"])
     with tab1:
@@ -10,7 +10,9 @@ from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import numpy as np
 import json
+import pathlib
 from hvac_simulator import HVACControlSimulator, ActionType, DeviceType
+from hvac_trend import DEFAULT_HORIZON, TrendTracker
 from audio_generator import generate_action_sound
 
 # 样式规范 - 符合CLAUDE.md
@@ -44,8 +46,14 @@ INSTANT_ACTION_COLOR = 'rgba(0,0,0,0.5)'  # 瞬时动作竖线颜色
 
 FONT_FAMILY = "Microsoft YaHei, Arial, sans-serif"
 
+# 图表显示最近 WINDOW_SIZE 步；内存只保留最近 HISTORY_LIMIT 步（5 分钟步长即一天），
+# 更早的历史与动作写入 REPLAY_DIR 的压缩分段文件，可用 history.replay() / actions.replay() 回放
+WINDOW_SIZE = 90
+HISTORY_LIMIT = 288
+REPLAY_DIR = pathlib.Path(__file__).parent / "output" / "replay" / datetime.now().strftime("%Y%m%d_%H%M%S")
+
 # 全局变量
-simulator = HVACControlSimulator(timestep_minutes=5)
+simulator = HVACControlSimulator(timestep_minutes=5, history_limit=HISTORY_LIMIT, spill_dir=REPLAY_DIR)
 
 # 初始化Dash应用
 app = dash.Dash(__name__)
@@ -80,12 +88,12 @@ def create_combined_figure(history, actions, window_start=0, window_end=90):
         fig.update_layout(height=1100)
         return fig
 
-    # 提取数据
-    timestamps = [s.timestamp for s in display_history]
-    temperatures = [s.temperature for s in display_history]
-    humidities = [s.humidity for s in display_history]
-    total_powers = [s.total_power for s in display_history]
-    costs = [s.cost for s in display_history]
+    # 提取数据（按列取，不逐条构造状态对象）
+    timestamps = display_history.timestamps()
+    temperatures = display_history.column("temperature")
+    humidities = display_history.column("humidity")
+    total_powers = display_history.column("total_power")
+    costs = display_history.column("cost")
     cumulative_cost = np.cumsum(costs)
 
     # 生成预测数据（从最后一个点向前延伸到未来）
@@ -96,42 +104,24 @@ def create_combined_figure(history, actions, window_start=0, window_end=90):
         last_ts = last_state.timestamp
 
         # 预测时间戳（当前时间 + 5个未来时间步）
-        pred_timestamps = [last_ts + timedelta(minutes=timestep_minutes * i) for i in range(6)]
-
-        # 预测值从当前实际值开始，延伸到未来预测值
-        temp_preds = [last_state.temperature]
-        hum_preds = [last_state.humidity]
-        power_preds = [last_state.total_power]
-        cost_preds = [cumulative_cost[-1] if len(cumulative_cost) > 0 else 0]
-
-        # 使用线性趋势生成预测
-        if len(display_history) >= 3:
-            # 温度趋势
-            recent_temps = [s.temperature for s in display_history[-3:]]
-            temp_trend = np.mean(np.diff(recent_temps))
-            # 湿度趋势
-            recent_hums = [s.humidity for s in display_history[-3:]]
-            hum_trend = np.mean(np.diff(recent_hums))
-            # 功率趋势
-            recent_powers = [s.total_power for s in display_history[-3:]]
-            power_trend = np.mean(np.diff(recent_powers))
-            # 累计电费趋势
-            if len(cumulative_cost) >= 3:
-                cost_trend = np.mean(np.diff(cumulative_cost[-3:]))
-            else:
-                cost_trend = costs[-1] if costs else 0
+        pred_timestamps = [last_ts + timedelta(minutes=timestep_minutes * i) for i in range(DEFAULT_HORIZON + 1)]
+
+        # 预测值从当前实际值开始，按最近几步的滚动趋势（与模拟器预测同一实现）延伸到未来
+        tracker = TrendTracker.from_series({
+            "temperature": temperatures, "humidity": humidities,
+            "total_power": total_powers, "cumulative_cost": cumulative_cost,
+        })
+        current = (last_state.temperature, last_state.humidity, last_state.total_power, cumulative_cost[-1])
+        if tracker.ready:
+            path = tracker.path(current, DEFAULT_HORIZON)
         else:
-            temp_trend = 0
-            hum_trend = 0
-            power_trend = 0
-            cost_trend = costs[-1] if costs else 0
-
-        # 生成5步预测
-        for i in range(1, 6):
-            temp_preds.append(np.clip(last_state.temperature + temp_trend * i, 18.0, 28.0))
-            hum_preds.append(np.clip(last_state.humidity + hum_trend * i, 40.0, 80.0))
-            power_preds.append(max(0, last_state.total_power + power_trend * i))
-            cost_preds.append(max(0, cost_preds[0] + cost_trend * i))
+            # 数据不足一个窗口：温湿度、功率保持不变，累计电费按最近一步的电费增长
+            step_change = np.array([0.0, 0.0, 0.0, costs[-1]])
+            path = np.asarray(current) + step_change * np.arange(DEFAULT_HORIZON + 1)[:, None]
+        temp_preds = np.clip(path[:, 0], 18.0, 28.0)
+        hum_preds = np.clip(path[:, 1], 40.0, 80.0)
+        power_preds = np.maximum(0, path[:, 2])
+        cost_preds = np.maximum(0, path[:, 3])
     else:
         pred_timestamps = timestamps
         temp_preds = temperatures
@@ -240,13 +230,10 @@ def create_combined_figure(history, actions, window_start=0, window_end=90):
         time_start = timestamps[0]
         time_end = timestamps[-1]
 
-        # 筛选时间窗口内的动作
-        window_actions = [a for a in actions if time_start <= a.timestamp <= time_end]
-
+        # 与时间窗口重叠的动作（含窗口开始前启动、仍在持续的动作），按时间索引查询，不扫描全部动作
         # 限制最大动作数量以提高性能
         max_actions = 30
-        if len(window_actions) > max_actions:
-            window_actions = window_actions[-max_actions:]
+        window_actions = actions.overlapping(time_start, time_end, limit=max_actions)
 
         for action in window_actions:
             try:
@@ -265,14 +252,15 @@ def create_combined_figure(history, actions, window_start=0, window_end=90):
                     action_name = action.action.value
                     color = ACTION_COLORS.get(action_name, 'rgba(200,200,200,0.2)')
                     end_time = action.timestamp + timedelta(minutes=action.duration)
+                    start_time = max(action.timestamp, time_start)
                     # 温湿度图
                     fig.add_vrect(
-                        x0=action.timestamp, x1=min(end_time, time_end),
+                        x0=start_time, x1=min(end_time, time_end),
                         fillcolor=color, layer="below", line_width=0, row=1, col=1
                     )
                     # 能耗电费图
                     fig.add_vrect(
-                        x0=action.timestamp, x1=min(end_time, time_end),
+                        x0=start_time, x1=min(end_time, time_end),
                         fillcolor=color, layer="below", line_width=0, row=2, col=1
                     )
             except Exception as e:
@@ -657,7 +645,7 @@ def update_graphs(n, data):
         actions = simulator.actions
 
         # 计算显示窗口（最近90个时间步）
-        window_size = 90
+        window_size = WINDOW_SIZE
         total_steps = len(history)
         window_end = total_steps
         window_start = max(0, window_end - window_size)
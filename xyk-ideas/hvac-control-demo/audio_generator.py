@@ -14,9 +14,9 @@ import random
 class AudioGenerator:
     """服务器端音频生成器 - 增强版"""
 
-    def __init__(self, sample_rate: int = 44100):
+    def __init__(self, sample_rate: int = 44100, seed=42):
         self.sample_rate = sample_rate
-        np.random.seed(42)  # 确保可重复性
+        self.rng = np.random.default_rng(seed)  # 独立随机数流，确保可重复性且不影响全局状态
 
         # 音效映射配置 - 更长的持续时间，让音效更悦耳
         self.sound_configs = {
@@ -198,7 +198,7 @@ class AudioGenerator:
 
     def add_micro_variations(self, audio: np.ndarray, variation_amount: float = 0.02) -> np.ndarray:
         """添加微小的随机变化，让音效更自然"""
-        noise = np.random.normal(0, variation_amount, len(audio))
+        noise = self.rng.normal(0, variation_amount, len(audio))
         return audio + noise
 
     def generate_sound(self, action_name: str) -> str:
@@ -0,0 +1,45 @@
+"""
+HVAC 引擎基准
+报告标量模拟器（逐步 simulate 与快进模式）和向量化引擎（不同场景数）的步/秒；
+向量化引擎同时给出 场景·步/秒，便于与标量直接比较。
+运行：python benchmark_engines.py [--steps 20000]
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from hvac_fastforward import fast_forward
+from hvac_simulator import HVACControlSimulator
+from hvac_vector import VectorHVACSimulator
+
+START = datetime(2025, 1, 1)
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def benchmark(steps: int = 20000, scenarios=(1, 100, 1000, 10000)) -> list:
+    """返回 [(引擎, 场景数, 步数, 秒)]；向量化引擎的步数按场景数缩减，让每项耗时相近"""
+    rows = [
+        ("标量 simulate", 1, steps, timed(lambda: HVACControlSimulator(start_time=START).simulate(steps))),
+        ("标量 快进", 1, steps, timed(lambda: fast_forward(days=steps * 5 / 1440, timestep_minutes=5))),
+    ]
+    for n in scenarios:
+        n_steps = max(steps // max(n // 100, 1), 100)
+        engine = VectorHVACSimulator(n, start_time=START)
+        rows.append(("向量化", n, n_steps, timed(lambda: engine.run(n_steps))))
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HVAC 引擎基准")
+    parser.add_argument("--steps", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'引擎':<14}{'场景数':>8}{'步数':>8}{'耗时 s':>9}{'步/s':>12}{'场景·步/s':>14}")
+    for name, n, steps, seconds in benchmark(args.steps):
+        print(f"{name:<14}{n:>8}{steps:>8}{seconds:>9.2f}{steps / seconds:>12,.0f}{n * steps / seconds:>14,.0f}")
@@ -0,0 +1,194 @@
+"""
+按时间索引的动作存储
+动作按开始时间有序存放在列数组里（开始、结束、设备、动作、是否瞬时、持续时间），
+另外记录最长持续时间 max_duration：与窗口 [t0, t1] 重叠的动作，开始时间一定落在
+[t0 - max_duration, t1] 内，两次二分查找即可定位候选段，查询代价 O(log n + k)，与总动作数无关。
+序列接口（len、下标、切片、迭代、append、extend）与原来的 List[ControlAction] 兼容，
+取出时才构造 ControlAction。
+设 hot_limit 时内存只保留最近的动作，较早的一半写成分段文件（设了 spill_dir）后丢弃，
+下标仍是全局序号，replay() 在分段文件与内存中一起查询。
+"""
+
+import pathlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from hvac_history import _write_npz
+from hvac_simulator import ActionType, ControlAction, DeviceType
+
+DEVICES = list(DeviceType)
+ACTIONS = list(ActionType)
+DEVICE_INDEX = {d: i for i, d in enumerate(DEVICES)}
+ACTION_INDEX = {a: i for i, a in enumerate(ACTIONS)}
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+
+
+def _to_us(ts: datetime) -> int:
+    return (ts - _EPOCH) // _US
+
+
+def _from_us(value) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(value))
+
+
+class ActionStore:
+    """
+    动作列表（按开始时间有序）+ 窗口重叠查询。
+    设了 hot_limit 但没有 spill_dir 时，搬出的动作直接丢弃：len() 仍是写入过的总数（序号不变），
+    下标或迭代到已丢弃的动作会抛出 IndexError；只需要最近的动作时用 actions[-k:]。
+    """
+
+    _COLUMNS = (("start", np.int64), ("end", np.int64), ("device", np.int8), ("action", np.int8),
+                ("instant", np.bool_), ("duration", np.float32))
+
+    def __init__(self, capacity: int = 256, hot_limit: Optional[int] = None, spill_dir=None):
+        if hot_limit is not None:
+            capacity = 2 * hot_limit
+        self.n = 0
+        self.columns = {name: np.empty(max(capacity, 1), dtype=dtype) for name, dtype in self._COLUMNS}
+        self.max_duration_us = 0
+        self.hot_limit = hot_limit
+        self.spill_dir = pathlib.Path(spill_dir) if spill_dir is not None else None
+        self.first_index = 0        # 内存中第一个动作的全局序号
+        self._segments = []         # [(起始序号, 结束序号, 最早开始 µs, 最晚结束 µs, 文件)]
+
+    # ---------- 写入 ----------
+    def _evict(self):
+        """缓冲写满：较早的一半写入分段文件（若设了 spill_dir）后丢弃，其余前移"""
+        h = self.hot_limit
+        if self.spill_dir is not None:
+            path = self.spill_dir / f"actions_{self.first_index:012d}.npz"
+            _write_npz(path, {name: col[:h] for name, col in self.columns.items()})
+            self._segments.append((self.first_index, self.first_index + h, int(self.columns["start"][0]),
+                                   int(self.columns["end"][:h].max()), path))
+        for col in self.columns.values():
+            col[:self.n - h] = col[h:self.n]
+        self.n -= h
+        self.first_index += h
+
+    def append(self, action: ControlAction):
+        start = _to_us(action.timestamp)
+        if self.n == len(self.columns["start"]) and self.hot_limit is not None:
+            self._evict()
+        if self.n == len(self.columns["start"]):
+            for name, col in self.columns.items():
+                bigger = np.empty(2 * len(col), dtype=col.dtype)
+                bigger[:self.n] = col[:self.n]
+                self.columns[name] = bigger
+        duration_us = int(round(action.duration * 60e6))
+        row = (start, start + duration_us, DEVICE_INDEX[action.device], ACTION_INDEX[action.action],
+               action.is_instant, action.duration)
+        # 模拟器按时间顺序产生动作，通常直接追加；乱序时插入到有序位置（O(n)）
+        i = self.n
+        if i and start < self.columns["start"][i - 1]:
+            i = int(np.searchsorted(self.columns["start"][:self.n], start, side="right"))
+            for col in self.columns.values():
+                col[i + 1:self.n + 1] = col[i:self.n]
+        for (name, _), value in zip(self._COLUMNS, row):
+            self.columns[name][i] = value
+        self.n += 1
+        self.max_duration_us = max(self.max_duration_us, duration_us)
+
+    def extend(self, actions: Iterable[ControlAction]):
+        for action in actions:
+            self.append(action)
+
+    # ---------- 序列接口 ----------
+    def __len__(self) -> int:
+        return self.first_index + self.n
+
+    @staticmethod
+    def _make(c, i: int) -> ControlAction:
+        return ControlAction(timestamp=_from_us(c["start"][i]), device=DEVICES[c["device"][i]],
+                             action=ACTIONS[c["action"][i]], is_instant=bool(c["instant"][i]),
+                             duration=float(c["duration"][i]))
+
+    def _action(self, i: int) -> ControlAction:
+        return self._make(self.columns, i)
+
+    def _load(self, path) -> Dict[str, np.ndarray]:
+        with np.load(path, allow_pickle=False) as data:
+            return {name: data[name] for name, _ in self._COLUMNS}
+
+    def _global(self, i: int) -> ControlAction:
+        if i >= self.first_index:
+            return self._action(i - self.first_index)
+        for first, stop, _, _, path in self._segments:
+            if first <= i < stop:
+                return self._make(self._load(path), i - first)
+        raise IndexError("这段动作已丢弃（未设置 spill_dir）")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._global(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("动作下标越界")
+        return self._global(index)
+
+    def __iter__(self) -> Iterator[ControlAction]:
+        if self.first_index and not self._segments:
+            raise IndexError(f"前 {self.first_index} 个动作已丢弃（未设置 spill_dir）")
+        return self._iter_actions()
+
+    def _iter_actions(self) -> Iterator[ControlAction]:
+        for *_, path in self._segments:
+            c = self._load(path)
+            yield from (self._make(c, i) for i in range(len(c["start"])))
+        yield from (self._action(i) for i in range(self.n))
+
+    # ---------- 查询 ----------
+    def _overlap(self, c, n: int, t0: datetime, t1: datetime, device: Optional[DeviceType]) -> np.ndarray:
+        lo_us, hi_us = _to_us(t0), _to_us(t1)
+        starts = c["start"][:n]
+        lo = int(np.searchsorted(starts, lo_us - self.max_duration_us, side="left"))
+        hi = int(np.searchsorted(starts, hi_us, side="right"))
+        index = np.arange(lo, hi)
+        keep = c["end"][lo:hi] >= lo_us
+        if device is not None:
+            keep &= c["device"][lo:hi] == DEVICE_INDEX[device]
+        return index[keep]
+
+    def overlap_indices(self, t0: datetime, t1: datetime, device: Optional[DeviceType] = None) -> np.ndarray:
+        """
+        与 [t0, t1] 有重叠的动作在内存缓冲中的下标（按开始时间排序）；瞬时动作要求发生在窗口内。
+        设了 hot_limit 时只查内存中的动作，更早的用 replay()。
+        """
+        return self._overlap(self.columns, self.n, t0, t1, device)
+
+    def overlapping(self, t0: datetime, t1: datetime, device: Optional[DeviceType] = None,
+                    limit: Optional[int] = None) -> List[ControlAction]:
+        """与窗口重叠的动作；limit 给定时只取开始最晚的 limit 个"""
+        index = self.overlap_indices(t0, t1, device)
+        if limit is not None:
+            index = index[-limit:] if limit > 0 else index[:0]
+        return [self._action(i) for i in index]
+
+    def replay(self, t0: datetime, t1: datetime, device: Optional[DeviceType] = None) -> List[ControlAction]:
+        """与窗口重叠的全部动作，包括已写入分段文件的；只读取时间范围相交的分段"""
+        lo_us, hi_us = _to_us(t0), _to_us(t1)
+        found = []
+        for first, stop, seg_start, seg_end, path in self._segments:
+            if seg_start <= hi_us and seg_end >= lo_us:
+                c = self._load(path)
+                found.extend(self._make(c, i) for i in self._overlap(c, stop - first, t0, t1, device))
+        found.extend(self.overlapping(t0, t1, device))
+        return found
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """列数组（设备、动作存为 DEVICES / ACTIONS 的下标），用于写入 .npz"""
+        c = {name: col[:self.n] for name, col in self.columns.items()}
+        return {
+            "action_timestamp": c["start"].astype("datetime64[us]"),
+            "action_device": c["device"].copy(),
+            "action_type": c["action"].copy(),
+            "action_instant": c["instant"].copy(),
+            "action_duration": c["duration"].copy(),
+            "labels__action_device": np.array([d.value for d in DEVICES], dtype=str),
+            "labels__action_type": np.array([a.value for a in ACTIONS], dtype=str),
+        }
@@ -0,0 +1,102 @@
+"""
+快进模式
+不经过 Dash 的逐个 interval，直接把一整年（1 分钟或 5 分钟步长）模拟完，结果按列写入压缩 .npz：
+- 单场景：HVACControlSimulator，历史按总步数一次预分配，附带动作表
+- 多场景：VectorHVACSimulator，记录所选字段的 (步数, N) 矩阵
+读取：StateHistory.load(path) 或 np.load(path)
+"""
+
+import pathlib
+from datetime import datetime
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from hvac_history import StateHistory
+from hvac_simulator import HVACControlSimulator
+from hvac_vector import FIELDS, MODES, STATUSES, STRATEGIES, VectorHVACSimulator
+
+OUTPUT_DIR = pathlib.Path(__file__).parent / "output"
+DEFAULT_START = datetime(2025, 1, 1)
+TIMESTEPS = (1, 5)
+# 多场景默认只记录这几列：一年 1 分钟步长 × 100 个场景 × 5 列 ≈ 2 GB，字段越多占用越大
+VECTOR_FIELDS = ("temperature", "humidity", "total_power", "cost", "comfort_score")
+
+
+def horizon_steps(days: float, timestep_minutes: int) -> int:
+    if timestep_minutes not in TIMESTEPS:
+        raise ValueError(f"快进步长只支持 {TIMESTEPS} 分钟")
+    return int(round(days * 24 * 60 / timestep_minutes))
+
+
+def fast_forward(days: float = 365, timestep_minutes: int = 5, start_time: datetime = DEFAULT_START,
+                 seed=42, path=None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> HVACControlSimulator:
+    """
+    单场景快进 days 天；path 不为空时写出 .npz。返回模拟器（history / actions 可直接使用）。
+    progress(已完成步数, 总步数) 每模拟一天调用一次。
+    """
+    steps = horizon_steps(days, timestep_minutes)
+    simulator = HVACControlSimulator(start_time=start_time, timestep_minutes=timestep_minutes, seed=seed)
+    simulator.history = StateHistory(capacity=steps)
+    steps_per_day = 24 * 60 // timestep_minutes
+    step = simulator.step
+    for k in range(1, steps + 1):
+        step()
+        if progress is not None and (k % steps_per_day == 0 or k == steps):
+            progress(k, steps)
+    if path is not None:
+        simulator.history.save(path, timestep_minutes=timestep_minutes, **simulator.actions.to_columns())
+    return simulator
+
+
+def fast_forward_vector(n: int, days: float = 365, timestep_minutes: int = 5,
+                        start_time: datetime = DEFAULT_START, seed=42,
+                        fields: Sequence[str] = VECTOR_FIELDS, path=None) -> Dict[str, np.ndarray]:
+    """n 个场景同步快进；返回 {字段: (步数, n)} 与 timestamp 列，path 不为空时写出 .npz"""
+    unknown = set(fields) - set(FIELDS)
+    if unknown:
+        raise ValueError(f"未知字段：{', '.join(sorted(unknown))}")
+    steps = horizon_steps(days, timestep_minutes)
+    engine = VectorHVACSimulator(n, start_time=start_time, timestep_minutes=timestep_minutes, seed=seed)
+    record = engine.run(steps, record=fields)
+    record["timestamp"] = (np.datetime64(start_time, "us")
+                           + np.arange(1, steps + 1) * np.timedelta64(timestep_minutes, "m"))
+    if path is not None:
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, **record, timestep_minutes=timestep_minutes,
+                            labels__ashp_mode=np.array(MODES), labels__status=np.array(STATUSES),
+                            labels__strategy=np.array(STRATEGIES),
+                            **{f"summary__{k}": v for k, v in engine.summary().items()})
+    return record
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="HVAC 快进模拟（整年）")
+    parser.add_argument("--minutes", type=int, default=5, choices=TIMESTEPS, help="步长（分钟）")
+    parser.add_argument("--days", type=float, default=365)
+    parser.add_argument("--scenarios", type=int, default=1, help=">1 时使用向量化引擎")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=pathlib.Path, default=None)
+    args = parser.parse_args()
+
+    out = args.out or OUTPUT_DIR / f"hvac_{args.days:g}d_{args.minutes}min_x{args.scenarios}.npz"
+    steps = horizon_steps(args.days, args.minutes)
+    t0 = time.perf_counter()
+    if args.scenarios == 1:
+        def report(done, total):
+            print(f"  {done}/{total} 步（{done / (time.perf_counter() - t0):,.0f} 步/s）", end="\r")
+        simulator = fast_forward(args.days, args.minutes, seed=args.seed, path=out, progress=report)
+        print()
+        summary = f"{len(simulator.actions)} 个动作，电费 {simulator.history.column('cost').sum():,.0f} 元"
+    else:
+        record = fast_forward_vector(args.scenarios, args.days, args.minutes, seed=args.seed, path=out)
+        summary = f"电费中位数 {np.median(record['cost'].sum(axis=0)):,.0f} 元"
+    elapsed = time.perf_counter() - t0
+    print(f"{args.days:g} 天 × {args.minutes} 分钟步长 = {steps} 步 × {args.scenarios} 个场景："
+          f"{elapsed:.1f} s，{summary}")
+    print(f"已写入 {out}（{out.stat().st_size / 1e6:.1f} MB）")
@@ -0,0 +1,310 @@
+"""
+按列存放的 HVAC 状态历史
+每个字段一列预分配的 NumPy 数组，写满后容量翻倍；每步只写一行，不再复制整个 HVACState。
+按下标取出的是只读的轻量记录（__slots__），按切片取出的是共享底层数组的窗口，
+需要整段数据时直接用 column() 取列。
+
+长时间运行时可设 hot_limit：内存里只保留最近 hot_limit~2×hot_limit 行（2×hot_limit 的缓冲写满时
+把较早的一半搬走，摊销 O(1)），最近 hot_limit 行的窗口始终是零拷贝视图；
+设了 spill_dir 时搬走的部分写成压缩列式分段文件，下标、切片、replay() 仍可访问（从磁盘读取）。
+"""
+
+import os
+import pathlib
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+# (字段名, 类型)：float / optional（None 存为 NaN）/ bool / int / category（字符串编码）/ time
+STATE_COLUMNS = (
+    ("timestamp", "time"),
+    ("temperature", "float"),
+    ("humidity", "float"),
+    ("temp_pred", "optional"),
+    ("hum_pred", "optional"),
+    ("ashp_power", "float"),
+    ("erv_power", "float"),
+    ("deh_power", "float"),
+    ("total_power", "float"),
+    ("power_pred", "optional"),
+    ("electricity_price", "float"),
+    ("cost", "float"),
+    ("cost_pred", "optional"),
+    ("ashp_on", "bool"),
+    ("ashp_mode", "category"),
+    ("ashp_setpoint", "float"),
+    ("ashp_fan_speed", "int"),
+    ("erv_on", "bool"),
+    ("erv_fan_speed", "int"),
+    ("deh_on", "bool"),
+    ("strategy", "category"),
+    ("status", "category"),
+    ("comfort_score", "float"),
+)
+COLUMN_NAMES = tuple(name for name, _ in STATE_COLUMNS)
+_OPTIONAL = tuple(name for name, kind in STATE_COLUMNS if kind == "optional")
+_CATEGORY = tuple(name for name, kind in STATE_COLUMNS if kind == "category")
+_PLAIN = tuple(name for name in COLUMN_NAMES if name not in _OPTIONAL + _CATEGORY)
+
+_DTYPES = {
+    "time": "datetime64[us]", "float": np.float64, "optional": np.float64,
+    "bool": np.bool_, "int": np.int16, "category": np.int8,
+}
+
+
+class _Storage:
+    """底层列数组；所有窗口与记录共享同一份"""
+
+    def __init__(self, capacity: int, labels: Optional[dict] = None, codes: Optional[dict] = None):
+        capacity = max(capacity, 1)
+        self.n = 0
+        self.columns = {name: np.empty(capacity, dtype=_DTYPES[kind]) for name, kind in STATE_COLUMNS}
+        # 标签只追加不修改，搬移后的新存储与旧窗口共用同一份
+        self.labels = labels if labels is not None else {name: [] for name, kind in STATE_COLUMNS if kind == "category"}
+        self.codes = codes if codes is not None else {name: {} for name in self.labels}
+
+    @property
+    def capacity(self) -> int:
+        return len(self.columns["temperature"])
+
+    def grow(self):
+        for name, col in self.columns.items():
+            bigger = np.empty(max(2 * len(col), 16), dtype=col.dtype)
+            bigger[:self.n] = col[:self.n]
+            self.columns[name] = bigger
+
+    def encode(self, name: str, value: str) -> int:
+        code = self.codes[name].get(value)
+        if code is None:
+            code = self.codes[name][value] = len(self.labels[name])
+            self.labels[name].append(value)
+        return code
+
+
+class StateRecord:
+    """历史中的一行，属性与 HVACState 相同，只读"""
+    __slots__ = ("_storage", "_index")
+
+    def __init__(self, storage: _Storage, index: int):
+        self._storage = storage
+        self._index = index
+
+    def __repr__(self):
+        return f"StateRecord({self.timestamp:%Y-%m-%d %H:%M}, T={self.temperature:.2f}, RH={self.humidity:.1f})"
+
+    def to_state(self):
+        from hvac_simulator import HVACState
+        return HVACState(**{name: getattr(self, name) for name in COLUMN_NAMES})
+
+
+def _make_getter(name: str, kind: str):
+    if kind == "time":
+        def getter(self):
+            return self._storage.columns[name][self._index].item()
+    elif kind == "optional":
+        def getter(self):
+            value = float(self._storage.columns[name][self._index])
+            return None if value != value else value
+    elif kind == "float":
+        def getter(self):
+            return float(self._storage.columns[name][self._index])
+    elif kind == "bool":
+        def getter(self):
+            return bool(self._storage.columns[name][self._index])
+    elif kind == "int":
+        def getter(self):
+            return int(self._storage.columns[name][self._index])
+    else:
+        def getter(self):
+            return self._storage.labels[name][self._storage.columns[name][self._index]]
+    return property(getter)
+
+
+for _name, _kind in STATE_COLUMNS:
+    setattr(StateRecord, _name, _make_getter(_name, _kind))
+
+
+def _write_npz(path: pathlib.Path, arrays: dict):
+    """压缩写入 .npz，先写临时文件再替换"""
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+class StateHistory:
+    """
+    状态历史（序列接口与原来的 List[HVACState] 兼容：len、下标、切片、迭代）。
+    根对象随 append 增长；切片得到固定范围的窗口，共享底层数组。
+    根对象的下标是全局步号（含已搬出内存的部分）；column() / timestamps() / decoded() / save()
+    只覆盖内存中的行（从 first_index 起），更早的数据用 replay() 读取。
+    设了 hot_limit 但没有 spill_dir 时，搬出的行直接丢弃：len() 仍是追加过的总行数（步号不变），
+    访问、回放或迭代到已丢弃的行都会抛出 IndexError；只需要最近的数据时用 history[-k:]。
+    """
+
+    def __init__(self, capacity: int = 1024, hot_limit: Optional[int] = None, spill_dir=None,
+                 _storage: Optional[_Storage] = None, _start: int = 0, _stop: Optional[int] = None):
+        if hot_limit is not None:
+            capacity = 2 * hot_limit
+        self._storage = _storage or _Storage(capacity)
+        self._start = _start
+        self._stop = _stop          # None 表示根对象，范围随 append 增长
+        self.hot_limit = hot_limit
+        self.spill_dir = pathlib.Path(spill_dir) if spill_dir is not None else None
+        self.first_index = 0        # 内存中第一行的全局步号
+        self._segments = []         # [(起始步号, 结束步号, 文件)]
+
+    # ---------- 写入 ----------
+    def append(self, state):
+        if self._stop is not None:
+            raise TypeError("历史窗口是只读的")
+        storage = self._storage
+        if storage.n == storage.capacity:
+            if self.hot_limit is not None:
+                storage = self._evict()
+            else:
+                storage.grow()
+        i = storage.n
+        cols = storage.columns
+        for name in _PLAIN:
+            cols[name][i] = getattr(state, name)
+        for name in _OPTIONAL:
+            value = getattr(state, name)
+            cols[name][i] = np.nan if value is None else value
+        for name in _CATEGORY:
+            cols[name][i] = storage.encode(name, getattr(state, name))
+        storage.n += 1
+
+    def _evict(self) -> _Storage:
+        """缓冲写满：较早的一半写入分段文件（若设了 spill_dir），较新的一半搬到新缓冲；旧窗口仍指向旧缓冲"""
+        old, h = self._storage, self.hot_limit
+        if self.spill_dir is not None:
+            path = self.spill_dir / f"history_{self.first_index:012d}.npz"
+            _write_npz(path, self._arrays(old, 0, h))
+            self._segments.append((self.first_index, self.first_index + h, path))
+        new = _Storage(2 * h, labels=old.labels, codes=old.codes)
+        for name, col in old.columns.items():
+            new.columns[name][:old.n - h] = col[h:old.n]
+        new.n = old.n - h
+        self._storage = new
+        self.first_index += h
+        return new
+
+    # ---------- 读取 ----------
+    def _bounds(self):
+        stop = self._storage.n if self._stop is None else self._stop
+        return self._start, stop
+
+    def __len__(self) -> int:
+        start, stop = self._bounds()
+        return self.first_index + stop - start
+
+    def __getitem__(self, index):
+        total = len(self)
+        if isinstance(index, slice):
+            lo, hi, step = index.indices(total)
+            if step != 1:
+                raise ValueError("历史窗口不支持步长")
+            hi = max(lo, hi)
+            if lo < self.first_index:
+                return self.replay(lo, hi)
+            start = self._start + lo - self.first_index
+            return StateHistory(_storage=self._storage, _start=start, _stop=start + hi - lo)
+        if index < 0:
+            index += total
+        if not 0 <= index < total:
+            raise IndexError("历史下标越界")
+        if index < self.first_index:
+            return self.replay(index, index + 1)[0]
+        return StateRecord(self._storage, self._start + index - self.first_index)
+
+    def _check_retained(self, start: int):
+        """全局步号 start 起的行是否都还能读到（内存或分段文件）"""
+        if start < self.first_index and (not self._segments or start < self._segments[0][0]):
+            raise IndexError(f"前 {self.first_index} 行已丢弃（未设置 spill_dir）")
+
+    def __iter__(self) -> Iterator[StateRecord]:
+        self._check_retained(0)
+        return self._iter_rows()
+
+    def _iter_rows(self) -> Iterator[StateRecord]:
+        for first, stop, path in self._segments:
+            yield from StateHistory.load(path)
+        start, stop = self._bounds()
+        yield from (StateRecord(self._storage, i) for i in range(start, stop))
+
+    def replay(self, start: int, stop: int) -> "StateHistory":
+        """全局步号 [start, stop) 的历史（独立副本），跨越已写入磁盘的分段时从文件读取"""
+        stop = min(stop, len(self))
+        self._check_retained(start)
+        parts = []
+        for first, last, path in self._segments:
+            if first < stop and last > start:
+                with np.load(path, allow_pickle=False) as data:
+                    parts.append({name: data[name][max(start, first) - first:min(stop, last) - first]
+                                  for name in COLUMN_NAMES})
+        if stop > self.first_index:
+            lo = max(start, self.first_index) - self.first_index + self._start
+            hi = stop - self.first_index + self._start
+            parts.append({name: self._storage.columns[name][lo:hi] for name in COLUMN_NAMES})
+        n = sum(len(part["temperature"]) for part in parts)
+        storage = _Storage(n, labels=self._storage.labels, codes=self._storage.codes)
+        for name in COLUMN_NAMES:
+            if parts:
+                storage.columns[name][:n] = np.concatenate([part[name] for part in parts])
+        storage.n = n
+        return StateHistory(_storage=storage)
+
+    def column(self, name: str) -> np.ndarray:
+        """整列（只读视图）；category 列返回编码，用 labels() 取对应字符串"""
+        start, stop = self._bounds()
+        view = self._storage.columns[name][start:stop]
+        view.flags.writeable = False
+        return view
+
+    def labels(self, name: str) -> List[str]:
+        return list(self._storage.labels[name])
+
+    def decoded(self, name: str) -> List[str]:
+        labels = self._storage.labels[name]
+        return [labels[code] for code in self.column(name).tolist()]
+
+    def timestamps(self) -> List[datetime]:
+        return self.column("timestamp").tolist()
+
+    @property
+    def nbytes(self) -> int:
+        """底层数组占用的字节数（含预留容量）"""
+        return sum(col.nbytes for col in self._storage.columns.values())
+
+    # ---------- 存取 ----------
+    @staticmethod
+    def _arrays(storage: _Storage, start: int, stop: int) -> dict:
+        arrays = {name: storage.columns[name][start:stop] for name in COLUMN_NAMES}
+        for name in _CATEGORY:
+            arrays[f"labels__{name}"] = np.array(storage.labels[name], dtype=str)
+        return arrays
+
+    def save(self, path, **extra):
+        """
+        按列写入一个压缩 .npz：每列一个数组，字符串列的标签另存为 labels__<列名>；
+        extra 为附加数组（如动作表、步长）。先写临时文件再替换。
+        """
+        start, stop = self._bounds()
+        _write_npz(path, {**self._arrays(self._storage, start, stop), **extra})
+
+    @classmethod
+    def load(cls, path) -> "StateHistory":
+        with np.load(path, allow_pickle=False) as data:
+            n = len(data["temperature"])
+            history = cls(capacity=n)
+            storage = history._storage
+            for name in COLUMN_NAMES:
+                storage.columns[name][:n] = data[name]
+            for name in _CATEGORY:
+                storage.labels[name] = data[f"labels__{name}"].tolist()
+                storage.codes[name] = {label: i for i, label in enumerate(storage.labels[name])}
+            storage.n = n
+        return history
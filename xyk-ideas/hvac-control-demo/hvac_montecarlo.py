@@ -0,0 +1,149 @@
+"""
+自适应策略的蒙特卡洛评估
+用 spawn_seeds 为每次模拟派生独立的随机数流，分块交给进程池并行运行；
+每次模拟只回传一行摘要（不回传历史），主进程边收边累计，最后给出各指标的分位数表。
+结果只取决于根种子和模拟次数，与进程数、完成顺序无关。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from hvac_simulator import HVACControlSimulator, spawn_seeds
+
+# 每次模拟的摘要指标（名称与 VectorHVACSimulator.summary() 一致的部分保持一致）
+METRICS = ("mean_comfort", "min_comfort", "energy_kwh", "cost", "actions", "warning_steps", "fault_steps")
+PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_START = datetime(2025, 1, 1)
+
+
+def summarize(simulator: HVACControlSimulator) -> Dict[str, float]:
+    """一次模拟的摘要，直接在历史列上计算"""
+    history = simulator.history
+    comfort = history.column("comfort_score")
+    status = history.decoded("status")
+    hours = simulator.timestep_minutes / 60.0
+    return {
+        "mean_comfort": float(comfort.mean()),
+        "min_comfort": float(comfort.min()),
+        "energy_kwh": float(history.column("total_power").sum() * hours),
+        "cost": float(history.column("cost").sum()),
+        "actions": len(simulator.actions),
+        "warning_steps": status.count("预警"),
+        "fault_steps": status.count("故障"),
+    }
+
+
+def run_once(seed, start_time: datetime = DEFAULT_START, steps: int = 288,
+             timestep_minutes: int = 5) -> Dict[str, float]:
+    simulator = HVACControlSimulator(start_time=start_time, timestep_minutes=timestep_minutes, seed=seed)
+    simulator.simulate(steps)
+    return summarize(simulator)
+
+
+def _run_chunk(indices: Sequence[int], seeds: Sequence[np.random.SeedSequence], start_time: datetime,
+               steps: int, timestep_minutes: int) -> List[Dict[str, float]]:
+    """进程池任务：连续跑一块模拟，减少进程间往返"""
+    return [dict(run=i, **run_once(seed, start_time, steps, timestep_minutes)) for i, seed in zip(indices, seeds)]
+
+
+class RunningPercentiles:
+    """逐条累计摘要；每个指标一列可增长数组，随时可出分位数表"""
+
+    def __init__(self, metrics: Sequence[str] = METRICS, capacity: int = 1024):
+        self.metrics = tuple(metrics)
+        self.count = 0
+        self._values = np.empty((len(self.metrics), capacity))
+
+    def add(self, summary: Dict[str, float]):
+        if self.count == self._values.shape[1]:
+            bigger = np.empty((len(self.metrics), 2 * self._values.shape[1]))
+            bigger[:, :self.count] = self._values[:, :self.count]
+            self._values = bigger
+        self._values[:, self.count] = [summary[m] for m in self.metrics]
+        self.count += 1
+
+    def values(self, metric: str) -> np.ndarray:
+        return self._values[self.metrics.index(metric), :self.count]
+
+    def table(self, percentiles: Sequence[float] = PERCENTILES) -> pd.DataFrame:
+        """指标 × (均值, 标准差, P5 … P95)"""
+        data = self._values[:, :self.count]
+        if self.count == 0:
+            return pd.DataFrame(index=list(self.metrics))
+        table = pd.DataFrame(np.percentile(data, percentiles, axis=1).T, index=list(self.metrics),
+                             columns=[f"P{p:g}" for p in percentiles])
+        table.insert(0, "std", data.std(axis=1))
+        table.insert(0, "mean", data.mean(axis=1))
+        return table
+
+
+def iter_runs(n_runs: int, seed=2025, start_time: datetime = DEFAULT_START, days: float = 1.0,
+              timestep_minutes: int = 5, workers: Optional[int] = None,
+              chunk_size: Optional[int] = None) -> Iterator[Dict[str, float]]:
+    """
+    按完成顺序逐条产出每次模拟的摘要（含 run 序号）。
+    workers=1 时在当前进程内运行；否则用进程池，任务按块提交，每块完成即产出。
+    """
+    steps = int(round(days * 24 * 60 / timestep_minutes))
+    seeds = spawn_seeds(seed, n_runs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for i, child in enumerate(seeds):
+            yield dict(run=i, **run_once(child, start_time, steps, timestep_minutes))
+        return
+
+    chunk_size = chunk_size or max(1, min(32, n_runs // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_run_chunk, range(lo, min(lo + chunk_size, n_runs)), seeds[lo:lo + chunk_size],
+                        start_time, steps, timestep_minutes)
+            for lo in range(0, n_runs, chunk_size)
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def run_monte_carlo(n_runs: int, seed=2025, progress: Optional[Callable[[int, RunningPercentiles], None]] = None,
+                    **options):
+    """
+    跑 n_runs 次模拟，返回 (逐次摘要表（按 run 排序）, 分位数表)。
+    progress(已完成次数, 累计器) 在每条摘要到达后调用，可用来实时刷新中间分位数。
+    """
+    stats = RunningPercentiles()
+    rows = []
+    for summary in iter_runs(n_runs, seed=seed, **options):
+        rows.append(summary)
+        stats.add(summary)
+        if progress is not None:
+            progress(stats.count, stats)
+    runs = pd.DataFrame(rows, columns=["run", *METRICS]).sort_values("run").reset_index(drop=True)
+    return runs, stats.table()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="自适应策略蒙特卡洛评估")
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--days", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args()
+
+    def report(done, stats):
+        if done % max(1, args.runs // 10) == 0:
+            p = np.percentile(stats.values("cost"), [5, 50, 95])
+            print(f"  已完成 {done}/{args.runs}，电费 P5/P50/P95 = {p.round(2)} 元")
+
+    t0 = time.perf_counter()
+    runs, table = run_monte_carlo(args.runs, seed=args.seed, days=args.days, workers=args.workers, progress=report)
+    elapsed = time.perf_counter() - t0
+    print(f"\n{args.runs} 次 × {args.days:g} 天，{args.workers or os.cpu_count()} 个进程：{elapsed:.1f} s"
+          f"（{args.runs / elapsed:.1f} 次/s）\n")
+    print(table.round(3).to_string())
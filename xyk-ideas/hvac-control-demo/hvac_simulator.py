@@ -5,11 +5,62 @@ HVAC Control Strategy Simulator
 """
 
 import numpy as np
+from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from hvac_history import StateHistory, StateRecord
+from hvac_trend import DEFAULT_HORIZON, DEFAULT_WINDOW, TrendTracker
+
+
+# 每步随机数的用途（下标）
+U_ASHP_OFF, U_SETPOINT, U_FAN, U_DEHUMID, U_ERV_FAN, U_FAULT = range(6)
+Z_TEMP, Z_HUM, Z_PRED_TEMP, Z_PRED_HUM, Z_PRED_POWER, Z_PRED_COST = range(6)
+RANDOM_UNIFORMS = 6
+RANDOM_NORMALS = 6
+
+
+def _clip(value, lo: float, hi: float) -> np.float64:
+    """标量裁剪：结果与 np.clip 相同（np.float64），但不经过数组分派，逐步模拟里快得多"""
+    return np.float64(lo if value < lo else hi if value > hi else value)
+
+
+def make_seed_sequence(seed=None) -> np.random.SeedSequence:
+    """种子可以是整数、SeedSequence 或 None（取系统熵）"""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+def spawn_seeds(seed, n: int) -> List[np.random.SeedSequence]:
+    """由一个根种子派生 n 个互不相关的子种子，用于并行的多次模拟（结果与进程数、调度顺序无关）"""
+    return make_seed_sequence(seed).spawn(n)
+
+
+@dataclass
+class DisturbanceTrace:
+    """
+    预先生成的扰动序列：每步一行均匀 / 正态随机数（用途见上面的下标常量）。
+    传给模拟器的 trace 参数后按步取行、不再抽随机数，多个策略或参数可在完全相同的噪声下对比。
+    """
+    uniform: np.ndarray   # (步数, RANDOM_UNIFORMS)
+    normal: np.ndarray    # (步数, RANDOM_NORMALS)
+
+    def __len__(self) -> int:
+        return len(self.uniform)
+
+    @classmethod
+    def generate(cls, seed, steps: int) -> "DisturbanceTrace":
+        rng = np.random.default_rng(make_seed_sequence(seed))
+        return cls(rng.random((steps, RANDOM_UNIFORMS)), rng.standard_normal((steps, RANDOM_NORMALS)))
+
+    @classmethod
+    def spawn(cls, seed, n: int, steps: int) -> List["DisturbanceTrace"]:
+        """n 条互相独立的扰动序列"""
+        return [cls.generate(child, steps) for child in spawn_seeds(seed, n)]
+
 
 class DeviceType(Enum):
     """设备类型"""
@@ -94,14 +145,28 @@ class HVACState:
 class HVACControlSimulator:
     """HVAC控制策略模拟器"""
 
-    def __init__(self, start_time: datetime = None, timestep_minutes: int = 5):
+    def __init__(self, start_time: datetime = None, timestep_minutes: int = 5, seed=42,
+                 trend_window: int = DEFAULT_WINDOW, forecast_horizon: int = DEFAULT_HORIZON,
+                 strategy="adaptive", trace: Optional[DisturbanceTrace] = None,
+                 history_limit: Optional[int] = None, spill_dir=None):
         """
         初始化模拟器
 
         Args:
             start_time: 起始时间
             timestep_minutes: 时间步长（分钟）
+            seed: 随机种子（整数、SeedSequence 或 None）；每个模拟器有独立的随机数流，互不干扰
+            trend_window: 预测所用的趋势窗口（步）
+            forecast_horizon: 预测提前的步数
+            strategy: 控制策略名称（见 hvac_strategies.STRATEGY_REGISTRY）或 ControlStrategy 实例
+            trace: 扰动序列；给定时按步取用，不再从 seed 抽随机数
+            history_limit: 内存中至少保留的最近步数/动作数；None 表示全部保留
+            spill_dir: 超出 history_limit 的历史与动作写入此目录（每次运行一个 run_NNN 子目录），仍可回放
         """
+        from hvac_strategies import get_strategy
+        self.strategy = get_strategy(strategy)
+        self.trace = trace
+
         self.start_time = start_time or datetime.now()
         self.timestep_minutes = timestep_minutes
         self.current_step = 0
@@ -110,19 +175,32 @@ class HVACControlSimulator:
         self.state = HVACState(
             timestamp=self.start_time,
             temperature=22.0,
-            humidity=60.0
+            humidity=60.0,
+            strategy=self.strategy.label,
         )
 
-        # 历史数据
-        self.history: List[HVACState] = []
-        self.actions: List[ControlAction] = []
+        # 历史数据（按列存放，每步写一行）；动作按开始时间索引，支持窗口重叠查询
+        self.history_limit = history_limit
+        self.spill_dir = spill_dir
+        self._runs = 0
+        self._new_logs()
+
+        # 温度、湿度、功率、电费的滚动趋势（每步 O(1) 更新）
+        self.forecast_horizon = forecast_horizon
+        self.trend = TrendTracker(window=trend_window)
 
         # 峰谷电价设定 (元/kWh)
         self.peak_price = 1.2  # 高峰电价 8:00-22:00
         self.valley_price = 0.4  # 低谷电价 22:00-8:00
 
-        # 随机种子（用于可重复的模拟）
-        np.random.seed(42)
+        # 随机数流（用于可重复的模拟），不使用全局 np.random 状态
+        self.seed_sequence = make_seed_sequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
+
+        # 本步的随机数：每步固定抽取一组，无论分支是否用到，
+        # 保证随机序列只与步数有关（向量化引擎 N=1 时与本模拟器逐步一致）
+        self._uniform = np.zeros(RANDOM_UNIFORMS)
+        self._normal = np.zeros(RANDOM_NORMALS)
 
     def _get_electricity_price(self, timestamp: datetime) -> float:
         """获取当前时段电价"""
@@ -153,10 +231,10 @@ class HVACControlSimulator:
             control_effect = 0
 
         # 随机噪声
-        noise = np.random.normal(0, 0.2)
+        noise = 0.2 * self._normal[Z_TEMP]
 
         new_temp = self.state.temperature + (daily_variation + control_effect + noise) * 0.1
-        return np.clip(new_temp, 18.0, 28.0)
+        return _clip(new_temp, 18.0, 28.0)
 
     def _generate_humidity_actual(self) -> float:
         """生成实测湿度"""
@@ -178,45 +256,34 @@ class HVACControlSimulator:
             erv_effect = 0
 
         # 随机噪声
-        noise = np.random.normal(0, 1.0)
+        noise = 1.0 * self._normal[Z_HUM]
 
         new_hum = self.state.humidity + (dehumid_effect + erv_effect + noise) * 0.2
-        return np.clip(new_hum, 40.0, 80.0)
+        return _clip(new_hum, 40.0, 80.0)
 
-    def _generate_prediction(self, steps_ahead: int = 5) -> Tuple[float, float, float, float]:
+    def _generate_prediction(self, steps_ahead: Optional[int] = None) -> Tuple[float, float, float, float]:
         """
-        生成预测值（提前steps_ahead步）
+        生成预测值（提前steps_ahead步，默认 forecast_horizon）
 
         Returns:
             (预测温度, 预测湿度, 预测功率, 预测电费)
         """
-        # 简单的线性预测模型
-        if len(self.history) >= 3:
-            recent_temps = [s.temperature for s in self.history[-3:]]
-            temp_trend = np.mean(np.diff(recent_temps))
-            temp_pred = self.state.temperature + temp_trend * steps_ahead
-
-            recent_hums = [s.humidity for s in self.history[-3:]]
-            hum_trend = np.mean(np.diff(recent_hums))
-            hum_pred = self.state.humidity + hum_trend * steps_ahead
-
-            recent_powers = [s.total_power for s in self.history[-3:]]
-            power_trend = np.mean(np.diff(recent_powers))
-            power_pred = self.state.total_power + power_trend * steps_ahead
-
-            recent_costs = [s.cost for s in self.history[-3:]]
-            cost_trend = np.mean(np.diff(recent_costs))
-            cost_pred = self.state.cost + cost_trend * steps_ahead
+        # 简单的线性预测模型：最近 trend_window 步的平均变化量外推
+        if self.trend.ready:
+            steps_ahead = self.forecast_horizon if steps_ahead is None else steps_ahead
+            temp_pred, hum_pred, power_pred, cost_pred = self.trend.forecast(
+                (self.state.temperature, self.state.humidity, self.state.total_power, self.state.cost),
+                steps_ahead)
         else:
             # 初始阶段，预测值接近当前值
-            temp_pred = self.state.temperature + np.random.normal(0, 0.5)
-            hum_pred = self.state.humidity + np.random.normal(0, 2.0)
-            power_pred = self.state.total_power + np.random.normal(0, 0.2)
-            cost_pred = self.state.cost + np.random.normal(0, 0.01)
+            temp_pred = self.state.temperature + 0.5 * self._normal[Z_PRED_TEMP]
+            hum_pred = self.state.humidity + 2.0 * self._normal[Z_PRED_HUM]
+            power_pred = self.state.total_power + 0.2 * self._normal[Z_PRED_POWER]
+            cost_pred = self.state.cost + 0.01 * self._normal[Z_PRED_COST]
 
         return (
-            np.clip(temp_pred, 18.0, 28.0),
-            np.clip(hum_pred, 40.0, 80.0),
+            _clip(temp_pred, 18.0, 28.0),
+            _clip(hum_pred, 40.0, 80.0),
             max(0, power_pred),
             max(0, cost_pred)
         )
@@ -272,146 +339,24 @@ class HVACControlSimulator:
         return round(comfort_score, 1)
 
     def _generate_control_actions(self) -> List[ControlAction]:
-        """生成控制动作序列 - 更积极的自适应控制"""
-        actions = []
-        current_time = self.state.timestamp
-        temp = self.state.temperature
-        hum = self.state.humidity
-
-        # ========== ASHP 温度控制（更灵敏的阈值） ==========
-        # 温度过高 -> 制冷
-        if temp > 23.5 and not self.state.ashp_on:
-            actions.append(ControlAction(
-                timestamp=current_time, device=DeviceType.ASHP,
-                action=ActionType.ASHP_ON, is_instant=True
-            ))
-            actions.append(ControlAction(
-                timestamp=current_time, device=DeviceType.ASHP,
-                action=ActionType.ASHP_COOLING, is_instant=False, duration=40.0
-            ))
-            self.state.ashp_on = True
-            self.state.ashp_mode = "制冷"
-            self.state.ashp_setpoint = 22.0
-
-        # 温度过低 -> 制热
-        elif temp < 21.5 and not self.state.ashp_on:
-            actions.append(ControlAction(
-                timestamp=current_time, device=DeviceType.ASHP,
-                action=ActionType.ASHP_ON, is_instant=True
-            ))
-            actions.append(ControlAction(
-                timestamp=current_time, device=DeviceType.ASHP,
-                action=ActionType.ASHP_HEATING, is_instant=False, duration=40.0
-            ))
-            self.state.ashp_on = True
-            self.state.ashp_mode = "制热"
-            self.state.ashp_setpoint = 23.0
-
-        # 温度达标 -> 关闭ASHP
-        elif self.state.ashp_on and 22.0 <= temp <= 23.0:
-            if np.random.random() < 0.5:  # 50%概率关闭 - 更频繁
-                actions.append(ControlAction(
-                    timestamp=current_time, device=DeviceType.ASHP,
-                    action=ActionType.ASHP_OFF, is_instant=True
-                ))
-                self.state.ashp_on = False
-                self.state.ashp_mode = "待机"
-
-        # ========== ASHP 模式切换（运行时微调） ==========
-        if self.state.ashp_on:
-            # 设定温度微调
-            if np.random.random() < 0.45:  # 45%概率调整设定温度 - 更频繁
-                if temp > self.state.ashp_setpoint + 0.5:
-                    actions.append(ControlAction(
-                        timestamp=current_time, device=DeviceType.ASHP,
-                        action=ActionType.ASHP_TEMP_DOWN, is_instant=False, duration=20.0
-                    ))
-                    self.state.ashp_setpoint = max(20.0, self.state.ashp_setpoint - 0.5)
-                elif temp < self.state.ashp_setpoint - 0.5:
-                    actions.append(ControlAction(
-                        timestamp=current_time, device=DeviceType.ASHP,
-                        action=ActionType.ASHP_TEMP_UP, is_instant=False, duration=20.0
-                    ))
-                    self.state.ashp_setpoint = min(26.0, self.state.ashp_setpoint + 0.5)
-
-            # 风速调节（更频繁）
-            if np.random.random() < 0.5:  # 50%概率调整风速 - 更频繁
-                temp_diff = abs(temp - self.state.ashp_setpoint)
-                if temp_diff > 1.0 and self.state.ashp_fan_speed < 5:
-                    actions.append(ControlAction(
-                        timestamp=current_time, device=DeviceType.ASHP,
-                        action=ActionType.ASHP_FAN_UP, is_instant=False, duration=25.0
-                    ))
-                    self.state.ashp_fan_speed = min(5, self.state.ashp_fan_speed + 1)
-                elif temp_diff < 0.5 and self.state.ashp_fan_speed > 1:
-                    actions.append(ControlAction(
-                        timestamp=current_time, device=DeviceType.ASHP,
-                        action=ActionType.ASHP_FAN_DOWN, is_instant=False, duration=25.0
-                    ))
-                    self.state.ashp_fan_speed = max(1, self.state.ashp_fan_speed - 1)
-
-            # 除湿模式切换
-            if hum > 65 and self.state.ashp_mode != "除湿" and np.random.random() < 0.35:
-                actions.append(ControlAction(
-                    timestamp=current_time, device=DeviceType.ASHP,
-                    action=ActionType.ASHP_DEHUMID, is_instant=False, duration=35.0
-                ))
-                self.state.ashp_mode = "除湿"
-
-        # ========== DEH 除湿控制（更灵敏） ==========
-        if hum > 65 and not self.state.deh_on:
-            actions.append(ControlAction(
-                timestamp=current_time, device=DeviceType.DEH,
-                action=ActionType.DEH_ON, is_instant=True
-            ))
-            self.state.deh_on = True
-        elif hum < 58 and self.state.deh_on:
-            actions.append(ControlAction(
-                timestamp=current_time, device=DeviceType.DEH,
-                action=ActionType.DEH_OFF, is_instant=True
-            ))
-            self.state.deh_on = False
-
-        # ========== ERV 通风控制（更动态） ==========
-        hour = current_time.hour
-        if 7 <= hour < 21 and not self.state.erv_on:
-            actions.append(ControlAction(
-                timestamp=current_time, device=DeviceType.ERV,
-                action=ActionType.ERV_ON, is_instant=True
-            ))
-            self.state.erv_on = True
-            self.state.erv_fan_speed = 2
-        elif (hour >= 21 or hour < 7) and self.state.erv_on:
-            actions.append(ControlAction(
-                timestamp=current_time, device=DeviceType.ERV,
-                action=ActionType.ERV_OFF, is_instant=True
-            ))
-            self.state.erv_on = False
-
-        # ERV风速动态调节
-        if self.state.erv_on and np.random.random() < 0.4:  # 40%概率调整 - 更频繁
-            if hum > 60 and self.state.erv_fan_speed < 3:
-                actions.append(ControlAction(
-                    timestamp=current_time, device=DeviceType.ERV,
-                    action=ActionType.ERV_FAN_UP, is_instant=False, duration=30.0
-                ))
-                self.state.erv_fan_speed = min(3, self.state.erv_fan_speed + 1)
-            elif hum < 55 and self.state.erv_fan_speed > 1:
-                actions.append(ControlAction(
-                    timestamp=current_time, device=DeviceType.ERV,
-                    action=ActionType.ERV_FAN_DOWN, is_instant=False, duration=30.0
-                ))
-                self.state.erv_fan_speed = max(1, self.state.erv_fan_speed - 1)
-
-        return actions
-
-    def step(self) -> HVACState:
+        """生成控制动作序列（由当前控制策略决定，见 hvac_strategies）"""
+        return self.strategy.control(self)
+
+    def step(self) -> StateRecord:
         """
         执行一个时间步的模拟
 
         Returns:
-            当前时刻的系统状态
+            当前时刻的系统状态（历史中的只读记录）
         """
+        # 本步随机数（先均匀后正态，顺序固定）；有扰动序列时直接取对应行
+        if self.trace is not None:
+            self._uniform = self.trace.uniform[self.current_step]
+            self._normal = self.trace.normal[self.current_step]
+        else:
+            self._uniform = self.rng.random(RANDOM_UNIFORMS)
+            self._normal = self.rng.standard_normal(RANDOM_NORMALS)
+
         # 更新时间
         self.current_step += 1
         self.state.timestamp = self.start_time + timedelta(minutes=self.timestep_minutes * self.current_step)
@@ -425,7 +370,7 @@ class HVACControlSimulator:
         self.state.humidity = self._generate_humidity_actual()
 
         # 生成预测
-        self.state.temp_pred, self.state.hum_pred, self.state.power_pred, self.state.cost_pred = self._generate_prediction(steps_ahead=5)
+        self.state.temp_pred, self.state.hum_pred, self.state.power_pred, self.state.cost_pred = self._generate_prediction()
 
         # 计算功率
         power = self._calculate_power_consumption()
@@ -445,23 +390,20 @@ class HVACControlSimulator:
         # 状态评估
         if self.state.comfort_score < 60:
             self.state.status = "预警"
-        elif np.random.random() < 0.02:  # 2%概率模拟故障
+        elif self._uniform[U_FAULT] < 0.02:  # 2%概率模拟故障
             self.state.status = "故障"
             self.state.strategy = "故障诊断中"
         else:
             self.state.status = "正常"
-            self.state.strategy = "自适应控制"
+            self.state.strategy = self.strategy.label
 
-        # 保存历史
+        # 保存历史：写入列数组中的一行，self.state 继续作为下一步的工作状态
         self.history.append(self.state)
-
-        # 创建新状态副本（避免引用问题）
-        from copy import deepcopy
-        self.state = deepcopy(self.state)
+        self.trend.update((self.state.temperature, self.state.humidity, self.state.total_power, self.state.cost))
 
         return self.history[-1]
 
-    def simulate(self, num_steps: int) -> Tuple[List[HVACState], List[ControlAction]]:
+    def simulate(self, num_steps: int) -> Tuple[StateHistory, "ActionStore"]:
         """
         运行多步模拟
 
@@ -482,10 +424,30 @@ class HVACControlSimulator:
         self.state = HVACState(
             timestamp=self.start_time,
             temperature=22.0,
-            humidity=60.0
+            humidity=60.0,
+            strategy=self.strategy.label,
         )
-        self.history = []
-        self.actions = []
+        self._runs += 1
+        self._new_logs()
+        self.trend.reset()
+        self.rng = np.random.default_rng(self.seed_sequence)
+
+    def _new_logs(self):
+        from hvac_actions import ActionStore
+        run_dir = None if self.spill_dir is None else Path(self.spill_dir) / f"run_{self._runs:03d}"
+        self.history = StateHistory(hot_limit=self.history_limit, spill_dir=run_dir)
+        self.actions = ActionStore(hot_limit=self.history_limit, spill_dir=run_dir)
+
+    def spawn(self, n: int) -> List["HVACControlSimulator"]:
+        """
+        派生 n 个参数相同、随机数流互相独立的模拟器；内存上限相同，
+        设了 spill_dir 时各自写入 spawn_NNN 子目录，分段文件互不覆盖
+        """
+        return [HVACControlSimulator(self.start_time, self.timestep_minutes, seed=child,
+                                     trend_window=self.trend.window, forecast_horizon=self.forecast_horizon,
+                                     strategy=self.strategy, history_limit=self.history_limit,
+                                     spill_dir=None if self.spill_dir is None else Path(self.spill_dir) / f"spawn_{i:03d}")
+                for i, child in enumerate(self.seed_sequence.spawn(n))]
 
 
 if __name__ == "__main__":
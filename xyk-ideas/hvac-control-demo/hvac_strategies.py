@@ -0,0 +1,325 @@
+"""
+HVAC 控制策略
+策略接口 + 注册表，以及在相同扰动序列上并行对比各策略的批量比较器。
+- adaptive：原来写死在模拟器里的自适应控制，阈值、概率全部参数化（AdaptiveParams）
+- hysteresis：确定性的滞回控制，温度越过死区才启停，不做随机微调
+- price_aware：高峰电价时放宽舒适带、低谷时收紧（提前蓄冷/蓄热），高峰时新风降档
+- predictive：按 TrendTracker 外推 forecast_horizon 步后的温湿度提前动作
+策略只读写 simulator.state 并返回本步动作；随机数取自 simulator._uniform（每步固定一组），
+所以同一扰动序列下不同策略看到的噪声完全相同。
+"""
+
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from hvac_simulator import (
+    ActionType, ControlAction, DeviceType, DisturbanceTrace, HVACControlSimulator,
+    U_ASHP_OFF, U_DEHUMID, U_ERV_FAN, U_FAN, U_SETPOINT,
+)
+
+
+@dataclass(frozen=True)
+class AdaptiveParams:
+    """自适应控制的阈值与动作概率（默认值即原模拟器中的常数）"""
+    cool_above: float = 23.5         # 温度高于此值且 ASHP 未开 -> 制冷
+    heat_below: float = 21.5         # 温度低于此值且 ASHP 未开 -> 制热
+    off_low: float = 22.0            # 温度回到 [off_low, off_high] 时按 off_prob 关闭
+    off_high: float = 23.0
+    off_prob: float = 0.5
+    cool_setpoint: float = 22.0
+    heat_setpoint: float = 23.0
+    setpoint_prob: float = 0.45      # 运行中微调设定温度的概率
+    setpoint_band: float = 0.5
+    setpoint_min: float = 20.0
+    setpoint_max: float = 26.0
+    fan_prob: float = 0.5            # 运行中调整风速的概率
+    fan_up_diff: float = 1.0
+    fan_down_diff: float = 0.5
+    dehumid_mode_above: float = 65.0
+    dehumid_mode_prob: float = 0.35
+    deh_on_above: float = 65.0       # DEH 开启 / 关闭湿度
+    deh_off_below: float = 58.0
+    erv_start_hour: int = 7          # ERV 运行时段 [start, stop)
+    erv_stop_hour: int = 21
+    erv_fan_prob: float = 0.4
+    erv_fan_up_above: float = 60.0
+    erv_fan_down_below: float = 55.0
+
+
+class ControlStrategy(ABC):
+    """策略接口：每步调用一次 control(simulator)，修改 simulator.state 并返回本步动作"""
+    name = ""
+    label = ""                       # 写入 HVACState.strategy 的显示名称
+
+    @abstractmethod
+    def control(self, simulator: HVACControlSimulator) -> List[ControlAction]:
+        ...
+
+
+STRATEGY_REGISTRY: Dict[str, Callable[..., ControlStrategy]] = {}
+
+
+def register_strategy(cls):
+    """类装饰器：按 cls.name 注册"""
+    STRATEGY_REGISTRY[cls.name] = cls
+    return cls
+
+
+def get_strategy(strategy="adaptive", **options) -> ControlStrategy:
+    """按名称创建策略（options 传给构造函数）；传入 ControlStrategy 实例时原样返回"""
+    if isinstance(strategy, ControlStrategy):
+        return strategy
+    if strategy not in STRATEGY_REGISTRY:
+        raise ValueError(f"未知控制策略 {strategy!r}，可选：{', '.join(STRATEGY_REGISTRY)}")
+    return STRATEGY_REGISTRY[strategy](**options)
+
+
+@register_strategy
+class AdaptiveStrategy(ControlStrategy):
+    """自适应控制 - 更积极的阈值与随机微调；子类通过 params_for / observe 改变决策依据"""
+    name = "adaptive"
+    label = "自适应控制"
+
+    def __init__(self, params: Optional[AdaptiveParams] = None, **overrides):
+        self.params = replace(params or AdaptiveParams(), **overrides)
+
+    def params_for(self, simulator) -> AdaptiveParams:
+        """本步使用的参数"""
+        return self.params
+
+    def observe(self, simulator) -> Tuple[float, float]:
+        """决策依据的 (温度, 湿度)"""
+        return simulator.state.temperature, simulator.state.humidity
+
+    def control(self, simulator) -> List[ControlAction]:
+        p = self.params_for(simulator)
+        temp, hum = self.observe(simulator)
+        actions = []
+        self._switch_ashp(simulator, p, temp, actions)
+        if simulator.state.ashp_on:
+            self._tune_ashp(simulator, p, temp, hum, actions)
+        self._dehumidify(simulator, p, hum, actions)
+        self._ventilate(simulator, p, hum, actions)
+        return actions
+
+    # ---------- ASHP 温度控制 ----------
+    def _switch_ashp(self, simulator, p: AdaptiveParams, temp: float, actions: list):
+        state, now = simulator.state, simulator.state.timestamp
+        # 温度过高 -> 制冷
+        if temp > p.cool_above and not state.ashp_on:
+            actions.append(ControlAction(now, DeviceType.ASHP, ActionType.ASHP_ON, is_instant=True))
+            actions.append(ControlAction(now, DeviceType.ASHP, ActionType.ASHP_COOLING, is_instant=False, duration=40.0))
+            state.ashp_on, state.ashp_mode, state.ashp_setpoint = True, "制冷", p.cool_setpoint
+        # 温度过低 -> 制热
+        elif temp < p.heat_below and not state.ashp_on:
+            actions.append(ControlAction(now, DeviceType.ASHP, ActionType.ASHP_ON, is_instant=True))
+            actions.append(ControlAction(now, DeviceType.ASHP, ActionType.ASHP_HEATING, is_instant=False, duration=40.0))
+            state.ashp_on, state.ashp_mode, state.ashp_setpoint = True, "制热", p.heat_setpoint
+        # 温度达标 -> 关闭ASHP
+        elif state.ashp_on and p.off_low <= temp <= p.off_high:
+            if simulator._uniform[U_ASHP_OFF] < p.off_prob:
+                actions.append(ControlAction(now, DeviceType.ASHP, ActionType.ASHP_OFF, is_instant=True))
+                state.ashp_on, state.ashp_mode = False, "待机"
+
+    # ---------- ASHP 运行时微调 ----------
+    def _tune_ashp(self, simulator, p: AdaptiveParams, temp: float, hum: float, actions: list):
+        state, now, u = simulator.state, simulator.state.timestamp, simulator._uniform
+        # 设定温度微调
+        if u[U_SETPOINT] < p.setpoint_prob:
+            if temp > state.ashp_setpoint + p.setpoint_band:
+                actions.append(ControlAction(now, DeviceType.ASHP, ActionType.ASHP_TEMP_DOWN, is_instant=False, duration=20.0))
+                state.ashp_setpoint = max(p.setpoint_min, state.ashp_setpoint - 0.5)
+            elif temp < state.ashp_setpoint - p.setpoint_band:
+                actions.append(ControlAction(now, DeviceType.ASHP, ActionType.ASHP_TEMP_UP, is_instant=False, duration=20.0))
+                state.ashp_setpoint = min(p.setpoint_max, state.ashp_setpoint + 0.5)
+
+        # 风速调节
+        if u[U_FAN] < p.fan_prob:
+            temp_diff = abs(temp - state.ashp_setpoint)
+            if temp_diff > p.fan_up_diff and state.ashp_fan_speed < 5:
+                actions.append(ControlAction(now, DeviceType.ASHP, ActionType.ASHP_FAN_UP, is_instant=False, duration=25.0))
+                state.ashp_fan_speed = min(5, state.ashp_fan_speed + 1)
+            elif temp_diff < p.fan_down_diff and state.ashp_fan_speed > 1:
+                actions.append(ControlAction(now, DeviceType.ASHP, ActionType.ASHP_FAN_DOWN, is_instant=False, duration=25.0))
+                state.ashp_fan_speed = max(1, state.ashp_fan_speed - 1)
+
+        # 除湿模式切换
+        if hum > p.dehumid_mode_above and state.ashp_mode != "除湿" and u[U_DEHUMID] < p.dehumid_mode_prob:
+            actions.append(ControlAction(now, DeviceType.ASHP, ActionType.ASHP_DEHUMID, is_instant=False, duration=35.0))
+            state.ashp_mode = "除湿"
+
+    # ---------- DEH 除湿控制 ----------
+    def _dehumidify(self, simulator, p: AdaptiveParams, hum: float, actions: list):
+        state, now = simulator.state, simulator.state.timestamp
+        if hum > p.deh_on_above and not state.deh_on:
+            actions.append(ControlAction(now, DeviceType.DEH, ActionType.DEH_ON, is_instant=True))
+            state.deh_on = True
+        elif hum < p.deh_off_below and state.deh_on:
+            actions.append(ControlAction(now, DeviceType.DEH, ActionType.DEH_OFF, is_instant=True))
+            state.deh_on = False
+
+    # ---------- ERV 通风控制 ----------
+    def _ventilate(self, simulator, p: AdaptiveParams, hum: float, actions: list):
+        state, now = simulator.state, simulator.state.timestamp
+        hour = now.hour
+        if p.erv_start_hour <= hour < p.erv_stop_hour and not state.erv_on:
+            actions.append(ControlAction(now, DeviceType.ERV, ActionType.ERV_ON, is_instant=True))
+            state.erv_on, state.erv_fan_speed = True, 2
+        elif (hour >= p.erv_stop_hour or hour < p.erv_start_hour) and state.erv_on:
+            actions.append(ControlAction(now, DeviceType.ERV, ActionType.ERV_OFF, is_instant=True))
+            state.erv_on = False
+
+        # ERV风速动态调节
+        if state.erv_on and simulator._uniform[U_ERV_FAN] < p.erv_fan_prob:
+            if hum > p.erv_fan_up_above and state.erv_fan_speed < 3:
+                actions.append(ControlAction(now, DeviceType.ERV, ActionType.ERV_FAN_UP, is_instant=False, duration=30.0))
+                state.erv_fan_speed = min(3, state.erv_fan_speed + 1)
+            elif hum < p.erv_fan_down_below and state.erv_fan_speed > 1:
+                actions.append(ControlAction(now, DeviceType.ERV, ActionType.ERV_FAN_DOWN, is_instant=False, duration=30.0))
+                state.erv_fan_speed = max(1, state.erv_fan_speed - 1)
+
+
+@register_strategy
+class HysteresisStrategy(AdaptiveStrategy):
+    """滞回控制：越过死区才启停，回到目标温度立即关闭；风速按偏差确定性调节，不微调设定温度"""
+    name = "hysteresis"
+    label = "滞回控制"
+
+    def __init__(self, params: Optional[AdaptiveParams] = None, target: float = 22.5, **overrides):
+        base = AdaptiveParams(cool_above=24.0, heat_below=21.0, off_prob=1.0, setpoint_prob=0.0,
+                              fan_prob=1.0, dehumid_mode_prob=0.0, deh_off_below=55.0, erv_fan_prob=1.0)
+        super().__init__(params or base, **overrides)
+        self.target = target
+
+    def _switch_ashp(self, simulator, p, temp, actions):
+        state = simulator.state
+        reached = (state.ashp_mode == "制冷" and temp <= self.target) or \
+                  (state.ashp_mode == "制热" and temp >= self.target)
+        if state.ashp_on and reached:
+            actions.append(ControlAction(state.timestamp, DeviceType.ASHP, ActionType.ASHP_OFF, is_instant=True))
+            state.ashp_on, state.ashp_mode = False, "待机"
+        elif not state.ashp_on:
+            super()._switch_ashp(simulator, p, temp, actions)
+
+
+@register_strategy
+class PriceAwareStrategy(AdaptiveStrategy):
+    """峰谷电价感知：高峰时舒适带两侧各放宽 widen ℃、新风只开 1 档；低谷时收紧 tighten ℃ 提前蓄冷/蓄热"""
+    name = "price_aware"
+    label = "电价感知控制"
+
+    def __init__(self, params: Optional[AdaptiveParams] = None, widen: float = 1.0, tighten: float = 0.3,
+                 **overrides):
+        super().__init__(params, **overrides)
+        p = self.params
+        self.peak = replace(p, cool_above=p.cool_above + widen, heat_below=p.heat_below - widen,
+                            off_low=p.off_low - widen / 2, off_high=p.off_high + widen / 2,
+                            erv_fan_up_above=101.0)
+        self.valley = replace(p, cool_above=p.cool_above - tighten, heat_below=p.heat_below + tighten)
+
+    def params_for(self, simulator):
+        price = simulator._get_electricity_price(simulator.state.timestamp)
+        return self.peak if price >= simulator.peak_price else self.valley
+
+    def _ventilate(self, simulator, p, hum, actions):
+        super()._ventilate(simulator, p, hum, actions)
+        # 高峰时段新风降到 1 档（含低谷时已升到 2、3 档后进入高峰的情况）
+        state = simulator.state
+        if p is self.peak and state.erv_on and state.erv_fan_speed > 1:
+            actions.append(ControlAction(state.timestamp, DeviceType.ERV, ActionType.ERV_FAN_DOWN,
+                                         is_instant=False, duration=30.0))
+            state.erv_fan_speed = 1
+
+
+@register_strategy
+class PredictiveStrategy(AdaptiveStrategy):
+    """预测控制：用 TrendTracker 外推 forecast_horizon 步后的温湿度作为决策依据，提前启停"""
+    name = "predictive"
+    label = "预测控制"
+
+    def observe(self, simulator):
+        state = simulator.state
+        if not simulator.trend.ready:
+            return state.temperature, state.humidity
+        temp, hum, _, _ = simulator.trend.forecast(
+            (state.temperature, state.humidity, state.total_power, state.cost), simulator.forecast_horizon)
+        return min(max(temp, 18.0), 28.0), min(max(hum, 40.0), 80.0)
+
+
+# ---------- 批量对比 ----------
+_traces: List[DisturbanceTrace] = []
+
+
+def _init_worker(traces: List[DisturbanceTrace]):
+    """进程池初始化：扰动序列每个进程只传一次"""
+    global _traces
+    _traces = traces
+
+
+def _evaluate(strategy: str, trace_index: int, start_time: datetime, timestep_minutes: int,
+              options: dict) -> Dict[str, float]:
+    from hvac_montecarlo import summarize
+    trace = _traces[trace_index]
+    simulator = HVACControlSimulator(start_time=start_time, timestep_minutes=timestep_minutes,
+                                     strategy=get_strategy(strategy, **options), trace=trace)
+    simulator.simulate(len(trace))
+    return dict(strategy=strategy, trace=trace_index, **summarize(simulator))
+
+
+def compare_strategies(strategies: Optional[Sequence[str]] = None, n_traces: int = 8, days: float = 7,
+                       seed=2025, start_time: datetime = datetime(2025, 1, 1), timestep_minutes: int = 5,
+                       workers: Optional[int] = None, options: Optional[Dict[str, dict]] = None):
+    """
+    所有策略在同一组 n_traces 条扰动序列上各跑一遍（进程池并行），返回 (逐次结果, 排名表)。
+    排名表按电费、舒适度各自排名后取平均名次，名次越小越好。
+    """
+    strategies = list(strategies or STRATEGY_REGISTRY)
+    options = options or {}
+    steps = int(round(days * 24 * 60 / timestep_minutes))
+    traces = DisturbanceTrace.spawn(seed, n_traces, steps)
+    jobs = [(name, i, start_time, timestep_minutes, options.get(name, {}))
+            for name in strategies for i in range(n_traces)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(traces)
+        rows = [_evaluate(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(traces,)) as pool:
+            rows = [f.result() for f in as_completed([pool.submit(_evaluate, *job) for job in jobs])]
+
+    runs = pd.DataFrame(rows).sort_values(["strategy", "trace"]).reset_index(drop=True)
+    table = runs.groupby("strategy").agg(
+        cost=("cost", "mean"), energy_kwh=("energy_kwh", "mean"), mean_comfort=("mean_comfort", "mean"),
+        p5_comfort=("mean_comfort", lambda v: np.percentile(v, 5)), warning_steps=("warning_steps", "mean"),
+        actions=("actions", "mean"))
+    table.insert(0, "rank", (table["cost"].rank() + table["mean_comfort"].rank(ascending=False)) / 2)
+    table["label"] = [STRATEGY_REGISTRY[name].label for name in table.index]
+    return runs, table.sort_values(["rank", "cost"])
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    # 以脚本运行时本文件是 __main__，模拟器内部取到的是 hvac_strategies 模块里的类，统一从模块导入
+    from hvac_strategies import STRATEGY_REGISTRY, compare_strategies
+
+    parser = argparse.ArgumentParser(description="HVAC 控制策略对比")
+    parser.add_argument("--traces", type=int, default=8)
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    _, table = compare_strategies(n_traces=args.traces, days=args.days, workers=args.workers)
+    print(f"{len(STRATEGY_REGISTRY)} 个策略 × {args.traces} 条扰动序列 × {args.days:g} 天："
+          f"{time.perf_counter() - t0:.1f} s\n")
+    print(table.round(2).to_string())
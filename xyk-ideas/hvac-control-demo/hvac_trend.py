@@ -0,0 +1,68 @@
+"""
+滚动趋势预测
+每个通道保留最近 window 个样本的环形缓冲；趋势取窗口内相邻差分的均值，
+即 (最新 - 最旧) / (window - 1)，更新与查询都是 O(1)，与历史如何存放无关。
+通道可以是标量（shape=()），也可以是长度 N 的向量（向量化引擎每个场景一列）。
+模拟器的预测、向量化引擎和 Dash 图表的预测线共用这一实现。
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+DEFAULT_WINDOW = 3
+DEFAULT_HORIZON = 5
+PREDICTED = ("temperature", "humidity", "total_power", "cost")
+
+
+class TrendTracker:
+    """多通道滚动趋势"""
+
+    def __init__(self, channels: Sequence[str] = PREDICTED, window: int = DEFAULT_WINDOW, shape=()):
+        if window < 2:
+            raise ValueError("趋势窗口至少 2 个样本")
+        self.channels = tuple(channels)
+        self.window = window
+        self.shape = tuple(shape)
+        self.reset()
+
+    def reset(self):
+        self._ring = np.zeros((self.window, len(self.channels), *self.shape))
+        self._pos = 0                # 下一次写入的位置；写满后即最旧样本的位置
+        self.count = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.window
+
+    def update(self, values):
+        """追加一个样本（每个通道一个值，顺序同 channels）"""
+        self._ring[self._pos] = values
+        self._pos = (self._pos + 1) % self.window
+        self.count += 1
+
+    def trend(self) -> np.ndarray:
+        """每步的平均变化量 (通道, *shape)；样本不足一个窗口时为 0"""
+        if not self.ready:
+            return np.zeros((len(self.channels), *self.shape))
+        newest = self._ring[(self._pos - 1) % self.window]
+        oldest = self._ring[self._pos]
+        return (newest - oldest) / (self.window - 1)
+
+    def forecast(self, current, horizon: int = DEFAULT_HORIZON) -> np.ndarray:
+        """current 之后第 horizon 步的线性外推"""
+        return np.asarray(current, dtype=float) + self.trend() * horizon
+
+    def path(self, current, horizon: int = DEFAULT_HORIZON) -> np.ndarray:
+        """第 0..horizon 步的外推 (horizon + 1, 通道, *shape)，第 0 步即 current"""
+        steps = np.arange(horizon + 1).reshape(-1, *[1] * (1 + len(self.shape)))
+        return np.asarray(current, dtype=float) + self.trend() * steps
+
+    @classmethod
+    def from_series(cls, series: Dict[str, np.ndarray], window: int = DEFAULT_WINDOW) -> "TrendTracker":
+        """用每个序列的最后 window 个值建立跟踪器（只读尾部，与序列长度无关）"""
+        tracker = cls(tuple(series), window=window)
+        tails = [np.asarray(values)[-window:] for values in series.values()]
+        for row in zip(*tails):
+            tracker.update(row)
+        return tracker
@@ -0,0 +1,223 @@
+"""
+自适应控制参数搜索
+在 AdaptiveParams 的阈值、动作概率上做网格或随机搜索：
+- 所有参数组合在同一组扰动序列（DisturbanceTrace）上评估，进程池每个进程只接收一次序列
+- 评估过的点按 (参数, 序列设定) 缓存到 output/tuning_cache.jsonl，重复搜索或扩大网格时只算新点
+- 结果给出电费 - 舒适度的 Pareto 前沿（电费更低且舒适度不更差的点不存在）
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import pathlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from hvac_simulator import DisturbanceTrace, HVACControlSimulator
+from hvac_strategies import AdaptiveParams, AdaptiveStrategy
+
+OUTPUT_DIR = pathlib.Path(__file__).parent / "output"
+CACHE_FILE = OUTPUT_DIR / "tuning_cache.jsonl"
+PARAM_NAMES = tuple(f.name for f in fields(AdaptiveParams))
+METRICS = ("cost", "mean_comfort", "energy_kwh", "warning_steps", "actions")
+CACHE_VERSION = 1       # 模拟器或评估方式改变时加一，旧缓存自动失效
+
+# 默认网格（4 × 3 × 3 × 3 = 108 个点）与随机搜索范围
+DEFAULT_GRID = {
+    "cool_above": [23.0, 23.5, 24.0, 24.5],
+    "heat_below": [20.5, 21.0, 21.5],
+    "off_prob": [0.3, 0.5, 0.8],
+    "deh_on_above": [63.0, 65.0, 68.0],
+}
+DEFAULT_RANGES = {
+    "cool_above": (22.5, 25.0),
+    "heat_below": (20.0, 22.0),
+    "off_prob": (0.1, 1.0),
+    "setpoint_prob": (0.0, 1.0),
+    "fan_prob": (0.0, 1.0),
+    "deh_on_above": (60.0, 70.0),
+    "deh_off_below": (52.0, 60.0),
+}
+
+
+def _check_names(names):
+    unknown = set(names) - set(PARAM_NAMES)
+    if unknown:
+        raise ValueError(f"未知参数：{', '.join(sorted(unknown))}")
+
+
+def grid_points(grid: Dict[str, Sequence[float]] = DEFAULT_GRID) -> Iterator[Dict[str, float]]:
+    _check_names(grid)
+    names = list(grid)
+    for values in itertools.product(*(grid[n] for n in names)):
+        yield dict(zip(names, values))
+
+
+def random_points(n: int, ranges: Dict[str, tuple] = DEFAULT_RANGES, seed=0,
+                  decimals: int = 3) -> Iterator[Dict[str, float]]:
+    """在各参数范围内均匀抽样；取整到 decimals 位，便于缓存命中"""
+    _check_names(ranges)
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        yield {name: round(float(rng.uniform(lo, hi)), decimals) for name, (lo, hi) in ranges.items()}
+
+
+@dataclass(frozen=True)
+class TraceSpec:
+    """扰动序列设定；与参数一起构成缓存键"""
+    seed: int = 2025
+    n_traces: int = 4
+    days: float = 2.0
+    timestep_minutes: int = 5
+    start_time: str = "2025-01-01T00:00"
+
+    @property
+    def steps(self) -> int:
+        return int(round(self.days * 24 * 60 / self.timestep_minutes))
+
+    def traces(self) -> List[DisturbanceTrace]:
+        return DisturbanceTrace.spawn(self.seed, self.n_traces, self.steps)
+
+
+def point_key(point: Dict[str, float], spec: TraceSpec) -> str:
+    text = json.dumps({"version": CACHE_VERSION, "params": asdict(AdaptiveParams(**point)), "spec": asdict(spec)},
+                      sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class TuningCache:
+    """评估结果缓存：内存字典 + 追加写入的 jsonl 文件"""
+
+    def __init__(self, path: Optional[pathlib.Path] = CACHE_FILE):
+        self.path = pathlib.Path(path) if path is not None else None
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry["result"]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._entries.get(key)
+
+    def put(self, key: str, result: dict):
+        with self._lock:
+            self._entries[key] = result
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n")
+
+
+# ---------- 评估 ----------
+_shared = {}        # 进程内共享：spec、traces
+
+
+def _init_worker(spec: TraceSpec, traces: List[DisturbanceTrace]):
+    _shared["spec"] = spec
+    _shared["traces"] = traces
+
+
+def evaluate_point(point: Dict[str, float]) -> Dict[str, float]:
+    """一组参数在全部共享扰动序列上的平均指标"""
+    from hvac_montecarlo import summarize
+    spec, traces = _shared["spec"], _shared["traces"]
+    start = datetime.fromisoformat(spec.start_time)
+    strategy = AdaptiveStrategy(**point)
+    rows = []
+    for trace in traces:
+        simulator = HVACControlSimulator(start_time=start, timestep_minutes=spec.timestep_minutes,
+                                         strategy=strategy, trace=trace)
+        simulator.simulate(len(trace))
+        rows.append(summarize(simulator))
+    return {m: float(np.mean([r[m] for r in rows])) for m in METRICS}
+
+
+def pareto_front(cost: np.ndarray, comfort: np.ndarray) -> np.ndarray:
+    """电费越低越好、舒适度越高越好；返回非支配点的布尔掩码"""
+    order = np.lexsort((-comfort, cost))          # 电费升序，同电费时舒适度降序
+    mask = np.zeros(len(cost), dtype=bool)
+    best = -np.inf
+    for i in order:
+        if comfort[i] > best:
+            mask[i] = True
+            best = comfort[i]
+    return mask
+
+
+def search(points, spec: TraceSpec = TraceSpec(), workers: Optional[int] = None,
+           cache: Optional[TuningCache] = None,
+           progress: Optional[Callable[[int, int], None]] = None) -> pd.DataFrame:
+    """
+    评估所有参数点（已缓存的直接取结果），返回每点一行的结果表，pareto 列标记 Pareto 前沿。
+    progress(已完成, 需计算的点数) 在每个新点算完后调用。
+    """
+    points = [dict(p) for p in points]
+    for p in points:
+        _check_names(p)
+    cache = cache if cache is not None else TuningCache(None)
+    keys = [point_key(p, spec) for p in points]
+    todo = {k: p for k, p in zip(keys, points) if cache.get(k) is None}
+
+    if todo:
+        traces = spec.traces()
+        workers = workers or os.cpu_count() or 1
+        done = 0
+        if workers == 1:
+            _init_worker(spec, traces)
+            for key, point in todo.items():
+                cache.put(key, evaluate_point(point))
+                done += 1
+                if progress is not None:
+                    progress(done, len(todo))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(spec, traces)) as pool:
+                futures = {pool.submit(evaluate_point, point): key for key, point in todo.items()}
+                for future in as_completed(futures):
+                    cache.put(futures[future], future.result())
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(todo))
+
+    table = pd.DataFrame([{**p, **cache.get(k)} for p, k in zip(points, keys)])
+    table["pareto"] = pareto_front(table["cost"].to_numpy(), table["mean_comfort"].to_numpy())
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="自适应控制参数搜索")
+    parser.add_argument("--mode", choices=("grid", "random"), default="grid")
+    parser.add_argument("--samples", type=int, default=64, help="随机搜索的点数")
+    parser.add_argument("--traces", type=int, default=4)
+    parser.add_argument("--days", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    points = list(grid_points() if args.mode == "grid" else random_points(args.samples))
+    cache = TuningCache(None if args.no_cache else CACHE_FILE)
+    cached = len(cache)
+    t0 = time.perf_counter()
+    table = search(points, TraceSpec(n_traces=args.traces, days=args.days), workers=args.workers, cache=cache,
+                   progress=lambda done, total: print(f"  {done}/{total}", end="\r"))
+    print(f"\n{len(points)} 个参数点（新计算 {len(cache) - cached} 个）× {args.traces} 条扰动序列 × "
+          f"{args.days:g} 天：{time.perf_counter() - t0:.1f} s\n")
+    front = table[table["pareto"]].sort_values("cost")
+    print(f"Pareto 前沿（{len(front)} 个点）：")
+    print(front.drop(columns="pareto").round(3).to_string(index=False))
@@ -0,0 +1,309 @@
+"""
+HVAC 多场景向量化模拟引擎
+N 个相互独立的场景按同一时间轴同步推进，状态按列存放（每个字段一个长度 N 的数组），
+阈值判断、功率、电费、舒适度全部是数组运算。
+控制逻辑与 HVACControlSimulator 逐条对应；N=1 且种子相同时逐步结果完全一致。
+动作不生成 ControlAction 对象，只按类型计数。
+"""
+
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from hvac_simulator import (
+    ActionType, HVACState, RANDOM_NORMALS, RANDOM_UNIFORMS, make_seed_sequence,
+    U_ASHP_OFF, U_SETPOINT, U_FAN, U_DEHUMID, U_ERV_FAN, U_FAULT,
+    Z_TEMP, Z_HUM, Z_PRED_TEMP, Z_PRED_HUM, Z_PRED_POWER, Z_PRED_COST,
+)
+from hvac_trend import DEFAULT_HORIZON, DEFAULT_WINDOW, TrendTracker
+
+# 字符串状态的编码
+MODES = ("待机", "制冷", "制热", "除湿")
+STANDBY, COOLING, HEATING, DEHUMID = range(4)
+STATUSES = ("正常", "预警", "故障")
+NORMAL, WARNING, FAULT = range(3)
+STRATEGIES = ("自适应控制", "故障诊断中")
+
+ACTIONS = list(ActionType)
+ACTION_INDEX = {action: i for i, action in enumerate(ACTIONS)}
+
+# run(record=...) 可记录的字段
+FIELDS = (
+    "temperature", "humidity", "temp_pred", "hum_pred",
+    "ashp_power", "erv_power", "deh_power", "total_power", "power_pred",
+    "electricity_price", "cost", "cost_pred",
+    "ashp_on", "ashp_mode", "ashp_setpoint", "ashp_fan_speed",
+    "erv_on", "erv_fan_speed", "deh_on",
+    "strategy", "status", "comfort_score",
+)
+
+
+class VectorHVACSimulator:
+    """N 个场景同步推进的 HVAC 模拟器"""
+
+    def __init__(self, n: int, start_time: datetime = None, timestep_minutes: int = 5, seed=42,
+                 trend_window: int = DEFAULT_WINDOW, forecast_horizon: int = DEFAULT_HORIZON):
+        self.n = n
+        self.trend_window = trend_window
+        self.forecast_horizon = forecast_horizon
+        self.start_time = start_time or datetime.now()
+        self.timestep_minutes = timestep_minutes
+        self.peak_price = 1.2
+        self.valley_price = 0.4
+        self.seed_sequence = make_seed_sequence(seed)
+        self.reset()
+
+    def reset(self):
+        n = self.n
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self.current_step = 0
+        self.timestamp = self.start_time
+
+        self.temperature = np.full(n, 22.0)
+        self.humidity = np.full(n, 60.0)
+        self.temp_pred = np.full(n, np.nan)
+        self.hum_pred = np.full(n, np.nan)
+        self.ashp_power = np.zeros(n)
+        self.erv_power = np.zeros(n)
+        self.deh_power = np.zeros(n)
+        self.total_power = np.zeros(n)
+        self.power_pred = np.full(n, np.nan)
+        self.electricity_price = np.zeros(n)
+        self.cost = np.zeros(n)
+        self.cost_pred = np.full(n, np.nan)
+
+        self.ashp_on = np.zeros(n, dtype=bool)
+        self.ashp_mode = np.full(n, STANDBY, dtype=np.int8)
+        self.ashp_setpoint = np.full(n, 22.0)
+        self.ashp_fan_speed = np.ones(n, dtype=np.int8)
+        self.erv_on = np.zeros(n, dtype=bool)
+        self.erv_fan_speed = np.ones(n, dtype=np.int8)
+        self.deh_on = np.zeros(n, dtype=bool)
+
+        self.strategy = np.zeros(n, dtype=np.int8)
+        self.status = np.full(n, NORMAL, dtype=np.int8)
+        self.comfort_score = np.full(n, 100.0)
+
+        # 温度、湿度、功率、电费的滚动趋势，每个场景一列，与标量模拟器共用实现
+        self.trend = TrendTracker(window=self.trend_window, shape=(n,))
+
+        # 累计量
+        self.action_counts = np.zeros((n, len(ACTIONS)), dtype=np.int64)
+        self.energy_kwh = np.zeros(n)
+        self.total_cost = np.zeros(n)
+        self.comfort_sum = np.zeros(n)
+        self.fault_steps = np.zeros(n, dtype=np.int64)
+
+    # ---------- 单步 ----------
+    def _count(self, action: ActionType, mask: np.ndarray):
+        self.action_counts[:, ACTION_INDEX[action]] += mask
+
+    def _control(self, u: np.ndarray):
+        temp, hum = self.temperature, self.humidity
+        hour = self.timestamp.hour
+
+        # ASHP 温度控制
+        cool = (temp > 23.5) & ~self.ashp_on
+        heat = (temp < 21.5) & ~self.ashp_on & ~cool
+        off = self.ashp_on & (temp >= 22.0) & (temp <= 23.0) & (u[:, U_ASHP_OFF] < 0.5)
+        self._count(ActionType.ASHP_ON, cool | heat)
+        self._count(ActionType.ASHP_COOLING, cool)
+        self._count(ActionType.ASHP_HEATING, heat)
+        self._count(ActionType.ASHP_OFF, off)
+        self.ashp_on = (self.ashp_on | cool | heat) & ~off
+        self.ashp_mode = np.select([cool, heat, off], [COOLING, HEATING, STANDBY], self.ashp_mode).astype(np.int8)
+        self.ashp_setpoint = np.select([cool, heat], [22.0, 23.0], self.ashp_setpoint)
+
+        # ASHP 运行时微调：设定温度
+        on = self.ashp_on
+        adjust = on & (u[:, U_SETPOINT] < 0.45)
+        down = adjust & (temp > self.ashp_setpoint + 0.5)
+        up = adjust & ~down & (temp < self.ashp_setpoint - 0.5)
+        self._count(ActionType.ASHP_TEMP_DOWN, down)
+        self._count(ActionType.ASHP_TEMP_UP, up)
+        self.ashp_setpoint = np.where(down, np.maximum(20.0, self.ashp_setpoint - 0.5),
+                                      np.where(up, np.minimum(26.0, self.ashp_setpoint + 0.5), self.ashp_setpoint))
+
+        # 风速
+        fan = on & (u[:, U_FAN] < 0.5)
+        temp_diff = np.abs(temp - self.ashp_setpoint)
+        fan_up = fan & (temp_diff > 1.0) & (self.ashp_fan_speed < 5)
+        fan_down = fan & ~fan_up & (temp_diff < 0.5) & (self.ashp_fan_speed > 1)
+        self._count(ActionType.ASHP_FAN_UP, fan_up)
+        self._count(ActionType.ASHP_FAN_DOWN, fan_down)
+        self.ashp_fan_speed = (self.ashp_fan_speed + fan_up - fan_down).astype(np.int8)
+
+        # 除湿模式
+        dehumid = on & (hum > 65) & (self.ashp_mode != DEHUMID) & (u[:, U_DEHUMID] < 0.35)
+        self._count(ActionType.ASHP_DEHUMID, dehumid)
+        self.ashp_mode = np.where(dehumid, DEHUMID, self.ashp_mode).astype(np.int8)
+
+        # DEH
+        deh_on = (hum > 65) & ~self.deh_on
+        deh_off = (hum < 58) & self.deh_on
+        self._count(ActionType.DEH_ON, deh_on)
+        self._count(ActionType.DEH_OFF, deh_off)
+        self.deh_on = (self.deh_on | deh_on) & ~deh_off
+
+        # ERV 按时段开关（所有场景共用时间轴）
+        daytime = 7 <= hour < 21
+        erv_on = ~self.erv_on if daytime else np.zeros(self.n, dtype=bool)
+        erv_off = self.erv_on if not daytime else np.zeros(self.n, dtype=bool)
+        self._count(ActionType.ERV_ON, erv_on)
+        self._count(ActionType.ERV_OFF, erv_off)
+        self.erv_on = (self.erv_on | erv_on) & ~erv_off
+        self.erv_fan_speed = np.where(erv_on, 2, self.erv_fan_speed).astype(np.int8)
+
+        erv_adjust = self.erv_on & (u[:, U_ERV_FAN] < 0.4)
+        erv_up = erv_adjust & (hum > 60) & (self.erv_fan_speed < 3)
+        erv_down = erv_adjust & ~erv_up & (hum < 55) & (self.erv_fan_speed > 1)
+        self._count(ActionType.ERV_FAN_UP, erv_up)
+        self._count(ActionType.ERV_FAN_DOWN, erv_down)
+        self.erv_fan_speed = (self.erv_fan_speed + erv_up - erv_down).astype(np.int8)
+
+    def step(self):
+        u = self.rng.random((self.n, RANDOM_UNIFORMS))
+        z = self.rng.standard_normal((self.n, RANDOM_NORMALS))
+
+        self.current_step += 1
+        self.timestamp = self.start_time + timedelta(minutes=self.timestep_minutes * self.current_step)
+        self._control(u)
+
+        # 温度
+        hour = self.timestamp.hour
+        daily_variation = 2.0 * np.sin(2 * np.pi * (hour - 6) / 24)
+        cooling = self.ashp_on & (self.ashp_mode == COOLING)
+        heating = self.ashp_on & (self.ashp_mode == HEATING)
+        control_effect = np.where(cooling, -(self.temperature - self.ashp_setpoint) * 0.3,
+                                  np.where(heating, (self.ashp_setpoint - self.temperature) * 0.3, 0.0))
+        noise = 0.2 * z[:, Z_TEMP]
+        self.temperature = np.clip(self.temperature + (daily_variation + control_effect + noise) * 0.1, 18.0, 28.0)
+
+        # 湿度
+        dehumid_effect = np.where(self.deh_on, -2.0, np.where(self.ashp_mode == DEHUMID, -1.0, 0.0))
+        erv_effect = np.where(self.erv_on, 0.5 * self.erv_fan_speed, 0.0)
+        noise = 1.0 * z[:, Z_HUM]
+        self.humidity = np.clip(self.humidity + (dehumid_effect + erv_effect + noise) * 0.2, 40.0, 80.0)
+
+        # 预测（功率、电费用上一步的值，与标量模拟器一致）
+        current = (self.temperature, self.humidity, self.total_power, self.cost)
+        if self.trend.ready:
+            pred = self.trend.forecast(current, self.forecast_horizon)
+        else:
+            pred = [current[0] + 0.5 * z[:, Z_PRED_TEMP], current[1] + 2.0 * z[:, Z_PRED_HUM],
+                    current[2] + 0.2 * z[:, Z_PRED_POWER], current[3] + 0.01 * z[:, Z_PRED_COST]]
+        self.temp_pred = np.clip(pred[0], 18.0, 28.0)
+        self.hum_pred = np.clip(pred[1], 40.0, 80.0)
+        self.power_pred = np.maximum(0, pred[2])
+        self.cost_pred = np.maximum(0, pred[3])
+
+        # 功率
+        fan_factor = 1.0 + (self.ashp_fan_speed - 1) * 0.15
+        load_factor = np.select(
+            [self.ashp_mode == COOLING, self.ashp_mode == HEATING],
+            [np.abs(self.temperature - self.ashp_setpoint) * 0.1,
+             np.abs(self.ashp_setpoint - self.temperature) * 0.12], 0.5)
+        self.ashp_power = np.where(self.ashp_on, 3.0 * fan_factor * (1 + load_factor), 0.0)
+        self.erv_power = np.where(self.erv_on, 0.2 * self.erv_fan_speed, 0.0)
+        self.deh_power = np.where(self.deh_on, 1.5, 0.0)
+        self.total_power = self.ashp_power + self.erv_power + self.deh_power
+
+        # 电费
+        price = self.peak_price if 8 <= hour < 22 else self.valley_price
+        self.electricity_price = np.full(self.n, price)
+        self.cost = self.total_power * (self.timestep_minutes / 60.0) * self.electricity_price
+
+        # 舒适度
+        temp_score = np.clip(100 - np.abs(self.temperature - 23.0) * 10, 0, 100)
+        hum_score = np.clip(100 - np.abs(self.humidity - 55.0) * 2, 0, 100)
+        self.comfort_score = np.round(0.6 * temp_score + 0.4 * hum_score, 1)
+
+        # 状态评估（预警时策略保持不变）
+        warning = self.comfort_score < 60
+        fault = ~warning & (u[:, U_FAULT] < 0.02)
+        self.status = np.select([warning, fault], [WARNING, FAULT], NORMAL).astype(np.int8)
+        self.strategy = np.where(warning, self.strategy, fault.astype(np.int8))
+
+        self.trend.update((self.temperature, self.humidity, self.total_power, self.cost))
+
+        self.energy_kwh += self.total_power * (self.timestep_minutes / 60.0)
+        self.total_cost += self.cost
+        self.comfort_sum += self.comfort_score
+        self.fault_steps += fault
+
+    def run(self, num_steps: int, record=None) -> Dict[str, np.ndarray]:
+        """
+        推进 num_steps 步。record 为字段名列表（见 FIELDS）时返回 {字段: (步数, N) 数组}
+        """
+        record = list(record or ())
+        out = {}
+        for name in record:
+            sample = getattr(self, name)
+            out[name] = np.empty((num_steps, self.n), dtype=sample.dtype)
+        for k in range(num_steps):
+            self.step()
+            for name in record:
+                out[name][k] = getattr(self, name)
+        return out
+
+    # ---------- 结果 ----------
+    def summary(self) -> Dict[str, np.ndarray]:
+        steps = max(self.current_step, 1)
+        return {
+            "energy_kwh": self.energy_kwh.copy(),
+            "cost": self.total_cost.copy(),
+            "mean_comfort": self.comfort_sum / steps,
+            "fault_steps": self.fault_steps.copy(),
+            "actions": self.action_counts.sum(axis=1),
+        }
+
+    def state(self, i: int) -> HVACState:
+        """第 i 个场景的当前状态（HVACState，便于与标量模拟器对照或复用绘图代码）"""
+        return HVACState(
+            timestamp=self.timestamp,
+            temperature=float(self.temperature[i]),
+            humidity=float(self.humidity[i]),
+            temp_pred=float(self.temp_pred[i]),
+            hum_pred=float(self.hum_pred[i]),
+            ashp_power=float(self.ashp_power[i]),
+            erv_power=float(self.erv_power[i]),
+            deh_power=float(self.deh_power[i]),
+            total_power=float(self.total_power[i]),
+            power_pred=float(self.power_pred[i]),
+            electricity_price=float(self.electricity_price[i]),
+            cost=float(self.cost[i]),
+            cost_pred=float(self.cost_pred[i]),
+            ashp_on=bool(self.ashp_on[i]),
+            ashp_mode=MODES[self.ashp_mode[i]],
+            ashp_setpoint=float(self.ashp_setpoint[i]),
+            ashp_fan_speed=int(self.ashp_fan_speed[i]),
+            erv_on=bool(self.erv_on[i]),
+            erv_fan_speed=int(self.erv_fan_speed[i]),
+            deh_on=bool(self.deh_on[i]),
+            strategy=STRATEGIES[self.strategy[i]],
+            status=STATUSES[self.status[i]],
+            comfort_score=float(self.comfort_score[i]),
+        )
+
+
+if __name__ == "__main__":
+    import time
+
+    start = datetime(2025, 1, 1)
+    steps = 288  # 一天
+
+    t0 = time.perf_counter()
+    from hvac_simulator import HVACControlSimulator
+    HVACControlSimulator(start_time=start).simulate(steps)
+    scalar = time.perf_counter() - t0
+
+    n = 10_000
+    t0 = time.perf_counter()
+    engine = VectorHVACSimulator(n, start_time=start)
+    engine.run(steps)
+    vector = time.perf_counter() - t0
+
+    result = engine.summary()
+    print(f"标量 1 个场景 × {steps} 步：{scalar:.2f} s")
+    print(f"向量 {n} 个场景 × {steps} 步：{vector:.2f} s")
+    print(f"电费 P5/P50/P95：{np.percentile(result['cost'], [5, 50, 95]).round(2)} 元")
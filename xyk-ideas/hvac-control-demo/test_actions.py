@@ -0,0 +1,66 @@
+"""
+动作存储测试
+窗口重叠查询与逐条扫描结果一致（含窗口开始前启动的长动作、乱序写入、按设备过滤）；序列接口与列表一致
+运行：python test_actions.py  或  python -m pytest -q test_actions.py
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from hvac_actions import ACTIONS, DEVICES, ActionStore
+from hvac_simulator import ControlAction
+
+START = datetime(2025, 1, 1)
+
+
+def brute_force(actions, t0, t1, device=None):
+    hits = [a for a in actions
+            if a.timestamp <= t1 and a.timestamp + timedelta(minutes=a.duration) >= t0
+            and (device is None or a.device == device)]
+    return sorted(hits, key=lambda a: a.timestamp)
+
+
+def random_actions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    minutes = np.sort(rng.integers(0, 10_000, n))
+    minutes[::17] = rng.integers(0, 10_000, len(minutes[::17]))          # 部分乱序
+    actions = []
+    for m in minutes:
+        instant = rng.random() < 0.4
+        actions.append(ControlAction(START + timedelta(minutes=int(m)), DEVICES[rng.integers(len(DEVICES))],
+                                     ACTIONS[rng.integers(len(ACTIONS))], bool(instant),
+                                     0.0 if instant else float(rng.choice([20, 40, 600]))))
+    return actions
+
+
+def test_overlap_matches_brute_force():
+    actions = random_actions(2000)
+    store = ActionStore(capacity=8)
+    store.extend(actions)
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        t0 = START + timedelta(minutes=int(rng.integers(0, 10_000)))
+        t1 = t0 + timedelta(minutes=int(rng.integers(0, 450)))
+        device = DEVICES[rng.integers(len(DEVICES))] if rng.random() < 0.5 else None
+        got = store.overlapping(t0, t1, device)
+        expected = brute_force(actions, t0, t1, device)
+        assert sorted(map(repr, got)) == sorted(map(repr, expected))
+
+
+def test_sequence_interface():
+    actions = sorted(random_actions(50, seed=2), key=lambda a: a.timestamp)
+    store = ActionStore()
+    store.extend(actions)
+    assert len(store) == 50 and store[-1] == actions[-1] and store[-30:] == actions[-30:]
+    assert list(store) == actions
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("动作存储测试")
+    print("=" * 60)
+    test_overlap_matches_brute_force()
+    print("\n[1] 窗口重叠查询与逐条扫描一致：[OK]")
+    test_sequence_interface()
+    print("[2] 序列接口与列表一致：[OK]")
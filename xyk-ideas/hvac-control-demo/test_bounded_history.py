@@ -0,0 +1,105 @@
+"""
+有界历史测试
+history_limit 下内存占用不随步数增长；最近窗口、全程回放、动作查询与不限长度的运行一致；
+未设 spill_dir 时早期数据丢弃后访问报错，搬移前取得的窗口仍然有效
+运行：python test_bounded_history.py  或  python -m pytest -q test_bounded_history.py
+"""
+
+import pathlib
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from hvac_history import COLUMN_NAMES
+from hvac_simulator import HVACControlSimulator
+
+START = datetime(2025, 1, 1)
+STEPS = 1500
+LIMIT = 100
+
+
+def run(steps, **options):
+    simulator = HVACControlSimulator(start_time=START, timestep_minutes=5, seed=7, **options)
+    simulator.simulate(steps)
+    return simulator
+
+
+def assert_same(a, b):
+    assert len(a) == len(b)
+    for name in COLUMN_NAMES:
+        np.testing.assert_array_equal(a.column(name), b.column(name))
+    assert a.decoded("status") == b.decoded("status")
+
+
+def test_memory_is_flat():
+    with tempfile.TemporaryDirectory() as folder:
+        short = run(3 * LIMIT, history_limit=LIMIT, spill_dir=folder)
+        long = run(STEPS, history_limit=LIMIT, spill_dir=folder + "/long")
+        assert short.history.nbytes == long.history.nbytes
+        assert short.actions.columns["start"].nbytes == long.actions.columns["start"].nbytes
+        assert len(long.history) == STEPS
+
+
+def test_windows_and_replay_match_unbounded():
+    full = run(STEPS)
+    with tempfile.TemporaryDirectory() as folder:
+        bounded = run(STEPS, history_limit=LIMIT, spill_dir=folder)
+        history, actions = bounded.history, bounded.actions
+        assert history.first_index > 0 and list(pathlib.Path(folder).rglob("history_*.npz"))
+
+        # 最近窗口是内存中的零拷贝视图
+        window = history[STEPS - 90:STEPS]
+        assert np.shares_memory(window.column("temperature"), history.column("temperature"))
+        assert_same(window, full.history[STEPS - 90:STEPS])
+
+        # 跨越磁盘分段的回放、下标与迭代
+        assert_same(history.replay(0, STEPS), full.history)
+        assert_same(history[250:700], full.history[250:700])
+        assert history[3].to_state() == full.history[3].to_state()
+        assert [r.timestamp for r in history] == [r.timestamp for r in full.history]
+
+        # 动作：序列接口与时间窗口回放
+        assert len(actions) == len(full.actions) and list(actions) == list(full.actions)
+        assert actions[-30:] == full.actions[-30:] and actions[5] == full.actions[5]
+        t0 = START + timedelta(hours=10)
+        t1 = t0 + timedelta(hours=6)
+        assert actions.replay(t0, t1) == full.actions.overlapping(t0, t1)
+
+
+def test_without_spill_dir():
+    simulator = HVACControlSimulator(start_time=START, seed=7, history_limit=LIMIT)
+    simulator.simulate(LIMIT)
+    early = simulator.history[:LIMIT]
+    expected = early.column("temperature").copy()
+    simulator.simulate(5 * LIMIT)
+    np.testing.assert_array_equal(early.column("temperature"), expected)
+    # len 保持全局步号；最近的窗口可以迭代，整体迭代与访问已丢弃的行报错
+    history, actions = simulator.history, simulator.actions
+    assert len(history) == 6 * LIMIT and history.first_index > 0
+    assert len(list(history[-LIMIT:])) == LIMIT and len(actions[-10:]) == 10
+    for access in (lambda: history[0], lambda: iter(history), lambda: history.replay(0, LIMIT)):
+        assert_index_error(access)
+    assert actions.first_index > 0
+    assert_index_error(lambda: iter(actions))
+
+
+def assert_index_error(access):
+    try:
+        access()
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("已丢弃的数据应当报 IndexError")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("有界历史测试")
+    print("=" * 60)
+    test_memory_is_flat()
+    print("\n[1] 内存占用不随步数增长：[OK]")
+    test_windows_and_replay_match_unbounded()
+    print("[2] 窗口、回放、动作查询与不限长度运行一致：[OK]")
+    test_without_spill_dir()
+    print("[3] 未设 spill_dir 时早期数据丢弃，旧窗口仍有效：[OK]")
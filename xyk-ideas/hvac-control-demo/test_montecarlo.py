@@ -0,0 +1,27 @@
+"""
+蒙特卡洛评估测试
+结果只取决于根种子：单进程与进程池（不同分块）得到完全相同的逐次摘要；分位数表与逐次结果一致
+运行：python test_montecarlo.py  或  python -m pytest -q test_montecarlo.py
+"""
+
+import numpy as np
+
+from hvac_montecarlo import METRICS, run_monte_carlo
+
+RUNS = 24
+
+
+def test_pool_matches_single_process():
+    inline, _ = run_monte_carlo(RUNS, seed=11, days=0.25, workers=1)
+    pooled, table = run_monte_carlo(RUNS, seed=11, days=0.25, workers=2, chunk_size=5)
+    assert inline.equals(pooled)
+    assert list(table.index) == list(METRICS)
+    assert np.isclose(table.loc["cost", "P50"], np.median(pooled["cost"]))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("蒙特卡洛评估 - 可复现性测试")
+    print("=" * 60)
+    test_pool_matches_single_process()
+    print("\n[1] 单进程与进程池结果逐次一致：[OK]")
@@ -0,0 +1,74 @@
+"""
+控制策略测试
+注册表完整；未实现 control 的策略不能实例化；同一扰动序列可重放；各策略都能跑通并写入自己的显示名称；并行对比与单进程结果一致
+运行：python test_strategies.py  或  python -m pytest -q test_strategies.py
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from hvac_simulator import DisturbanceTrace, HVACControlSimulator
+from hvac_strategies import STRATEGY_REGISTRY, ControlStrategy, compare_strategies
+
+START = datetime(2025, 1, 1)
+STEPS = 288
+
+
+def test_registry_and_labels():
+    assert set(STRATEGY_REGISTRY) >= {"adaptive", "hysteresis", "price_aware", "predictive"}
+    trace = DisturbanceTrace.generate(5, STEPS)
+    for name, cls in STRATEGY_REGISTRY.items():
+        history, _ = HVACControlSimulator(start_time=START, strategy=name, trace=trace).simulate(STEPS)
+        assert set(history.decoded("strategy")) <= {cls.label, "故障诊断中"}, name
+
+
+def test_strategy_must_implement_control():
+    class Incomplete(ControlStrategy):
+        name = "incomplete"
+
+    try:
+        Incomplete()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("未实现 control 的策略应当在实例化时报 TypeError")
+
+
+def test_trace_replays_identically():
+    trace = DisturbanceTrace.generate(5, STEPS)
+    a, _ = HVACControlSimulator(start_time=START, trace=trace).simulate(STEPS)
+    b, _ = HVACControlSimulator(start_time=START, seed=99, trace=trace).simulate(STEPS)
+    assert np.array_equal(a.column("temperature"), b.column("temperature"))
+
+
+def test_price_aware_erv_at_speed_one_during_peak():
+    simulator = HVACControlSimulator(start_time=START, strategy="price_aware", seed=3)
+    history, _ = simulator.simulate(3 * STEPS)
+    hours = history.column("timestamp").astype("datetime64[h]").astype(int) % 24
+    peak = (hours >= 8) & (hours < 22) & history.column("erv_on")
+    assert peak.any()
+    assert (history.column("erv_fan_speed")[peak] == 1).all()
+
+
+def test_parallel_comparison_matches_single_process():
+    inline, table = compare_strategies(n_traces=2, days=0.5, workers=1)
+    pooled, _ = compare_strategies(n_traces=2, days=0.5, workers=2)
+    assert inline.equals(pooled)
+    assert set(table.index) == set(STRATEGY_REGISTRY)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("控制策略测试")
+    print("=" * 60)
+    test_registry_and_labels()
+    print("\n[1] 注册表完整，各策略可运行：[OK]")
+    test_strategy_must_implement_control()
+    print("    未实现 control 的策略不能实例化：[OK]")
+    test_trace_replays_identically()
+    print("[2] 同一扰动序列结果一致（与种子无关）：[OK]")
+    test_price_aware_erv_at_speed_one_during_peak()
+    print("[3] 电价感知策略高峰时新风保持 1 档：[OK]")
+    test_parallel_comparison_matches_single_process()
+    print("[4] 并行对比与单进程一致：[OK]")
@@ -0,0 +1,46 @@
+"""
+滚动趋势测试
+O(1) 环形缓冲的趋势与按窗口重新计算 np.mean(np.diff(...)) 一致；向量通道与逐个标量通道一致
+运行：python test_trend.py  或  python -m pytest -q test_trend.py
+"""
+
+import numpy as np
+
+from hvac_trend import TrendTracker
+
+
+def test_trend_matches_window_mean_diff():
+    rng = np.random.default_rng(0)
+    series = rng.normal(size=(200, 2)).cumsum(axis=0)
+    for window in (2, 3, 6):
+        tracker = TrendTracker(("a", "b"), window=window)
+        for k, row in enumerate(series):
+            tracker.update(row)
+            if k + 1 >= window:
+                expected = np.mean(np.diff(series[k + 1 - window:k + 1], axis=0), axis=0)
+                assert np.allclose(tracker.trend(), expected)
+        rebuilt = TrendTracker.from_series({"a": series[:, 0], "b": series[:, 1]}, window=window)
+        assert np.array_equal(rebuilt.trend(), tracker.trend())
+        assert np.allclose(tracker.path(series[-1], 4)[-1], tracker.forecast(series[-1], 4))
+
+
+def test_vector_channels_match_scalar():
+    rng = np.random.default_rng(1)
+    samples = rng.normal(size=(10, 4, 5))
+    vector = TrendTracker(shape=(5,))
+    scalars = [TrendTracker() for _ in range(5)]
+    for sample in samples:
+        vector.update(sample)
+        for i, tracker in enumerate(scalars):
+            tracker.update(sample[:, i])
+    assert np.array_equal(vector.trend(), np.stack([t.trend() for t in scalars], axis=1))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("滚动趋势测试")
+    print("=" * 60)
+    test_trend_matches_window_mean_diff()
+    print("\n[1] 环形缓冲趋势与按窗口重算一致：[OK]")
+    test_vector_channels_match_scalar()
+    print("[2] 向量通道与标量通道一致：[OK]")
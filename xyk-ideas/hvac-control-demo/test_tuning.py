@@ -0,0 +1,43 @@
+"""
+参数搜索测试
+Pareto 前沿只保留非支配点；已评估的点命中缓存；进程池与单进程结果一致
+运行：python test_tuning.py  或  python -m pytest -q test_tuning.py
+"""
+
+import numpy as np
+
+from hvac_tuning import TraceSpec, TuningCache, grid_points, pareto_front, search
+
+SPEC = TraceSpec(n_traces=2, days=0.5)
+GRID = {"cool_above": [23.0, 24.0], "off_prob": [0.3, 0.8]}
+
+
+def test_pareto_front():
+    cost = np.array([1.0, 2.0, 3.0, 2.5, 1.0])
+    comfort = np.array([70.0, 80.0, 90.0, 75.0, 60.0])
+    assert pareto_front(cost, comfort).tolist() == [True, True, True, False, False]
+
+
+def test_cache_and_pool():
+    cache = TuningCache(None)
+    points = list(grid_points(GRID))
+    inline = search(points, SPEC, workers=1, cache=cache)
+    assert len(cache) == len(points)
+
+    calls = []
+    again = search(points, SPEC, workers=1, cache=cache, progress=lambda done, total: calls.append(done))
+    assert calls == [] and again.equals(inline)
+
+    pooled = search(points, SPEC, workers=2, cache=TuningCache(None))
+    assert pooled.equals(inline)
+    assert pooled["pareto"].any()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("参数搜索测试")
+    print("=" * 60)
+    test_pareto_front()
+    print("\n[1] Pareto 前沿：[OK]")
+    test_cache_and_pool()
+    print("[2] 缓存命中、进程池与单进程一致：[OK]")
@@ -0,0 +1,62 @@
+"""
+向量化引擎一致性测试
+N=1 时逐步对照标量模拟器的全部状态字段与动作计数；N>1 时各场景互不相同且结果可复现
+运行：python test_vector_engine.py  或  python -m pytest -q test_vector_engine.py
+"""
+
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from hvac_simulator import HVACControlSimulator
+from hvac_vector import ACTIONS, FIELDS, MODES, STATUSES, STRATEGIES, VectorHVACSimulator
+
+START = datetime(2025, 1, 1, 5)
+STEPS = 2000
+LABELS = {"ashp_mode": MODES, "status": STATUSES, "strategy": STRATEGIES}
+
+
+def compare_single_scenario(steps: int = STEPS) -> list:
+    """返回与标量模拟器不一致的字段列表"""
+    history, actions = HVACControlSimulator(start_time=START).simulate(steps)
+    record = VectorHVACSimulator(1, start_time=START).run(steps, record=FIELDS)
+    engine_actions = VectorHVACSimulator(1, start_time=START)
+    engine_actions.run(steps)
+
+    mismatched = []
+    for name in FIELDS:
+        expected = [getattr(s, name) for s in history]
+        got = record[name][:, 0]
+        if name in LABELS:
+            got = [LABELS[name][code] for code in got]
+        if not np.array_equal(np.asarray(expected), np.asarray(got)):
+            mismatched.append(name)
+
+    counts = Counter(a.action for a in actions)
+    if [counts.get(a, 0) for a in ACTIONS] != engine_actions.action_counts[0].tolist():
+        mismatched.append("actions")
+    return mismatched
+
+
+def test_single_scenario_matches_scalar():
+    assert compare_single_scenario() == []
+
+
+def test_scenarios_are_independent_and_reproducible():
+    a = VectorHVACSimulator(64, start_time=START, seed=7)
+    b = VectorHVACSimulator(64, start_time=START, seed=7)
+    a.run(288)
+    b.run(288)
+    assert np.array_equal(a.temperature, b.temperature)
+    assert len(np.unique(a.humidity)) == 64
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("向量化 HVAC 引擎 - 一致性测试")
+    print("=" * 60)
+    mismatched = compare_single_scenario()
+    print(f"\n[1] N=1 与标量模拟器逐步对照 {STEPS} 步：" + ("[OK] 完全一致" if not mismatched else f"[FAIL] {mismatched}"))
+    test_scenarios_are_independent_and_reproducible()
+    print("[2] 多场景独立、同种子可复现：[OK]")